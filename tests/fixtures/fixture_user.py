@@ -13,6 +13,5 @@ def user_client(user, client):
 
 
 @pytest.fixture
-def another_user(mixer):
-    from django.contrib.auth.models import User
-    return mixer.blend(User, username='AnotherUser')
+def another_user(mixer, django_user_model):
+    return mixer.blend(django_user_model, username='AnotherUser')
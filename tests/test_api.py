@@ -0,0 +1,69 @@
+import pytest
+from django.test import Client
+
+from posts.models import Comment, Follow, Post
+
+
+@pytest.fixture
+def feed(mixer, user, another_user, group):
+    mixer.cycle(15).blend(Post, author=another_user, group=group, image='')
+    mixer.blend(Follow, user=user, author=another_user)
+    post = Post.objects.filter(author=another_user).first()
+    mixer.cycle(3).blend(Comment, post=post, author=user)
+    return post
+
+
+class TestApi:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('url', [
+        '/api/v1/posts/',
+        '/api/v1/groups/test-link/posts/',
+        '/api/v1/profiles/AnotherUser/posts/',
+    ])
+    def test_public_feeds(self, client, feed, url, django_assert_max_num_queries):
+        with django_assert_max_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data['results']) == 10
+        assert data['results'][0]['author'] == 'AnotherUser'
+        assert data['results'][0]['group'] == 'test-link'
+
+        next_page = client.get(data['next']).json()
+        assert len(next_page['results']) == 5, (
+            'Проверьте курсорную пагинацию ленты'
+        )
+        ids = {post['id'] for post in data['results'] + next_page['results']}
+        assert len(ids) == 15
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follow_feed(
+        self, user_client, feed, django_assert_max_num_queries
+    ):
+        assert Client().get('/api/v1/follow/posts/').status_code == 403
+        with django_assert_max_num_queries(3):
+            response = user_client.get('/api/v1/follow/posts/')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 10
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_detail(self, client, feed, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/posts/{feed.id}/')
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data['comments']) == 3
+        assert data['comments'][0]['author'] == 'TestUser'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_sparse_fields(self, client, feed, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = client.get(
+                f'/api/v1/posts/{feed.id}/', {'fields': 'id,text'}
+            )
+        assert response.json() == {'id': feed.id, 'text': feed.text}, (
+            'Проверьте, что параметр `fields` отбрасывает лишние поля'
+        )
+        response = client.get('/api/v1/posts/', {'fields': 'id'})
+        assert set(response.json()['results'][0]) == {'id'}
@@ -0,0 +1,58 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from users import cache as user_cache
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    return len(context.captured_queries)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    caches['default'].clear()
+
+
+class TestAuthCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_session_and_user_are_cached(self, user, client):
+        client.login(username='TestUser', password='1234567')
+        caches['shared'].clear()
+        first = count_queries(client, '/follow/')
+        saved = user_cache.queries_saved_total()
+        second = count_queries(client, '/follow/')
+        assert second <= first - 2, (
+            'Сессия и пользователь должны читаться из кэша'
+        )
+        assert user_cache.queries_saved_total() - saved >= 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_password_change_invalidates_user(self, user, client):
+        client.login(username='TestUser', password='1234567')
+        client.get('/follow/')
+        user.set_password('новый-пароль-123')
+        user.save()
+        response = client.get('/follow/')
+        assert response.status_code == 302, (
+            'После смены пароля старая сессия должна стать недействительной'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_group_change_invalidates_user(self, user):
+        loads = []
+
+        def load(user_id):
+            loads.append(user_id)
+            return user
+        user_cache.get_user(user.pk, load)
+        user_cache.get_user(user.pk, load)
+        assert len(loads) == 1
+        user.groups.add(Group.objects.create(name='all'))
+        user_cache.get_user(user.pk, load)
+        assert len(loads) == 2
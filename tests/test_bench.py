@@ -0,0 +1,61 @@
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import F
+
+from posts import seed
+from posts.management.commands.bench_scenarios import SCENARIOS, percentile
+from posts.models import Follow, Like, Post
+
+
+class TestSeed:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_seed_creates_skewed_data(self):
+        totals = seed.seed(
+            users=50, posts=300, groups=5, follows=6, likes=400,
+            comments=100, batch_size=64,
+        )
+        assert totals['post'] == 300
+        assert totals['like'] == 400
+        assert totals['comment'] == 100
+        followers = Counter(
+            Follow.objects.values_list('author_id', flat=True)
+        )
+        top = sum(count for _, count in followers.most_common(5))
+        assert top > sum(followers.values()) / 4, (
+            'Подписки должны распределяться по степенному закону'
+        )
+        assert not Follow.objects.filter(
+            user_id=F('author_id')
+        ).exists()
+        assert sum(Post.objects.values_list('count_likes', flat=True)) == (
+            Like.objects.count()
+        ), 'count_likes должен совпадать с числом лайков'
+        with pytest.raises(ValueError):
+            seed.seed(users=1, posts=0, groups=0)
+
+
+class TestBenchScenarios:
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 95) == 0.0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_scenarios_report_latencies(self):
+        seed.seed(users=10, posts=30, groups=2, follows=3, likes=20,
+                  comments=5)
+        out = StringIO()
+        call_command(
+            'bench_scenarios', '--requests', '3', '--concurrency', '1',
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        assert len(lines) == len(SCENARIOS)
+        for line in lines:
+            assert 'p99' in line and line.endswith('ошибок 0'), line
@@ -0,0 +1,100 @@
+import pytest
+from django.core.management import call_command
+
+from core import jobs as core_jobs
+from core.models import Job
+from posts import bulk, jobs, ranking
+from posts.models import Comment, Follow, Group, Like, Post, PostRank
+
+
+class TestBulk:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_delete_posts_in_batches(self, mixer, user, another_user,
+                                     mock_media):
+        posts = mixer.cycle(7).blend(Post, author=user)
+        for post in posts:
+            mixer.blend(Comment, post=post, author=another_user)
+            mixer.blend(Like, post=post, user=another_user)
+        calls = []
+        deleted = bulk.delete_posts(
+            Post.objects.filter(author=user),
+            batch_size=3,
+            progress=lambda done, total: calls.append((done, total)),
+        )
+        assert deleted == 7
+        assert not Post.objects.exists()
+        assert not Comment.objects.exists()
+        assert not Like.objects.exists()
+        assert calls == [(3, 7), (6, 7), (7, 7)], (
+            'Проверьте, что удаление идёт пачками и сообщает о прогрессе'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_purge_author_command(self, mixer, user, another_user,
+                                  mock_media):
+        mixer.cycle(5).blend(Post, author=user)
+        other_post = mixer.blend(Post, author=another_user)
+        mixer.blend(Comment, post=other_post, author=user)
+        mixer.blend(Like, post=other_post, user=user)
+        Post.objects.filter(pk=other_post.pk).update(count_likes=1)
+        ranking.recount(other_post)
+        mixer.blend(Follow, user=user, author=another_user)
+        mixer.blend(Follow, user=another_user, author=user)
+
+        call_command('purge_author', user.username, batch_size=2)
+
+        assert not type(user).objects.filter(pk=user.pk).exists()
+        assert list(Post.objects.all()) == [other_post]
+        assert not Comment.objects.exists()
+        assert not Like.objects.exists()
+        assert not Follow.objects.exists()
+        other_post.refresh_from_db()
+        assert other_post.count_likes == 0, (
+            'Проверьте, что счётчик лайков чужих постов пересчитывается'
+        )
+        rank = PostRank.objects.get(post=other_post)
+        assert (rank.likes, rank.comments) == (0, 0), (
+            'Рейтинг чужих постов должен пересчитываться без лайков '
+            'и комментариев удалённого автора'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_move_posts_command(self, mixer, user, group, mock_media):
+        target = Group.objects.create(
+            title='Целевая', slug='target', description='Описание'
+        )
+        mixer.cycle(5).blend(Post, author=user, group=group)
+        untouched = mixer.blend(Post, author=user, group=None)
+
+        call_command('move_posts', group.slug, target.slug, batch_size=2)
+
+        assert Post.objects.filter(group=target).count() == 5
+        assert not Post.objects.filter(group=group).exists()
+        untouched.refresh_from_db()
+        assert untouched.group is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_purge_job_is_not_queued_twice(self, mixer, user, mock_media):
+        bulk.hide_posts(Post.objects.filter(
+            pk__in=[p.pk for p in mixer.cycle(3).blend(Post, author=user)]
+        ))
+        jobs.purge_hidden_later()
+        jobs.purge_hidden_later()
+        assert Job.objects.filter(kind='posts.purge_hidden').count() == 1, (
+            'Вторая очистка не должна ставиться, пока первая ждёт'
+        )
+        assert core_jobs.run_pending() == 1
+        assert not Post.all_objects.exists()
+
+        jobs.purge_hidden_later()
+        assert Job.objects.get(kind='posts.purge_hidden').status == (
+            Job.QUEUED
+        ), 'Завершённая очистка должна ставиться заново'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_move_posts_job(self, mixer, user, group, mock_media):
+        posts = mixer.cycle(3).blend(Post, author=user, group=None)
+        jobs.move_posts_later([post.pk for post in posts[:2]], group)
+        core_jobs.run_pending()
+        assert Post.objects.filter(group=group).count() == 2
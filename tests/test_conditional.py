@@ -0,0 +1,77 @@
+import pytest
+from django.core.cache import cache
+
+from posts import suggestions
+from posts.models import Follow, Post
+
+
+class TestConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_not_modified(self, client, post, django_assert_num_queries):
+        cache.clear()
+        response = client.get('/')
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert response.has_header('Last-Modified')
+
+        with django_assert_num_queries(0):
+            response = client.get('/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что неизменившаяся главная страница отвечает 304'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_write_changes_etag(self, user_client, user, group):
+        cache.clear()
+        urls = ['/', f'/group/{group.slug}/', f'/profile/{user.username}/']
+        etags = {url: user_client.get(url)['ETag'] for url in urls}
+
+        user_client.post('/create/', data={'text': 'Новый', 'group': group.id})
+
+        for url in urls:
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 200, (
+                f'Проверьте, что новый пост сбрасывает ETag страницы `{url}`'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_detail_etag(self, user_client, post):
+        cache.clear()
+        url = f'/posts/ {post.id}/ '
+        etag = user_client.get(url)['ETag']
+        assert user_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304
+
+        user_client.post(
+            f'/posts/{post.id}/comment/', data={'text': 'Комментарий'}
+        )
+        assert user_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_suggestions_change_profile_etag(self, user_client, user,
+                                             another_user, mixer):
+        cache.clear()
+        third = mixer.blend(type(user), username='Third')
+        url = f'/profile/{third.username}/'
+        etag = user_client.get(url)['ETag']
+        Follow.objects.create(user=user, author=another_user)
+        Follow.objects.create(user=another_user, author=third)
+        Follow.objects.create(user=another_user, author=user)
+        suggestions.build()
+
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что пересчёт подсказок сбрасывает ETag профиля'
+        )
+        assert response.context['suggestions'] == ['Third']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_updated_at_changes_on_save(self, post):
+        updated_at = post.updated_at
+        post.text = 'Другой текст'
+        post.save()
+        assert Post.objects.get(pk=post.pk).updated_at > updated_at
@@ -0,0 +1,54 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser, Group
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from users.context_processors import user_group
+
+
+@pytest.fixture
+def make_request():
+    session = SessionStore()
+
+    def make(user):
+        request = RequestFactory().get('/')
+        request.user = user
+        request.session = session
+        return request
+    return make
+
+
+class TestUserGroup:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_is_lazy(self, user, make_request, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            context = user_group(make_request(user))
+        with django_assert_num_queries(1):
+            assert not context['user_groups']
+
+    def test_anonymous(self, make_request):
+        assert not user_group(make_request(AnonymousUser()))['user_groups']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cached_in_session_until_membership_changes(
+            self, user, make_request, django_assert_num_queries):
+        cache.clear()
+        group = Group.objects.create(name='all')
+        assert not user_group(make_request(user))['user_groups']
+        with django_assert_num_queries(0):
+            assert not user_group(make_request(user))['user_groups'], (
+                'Членство в группах должно браться из сессии'
+            )
+        user.groups.add(group)
+        assert user_group(make_request(user))['user_groups'], (
+            'Изменение групп пользователя должно сбрасывать кэш в сессии'
+        )
+        group.user_set.clear()
+        assert not user_group(make_request(user))['user_groups']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_year_is_rendered(self, client):
+        response = client.get('/')
+        assert str(response.context['year']).isdigit()
@@ -0,0 +1,70 @@
+import sqlite3
+import threading
+
+import pytest
+
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+def connect():
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+def is_alive(connection):
+    connection.execute('SELECT 1')
+    return True
+
+
+class TestConnectionPool:
+
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(connect, max_size=2)
+        first = pool.getconn()
+        pool.putconn(first)
+        assert pool.getconn() is first
+        assert pool.stats['created'] == 1
+        assert pool.stats['checkouts'] == 2
+
+    def test_fill_opens_min_size(self):
+        pool = ConnectionPool(connect, min_size=3, max_size=5)
+        pool.fill()
+        assert pool.size == pool.idle == 3
+
+    def test_waits_for_free_connection(self):
+        pool = ConnectionPool(connect, max_size=1, timeout=5)
+        held = pool.getconn()
+        timer = threading.Timer(0.05, pool.putconn, [held])
+        timer.start()
+        assert pool.getconn() is held, (
+            'Когда пул исчерпан, getconn должен дождаться возврата'
+        )
+        timer.join()
+        assert pool.stats['waits'] == 1
+        assert pool.stats['max_wait_seconds'] > 0
+
+    def test_timeout_when_exhausted(self):
+        pool = ConnectionPool(connect, max_size=1, timeout=0.01)
+        pool.getconn()
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+        assert pool.stats['timeouts'] == 1
+
+    def test_dead_connection_is_replaced(self):
+        pool = ConnectionPool(connect, check=is_alive)
+        dead = pool.getconn()
+        pool.putconn(dead)
+        dead.close()
+        fresh = pool.getconn()
+        assert fresh is not dead
+        assert is_alive(fresh)
+        assert pool.stats['failed_checks'] == 1
+        assert pool.size == 1
+
+    def test_max_lifetime(self):
+        pool = ConnectionPool(connect, max_lifetime=0)
+        old = pool.getconn()
+        pool.putconn(old)
+        assert pool.getconn() is not old, (
+            'Соединение старше max_lifetime не должно возвращаться в пул'
+        )
+        assert pool.stats['closed'] == 1
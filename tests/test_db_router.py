@@ -0,0 +1,75 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.urls import reverse
+
+from core import db_router
+from posts.models import Post
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    """Вторая база, которая отстаёт от основной, пока её не обновят."""
+    connections.settings[REPLICA] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    }
+    call_command('migrate', database=REPLICA, verbosity=0)
+    settings.DATABASE_REPLICAS = [REPLICA]
+    yield connections[REPLICA]
+    connections[REPLICA].close()
+    del connections.settings[REPLICA]
+    delattr(connections._connections, REPLICA)
+
+
+def replicate(replica):
+    """Догоняет реплику: копирует в неё авторов и посты."""
+    for model in (get_user_model(), Post):
+        for obj in model.objects.using('default').all():
+            obj.save(using=REPLICA)
+
+
+class TestReplicaRouter:
+
+    def test_reads_go_to_primary_outside_requests(self, settings):
+        settings.DATABASE_REPLICAS = [REPLICA]
+        router = db_router.ReplicaRouter()
+        assert router.db_for_read(Post) == 'default'
+        tokens = db_router.start_request()
+        db_router.allow_replica_reads()
+        assert router.db_for_read(Post) == REPLICA
+        assert router.db_for_write(Post) == 'default'
+        assert router.db_for_read(Post) == 'default', (
+            'После записи запрос должен читать из основной базы'
+        )
+        assert db_router.finish_request(tokens)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_read_your_writes_with_lagging_replica(
+            self, replica, user, user_client, client, settings):
+        post = Post.objects.create(text='Свежий пост', author=user)
+        url = reverse('posts:post_detail', args=[post.pk])
+
+        anonymous = type(client)()
+        assert anonymous.get(url).status_code == 404, (
+            'Чтение ленты без недавних записей должно идти с реплики'
+        )
+
+        user_client.post(
+            reverse('posts:add_comment', args=[post.pk]), {'text': 'Ок'}
+        )
+        assert db_router.PIN_COOKIE in user_client.cookies, (
+            'После записи пользователь должен закрепиться за основной базой'
+        )
+        assert user_client.get(url).status_code == 200, (
+            'Автор записи должен сразу видеть свои изменения'
+        )
+
+        settings.REPLICA_PIN_SECONDS = 0
+        user_client.cookies[db_router.PIN_COOKIE] = '0'
+        assert user_client.get(url).status_code == 404
+        replicate(replica)
+        assert anonymous.get(url).status_code == 200
@@ -0,0 +1,44 @@
+import pytest
+from django.core.cache import cache
+
+from posts import follow_graph
+from posts.models import Follow
+
+
+class TestFollowGraph:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_membership_is_cached(self, user, another_user,
+                                  django_assert_num_queries):
+        cache.clear()
+        Follow.objects.create(user=user, author=another_user)
+        assert follow_graph.is_following(user, another_user)
+        with django_assert_num_queries(0):
+            assert follow_graph.is_following(user, another_user)
+            assert not follow_graph.is_following(user, user)
+            assert follow_graph.followee_count(user.pk) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follow_and_unfollow_invalidate(self, user, another_user):
+        cache.clear()
+        assert follow_graph.follower_count(another_user.pk) == 0
+        follow_graph.follow(user, another_user)
+        assert follow_graph.is_following(user, another_user)
+        assert follow_graph.follower_count(another_user.pk) == 1
+        follow_graph.unfollow(user, another_user)
+        assert not follow_graph.is_following(user, another_user)
+        assert follow_graph.follower_count(another_user.pk) == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_profile_following_is_per_user(self, user_client, user,
+                                           another_user, mixer):
+        cache.clear()
+        third = mixer.blend(type(user), username='Third')
+        Follow.objects.create(user=third, author=another_user)
+        response = user_client.get(f'/profile/{another_user.username}/')
+        assert response.context['following'] is False, (
+            'Флаг `following` должен учитывать текущего пользователя'
+        )
+        user_client.get(f'/profile/{another_user.username}/follow/')
+        response = user_client.get(f'/profile/{another_user.username}/')
+        assert response.context['following'] is True
@@ -0,0 +1,73 @@
+import pytest
+
+from posts import group_stats
+from posts.models import Group, GroupStats, Post
+
+
+class TestGroupDirectory:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_stats_follow_post_writes(self, user_client, user, group):
+        other = Group.objects.create(
+            title='Другая', slug='other', description='Описание'
+        )
+        user_client.post('/create/', data={'text': 'Пост', 'group': group.id})
+        user_client.post('/create/', data={'text': 'Пост', 'group': group.id})
+        stats = GroupStats.objects.get(group=group)
+        assert stats.post_count == 2, (
+            'Проверьте, что создание поста обновляет статистику группы'
+        )
+        assert stats.top_authors == [[user.username, 2]]
+
+        post = Post.objects.filter(group=group).first()
+        user_client.post(
+            f'/posts/{post.id}/edit/', data={'text': 'Пост', 'group': other.id}
+        )
+        assert GroupStats.objects.get(group=group).post_count == 1
+        assert GroupStats.objects.get(group=other).post_count == 1
+
+        user_client.get(f'/posts/{post.id}/delet/')
+        other_stats = GroupStats.objects.get(group=other)
+        assert other_stats.post_count == 0
+        assert other_stats.last_post_at is None
+        assert other_stats.top_authors == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rebuild_matches_posts(self, mixer, user, group, mock_media):
+        mixer.cycle(4).blend(Post, author=user, group=group)
+        group_stats.rebuild()
+        stats = GroupStats.objects.get(group=group)
+        assert stats.post_count == 4
+        assert stats.last_post_at == Post.objects.latest('pub_date').pub_date
+
+    @pytest.mark.django_db(transaction=True)
+    def test_directory_single_query_and_cursor(
+        self, client, django_assert_num_queries
+    ):
+        for i in range(25):
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'group-{i:02}', description='-'
+            )
+        group_stats.rebuild()
+
+        with django_assert_num_queries(1):
+            response = client.get('/groups/')
+        assert response.status_code == 200
+        assert len(response.context['stats']) == 20
+        cursor = response.context['next_cursor']
+        assert cursor == 'group-19'
+
+        response = client.get('/groups/', {'after': cursor})
+        assert [s.group.slug for s in response.context['stats']] == [
+            f'group-{i}' for i in range(20, 25)
+        ]
+        assert response.context['next_cursor'] is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_new_group_listed_without_rebuild(self, client):
+        Group.objects.create(title='Новая', slug='new', description='-')
+        response = client.get('/groups/')
+        assert [s.group.slug for s in response.context['stats']] == ['new'], (
+            'Проверьте, что группа, созданная не через форму, '
+            'сразу попадает в каталог'
+        )
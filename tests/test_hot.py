@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.paginator import Page
+
+from core import jobs
+from posts import ranking
+from posts.models import Comment, Like, Post, PostRank
+from tests.utils import get_field_from_context
+
+
+class TestHotPosts:
+
+    def test_score_is_time_invariant_and_grows_with_activity(self):
+        pub_date = datetime(2024, 1, 1)
+        assert ranking.hot_score(10, 0, pub_date) > ranking.hot_score(
+            1, 0, pub_date
+        )
+        assert ranking.hot_score(0, 0, pub_date + timedelta(hours=1)) > (
+            ranking.hot_score(0, 0, pub_date)
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_like_and_comment_update_rank(self, user_client, post):
+        post.count_likes = 0
+        post.save()
+        user_client.get(f'/like/{post.id}/')
+        user_client.post(
+            f'/posts/{post.id}/comment/', data={'text': 'Комментарий'}
+        )
+        jobs.run_pending()
+        rank = PostRank.objects.get(post=post)
+        assert (rank.likes, rank.comments) == (1, 1), (
+            'Проверьте, что лайк и комментарий обновляют рейтинг поста'
+        )
+        user_client.get(f'/like/{post.id}/')
+        jobs.run_pending()
+        rank.refresh_from_db()
+        assert rank.likes == 0
+        assert rank.score == ranking.hot_score(0, 1, post.pub_date)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rank_job_can_rerun(self, user, post):
+        Like.objects.create(post=post, user=user)
+        job = jobs.enqueue('posts.rank', {'post_id': post.pk})
+        jobs.run(job)
+        jobs.run(job)
+        assert PostRank.objects.get(post=post).likes == 1, (
+            'Повторное выполнение задачи не должно считать лайк дважды'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_refresh_rebuilds_rank(self, mixer, user, mock_media):
+        quiet, busy = mixer.cycle(2).blend(Post, author=user)
+        mixer.cycle(3).blend(Like, post=busy, user=user)
+        mixer.blend(Comment, post=busy, author=user)
+
+        call_command('refresh_hot_posts')
+
+        assert ranking.top_posts() == [busy, quiet]
+        rank = PostRank.objects.get(post=busy)
+        assert (rank.likes, rank.comments) == (3, 1)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_hot_page(self, client, mixer, user, django_assert_max_num_queries):
+        cache.clear()
+        posts = mixer.cycle(3).blend(Post, author=user, image='')
+        for post in posts:
+            ranking.recount(post)
+        with django_assert_max_num_queries(3):
+            response = client.get('/hot/')
+        assert response.status_code == 200
+        page = get_field_from_context(response.context, Page)
+        assert len(page.object_list) == 3
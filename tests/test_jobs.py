@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.core.management import call_command
+
+from core import jobs
+from core.models import Job
+from posts.models import PostRank
+
+calls = []
+
+
+@jobs.handler('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@jobs.handler('tests.fail')
+def fail():
+    raise ValueError('сбой')
+
+
+class TestJobs:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_key_makes_enqueue_idempotent(self):
+        first = jobs.enqueue('tests.record', {'value': 1}, key='once')
+        second = jobs.enqueue('tests.record', {'value': 2}, key='once')
+        assert first.pk == second.pk, (
+            'Задача с тем же ключом не должна ставиться повторно'
+        )
+        calls.clear()
+        assert jobs.run_pending() == 1
+        assert calls == [1]
+        assert Job.objects.get(pk=first.pk).status == Job.DONE
+
+    @pytest.mark.django_db(transaction=True)
+    def test_requeue_restarts_finished_job(self):
+        first = jobs.enqueue('tests.record', {'value': 1}, key='again')
+        jobs.run_pending()
+        second = jobs.enqueue(
+            'tests.record', {'value': 2}, key='again', requeue=True
+        )
+        assert second.pk == first.pk and second.status == Job.QUEUED
+        assert second.payload == {'value': 2}
+        assert jobs.enqueue(
+            'tests.record', {'value': 3}, key='again', requeue=True
+        ).payload == {'value': 2}, 'Ждущая задача не должна меняться'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_job_is_claimed_once(self):
+        job = jobs.enqueue('tests.record', {'value': 1})
+        assert jobs.claim('first') == [job]
+        assert jobs.claim('second') == [], (
+            'Забранную задачу не должен получить другой рабочий'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_failed_job_retries_then_fails(self):
+        job = jobs.enqueue('tests.fail', max_attempts=2)
+        jobs.run_pending()
+        job.refresh_from_db()
+        assert job.status == Job.QUEUED and job.run_at > datetime.now(), (
+            'Упавшая задача должна вернуться в очередь с паузой'
+        )
+        assert 'сбой' in job.last_error
+        later = datetime.now() + timedelta(hours=1)
+        jobs.run(jobs.claim('worker', now=later)[0])
+        job.refresh_from_db()
+        assert job.status == Job.FAILED
+        assert jobs.stats['tests.fail']['failed'] >= 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_stale_job_is_requeued(self):
+        job = jobs.enqueue('tests.record', {'value': 1})
+        jobs.claim('dead')
+        later = datetime.now() + timedelta(seconds=jobs.LOCK_TIMEOUT + 1)
+        assert jobs.requeue_stale(now=later) == 1
+        job.refresh_from_db()
+        assert job.status == Job.QUEUED
+
+    @pytest.mark.django_db(transaction=True)
+    def test_finished_jobs_are_pruned(self):
+        done = jobs.enqueue('tests.record', {'value': 1})
+        failed = jobs.enqueue('tests.fail', max_attempts=1)
+        queued = jobs.enqueue('tests.record', {'value': 2}, delay=3600)
+        jobs.run_pending()
+        assert jobs.queue_depth() == {('tests.record', Job.QUEUED): 1}, (
+            'Глубина очереди должна считать только ждущие задачи'
+        )
+        later = datetime.now() + jobs.DONE_RETENTION + timedelta(minutes=1)
+        assert jobs.prune(now=later, batch_size=1) == 1
+        assert not Job.objects.filter(pk=done.pk).exists()
+        assert Job.objects.filter(pk__in=[failed.pk, queued.pk]).count() == 2
+        later += jobs.FAILED_RETENTION
+        assert jobs.prune(now=later) == 1
+        assert list(Job.objects.all()) == [queued]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_like_is_ranked_by_worker(self, user_client, post):
+        post.count_likes = 0
+        post.save()
+        user_client.get(f'/like/{post.id}/')
+        assert not PostRank.objects.filter(post=post).exists(), (
+            'Рейтинг после лайка должен обновлять рабочий, а не view'
+        )
+        call_command('runworker', '--once', '--concurrency', '2')
+        assert PostRank.objects.get(post=post).likes == 1
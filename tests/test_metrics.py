@@ -0,0 +1,86 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from core import metrics
+
+
+def sample(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+class TestMetrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_request_metrics_are_exposed(self, client, post, settings,
+                                         tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        client.get('/')
+        text = client.get('/metrics').content.decode()
+        assert sample(
+            text,
+            'yatube_http_request_duration_seconds_count'
+            '{view="posts:index",method="GET"}',
+        ) >= 1, 'Проверьте, что время ответа пишется по имени маршрута'
+        assert sample(
+            text, 'yatube_db_queries_total{view="posts:index"}'
+        ) >= 1, 'Проверьте, что считаются запросы к базе'
+        assert re.search(
+            r'yatube_template_render_seconds_count'
+            r'\{template="posts/index.html"\} \d', text
+        ), 'Проверьте, что пишется время рендера шаблонов'
+        assert '# TYPE yatube_cache_requests_total counter' in text
+
+    @pytest.mark.django_db(transaction=True)
+    def test_processes_are_summed(self, client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        other = {
+            'counters': [['db_queries_total', [['view', 'other']], 3]],
+            'gauges': [],
+            'histograms': [],
+        }
+        for label in ('a', 'b'):
+            (tmp_path / f'{os.getpid()}-{label}.json').write_text(
+                json.dumps(other)
+            )
+        text = metrics.render()
+        assert sample(
+            text, 'yatube_db_queries_total{view="other"}'
+        ) == 6, 'Метрики процессов должны складываться'
+
+    def test_dead_processes_keep_counters_not_gauges(self, settings,
+                                                     tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        process = subprocess.Popen([sys.executable, '-c', ''])
+        process.wait()
+        dead = {
+            'counters': [['db_queries_total', [['view', 'other']], 3]],
+            'gauges': [['test_connections', [], 5]],
+            'histograms': [],
+        }
+        (tmp_path / f'{process.pid}-old.json').write_text(json.dumps(dead))
+        live = {
+            'counters': [], 'gauges': [['test_connections', [], 2]],
+            'histograms': [],
+        }
+        (tmp_path / f'{os.getpid()}-new.json').write_text(json.dumps(live))
+        for _ in range(2):
+            text = metrics.render()
+            assert sample(
+                text, 'yatube_db_queries_total{view="other"}'
+            ) == 3, 'Счётчики умершего процесса должны суммироваться один раз'
+            assert sample(text, 'yatube_test_connections ') == 2, (
+                'Мгновенные значения умерших процессов не должны учитываться'
+            )
+        assert not (tmp_path / f'{process.pid}-old.json').exists()
+
+    def test_metrics_are_internal(self, client):
+        response = client.get('/metrics', REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == 404
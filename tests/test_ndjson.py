@@ -0,0 +1,62 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from posts.models import Comment, Follow, Group, Like, Post
+
+
+@pytest.fixture
+def dataset(mixer, user, another_user, group):
+    posts = mixer.cycle(5).blend(Post, author=user, group=group, image='')
+    for post in posts:
+        mixer.blend(Comment, post=post, author=another_user)
+    mixer.blend(Like, post=posts[0], user=another_user)
+    mixer.blend(Follow, user=another_user, author=user)
+    return posts
+
+
+class TestNdjson:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_round_trip(self, dataset, tmp_path, django_user_model):
+        path = str(tmp_path / 'dump.ndjson')
+        call_command('export_ndjson', path, chunk_size=2)
+        with open(path) as dump:
+            records = [json.loads(line) for line in dump]
+        assert len(records) == 2 + 1 + 5 + 5 + 1 + 1
+        old_texts = sorted(post.text for post in dataset)
+        old_dates = sorted(Post.objects.values_list('pub_date', flat=True))
+
+        django_user_model.objects.all().delete()
+        Group.objects.all().delete()
+
+        call_command('import_ndjson', path, batch_size=2)
+        assert sorted(Post.objects.values_list('text', flat=True)) == old_texts
+        assert sorted(
+            Post.objects.values_list('pub_date', flat=True)
+        ) == old_dates, 'Проверьте, что импорт сохраняет даты публикации'
+        author = django_user_model.objects.get(username='TestUser')
+        assert author.posts.count() == 5, (
+            'Проверьте, что внешние ключи переназначаются при импорте'
+        )
+        assert Comment.objects.filter(author__username='AnotherUser').count() == 5
+        assert Follow.objects.get().author == author
+        assert Post.objects.filter(group__slug='test-link').count() == 5
+        assert Like.objects.get().post.text == dataset[0].text
+
+        call_command('import_ndjson', path)
+        assert Post.objects.count() == 5, (
+            'Повторный запуск импорта должен продолжать с контрольной точки'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_resumes_from_checkpoint(self, dataset, tmp_path, user):
+        path = str(tmp_path / 'dump.ndjson')
+        call_command('export_ndjson', path)
+        Like.objects.create(post=dataset[1], user=user)
+        call_command('export_ndjson', path)
+        with open(path) as dump:
+            models = [json.loads(line)['model'] for line in dump]
+        assert models.count('posts.like') == 2
+        assert models.count('posts.post') == 5
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+from django.db import connection
+
+from posts import partitions
+from posts.models import Comment, Like
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='Секционирование проверяется только на PostgreSQL',
+)
+
+
+class TestMonths:
+
+    def test_add_months_crosses_year(self):
+        assert partitions.add_months(datetime(2024, 11, 1), 3) == (
+            datetime(2025, 2, 1)
+        )
+        assert partitions.add_months(datetime(2024, 1, 1), -1) == (
+            datetime(2023, 12, 1)
+        )
+
+    def test_partition_name(self):
+        assert partitions.partition_name(
+            'posts_like', partitions.month_start(datetime(2024, 3, 17, 12))
+        ) == 'posts_like_2024_03'
+
+
+@postgres_only
+class TestPartitions:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_convert_keeps_rows_and_detaches_old_months(self, user, post):
+        now = datetime(2024, 5, 10)
+        for created in (datetime(2024, 1, 5), datetime(2024, 4, 20)):
+            comment = Comment.objects.create(post=post, author=user, text='x')
+            Comment.objects.filter(pk=comment.pk).update(created=created)
+        Like.objects.create(post=post, user=user)
+
+        assert partitions.convert(connection, Comment, 'created', 1, now)
+        assert not partitions.convert(connection, Comment, 'created', 1, now)
+        partitions.convert(connection, Like, 'created', 1, now)
+        with connection.cursor() as cursor:
+            months = partitions.partitions(cursor, 'posts_comment')
+        assert sorted(months) == [datetime(2024, month, 1)
+                                  for month in range(1, 7)], (
+            'Секции должны покрывать месяцы от первой строки до now + ahead'
+        )
+        assert Comment.objects.count() == 2
+        Comment.objects.create(post=post, author=user, text='новый')
+        assert Comment.objects.count() == 3, (
+            'После секционирования вставка должна работать как раньше'
+        )
+
+        detached = partitions.detach_before(
+            connection, Comment, datetime(2024, 3, 1)
+        )
+        try:
+            assert detached == ['posts_comment_2024_01',
+                                'posts_comment_2024_02']
+            assert Comment.objects.count() == 2
+        finally:
+            with connection.cursor() as cursor:
+                for name in detached:
+                    cursor.execute(f'DROP TABLE {name}')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_ensure_moves_rows_from_default(self, user, post):
+        # Таблицу мог уже секционировать предыдущий тест: берём месяцы
+        # раньше его секций.
+        partitions.convert(
+            connection, Comment, 'created', 0, datetime(2023, 1, 1)
+        )
+        comment = Comment.objects.create(post=post, author=user, text='x')
+        Comment.objects.filter(pk=comment.pk).update(
+            created=datetime(2023, 3, 2)
+        )
+        created = partitions.ensure(
+            connection, Comment, 'created', 0, datetime(2023, 3, 1)
+        )
+        assert 'posts_comment_2023_03' in created
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM posts_comment_2023_03')
+            assert cursor.fetchone()[0] == 1, (
+                'Строки месяца должны переехать из _default в его секцию'
+            )
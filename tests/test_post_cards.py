@@ -0,0 +1,78 @@
+import pytest
+from django.core.cache import cache
+
+from posts import bulk
+from posts.cards import render_cards
+from posts.models import Group, Post
+
+
+def feed(user):
+    return Post.objects.filter(author=user).select_related('author', 'group')
+
+
+class TestPostCards:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cards_are_fetched_from_cache(self, mixer, user, group,
+                                          django_assert_num_queries):
+        cache.clear()
+        mixer.cycle(3).blend(Post, author=user, group=group, image='')
+        first = render_cards(feed(user), 'feed')
+        posts = list(feed(user))
+        with django_assert_num_queries(0):
+            second = render_cards(posts, 'feed')
+        assert [html for _, html in first] == [html for _, html in second]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_edit_renders_new_card(self, post_with_group):
+        cache.clear()
+        render_cards([post_with_group], 'profile')
+        post_with_group.text = 'Исправленный текст'
+        post_with_group.save()
+        [(_, html)] = render_cards([post_with_group], 'profile')
+        assert 'Исправленный текст' in html, (
+            'Правка поста должна сбрасывать его карточку'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_move_renders_new_card(self, post_with_group):
+        cache.clear()
+        render_cards(Post.objects.all(), 'feed')
+        new_group = Group.objects.create(
+            title='Другая', slug='other', description='-'
+        )
+        bulk.move_posts(Post.objects.all(), new_group)
+        [(_, html)] = render_cards(Post.objects.all(), 'feed')
+        assert '/group/other/' in html, (
+            'Перенос в другую группу должен сбрасывать карточку'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rename_renders_new_card(self, post_with_group):
+        cache.clear()
+        render_cards(Post.objects.all(), 'feed')
+        group = post_with_group.group
+        group.title = 'Переименованная'
+        group.save()
+        author = post_with_group.author
+        author.first_name, author.last_name = 'Новое', 'Имя'
+        author.save()
+        [(_, html)] = render_cards(
+            Post.objects.select_related('author', 'group'), 'feed'
+        )
+        assert 'Переименованная' in html, (
+            'Переименование группы должно сбрасывать карточки её постов'
+        )
+        assert 'Новое Имя' in html, (
+            'Смена имени автора должна сбрасывать карточки его постов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feeds_render_cards(self, client, post_with_group):
+        cache.clear()
+        username = post_with_group.author.username
+        for url in ('/', '/group/test-link/', f'/profile/{username}/'):
+            response = client.get(url)
+            assert 'Тестовый пост 2' in response.content.decode(), (
+                f'Страница `{url}` должна выводить карточки постов'
+            )
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+from core import profiler
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestProfiler:
+
+    def test_samples_are_folded_stacks(self, settings, tmp_path):
+        settings.PROFILE_DIR = str(tmp_path)
+        settings.PROFILE_INTERVAL = 0.001
+        sampler = profiler.start()
+        busy(0.05)
+        name = profiler.stop(sampler, 'posts:index')
+        lines = (tmp_path / name).read_text().splitlines()
+        assert lines, 'Профиль должен содержать снятые стеки'
+        stack, samples = lines[0].rsplit(' ', 1)
+        assert int(samples) > 0
+        assert 'test_profiler.py:busy' in stack.split(';')[-1], (
+            'Стек должен заканчиваться выполняемой функцией'
+        )
+
+    def test_trim_keeps_latest(self, settings, tmp_path):
+        settings.PROFILE_DIR = str(tmp_path)
+        settings.PROFILE_INTERVAL = 0.001
+        for _ in range(3):
+            profiler.stop(profiler.start(), 'x')
+        profiler.trim(keep=1)
+        assert len(list(tmp_path.glob('*.folded'))) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_header_profiles_only_staff(self, user_client, user, settings,
+                                        tmp_path):
+        settings.PROFILE_DIR = str(tmp_path)
+        response = user_client.get('/', HTTP_X_PROFILE='1')
+        assert 'X-Profile-File' not in response, (
+            'Профилировать по заголовку можно только сотрудникам'
+        )
+        user.is_staff = True
+        user.save()
+        response = user_client.get('/', HTTP_X_PROFILE='1')
+        assert (tmp_path / response['X-Profile-File']).exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_sampled_requests(self, client, settings, tmp_path):
+        settings.PROFILE_DIR = str(tmp_path)
+        settings.PROFILE_SAMPLE_RATE = 1
+        response = client.get('/')
+        assert 'X-Profile-File' not in response
+        assert list(tmp_path.glob('*posts_index*.folded')), (
+            'Доля PROFILE_SAMPLE_RATE запросов должна профилироваться'
+        )
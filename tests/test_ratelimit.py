@@ -0,0 +1,77 @@
+import time
+
+import pytest
+from django.core.cache import cache
+
+from core import ratelimit
+
+
+class TestRateLimit:
+
+    def test_consume_slides_window(self):
+        cache.clear()
+        assert ratelimit.consume('key', '2/m', now=60) == 0
+        assert ratelimit.consume('key', '2/m', now=70) == 0
+        assert ratelimit.consume('key', '2/m', now=75) == 75
+        assert ratelimit.consume('key', '2/m', now=121) == 29, (
+            'Проверьте, что на стыке окон нельзя превысить limit'
+        )
+        assert ratelimit.consume('key', '2/m', now=150) == 0
+
+    def test_refused_requests_do_not_spend_budget(self):
+        cache.clear()
+        assert ratelimit.consume('key', '1/m', now=0) == 0
+        for _ in range(5):
+            assert ratelimit.consume('key', '1/m', now=30) > 0
+        assert ratelimit.consume('key', '1/m', now=120) == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_like_is_limited(self, user_client, post, settings):
+        cache.clear()
+        settings.RATELIMITS = {
+            'posts:like': {'methods': ('GET',), 'user': '2/m', 'ip': '100/m'},
+        }
+        post.count_likes = 0
+        post.save()
+        for _ in range(2):
+            assert user_client.get(f'/like/{post.id}/').status_code == 302
+        response = user_client.get(f'/like/{post.id}/')
+        assert response.status_code == 429, (
+            'Проверьте, что сверх бюджета возвращается 429'
+        )
+        # Скользящее окно: ждать, пока не освободится место, не дольше
+        # остатка текущего окна и ещё одного окна.
+        assert 1 <= int(response['Retry-After']) <= 120
+
+    @pytest.mark.django_db(transaction=True)
+    def test_ip_budget_applies_to_anonymous(self, client, settings):
+        cache.clear()
+        settings.RATELIMITS = {
+            'posts:post_create': {'methods': ('POST',), 'ip': '1/h'},
+        }
+        assert client.post('/create/').status_code == 302
+        assert client.post('/create/').status_code == 429
+        assert client.get('/create/').status_code == 302, (
+            'GET-запросы к форме не должны расходовать бюджет записи'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_refusal_refunds_other_buckets(self, user_client, user, post,
+                                           settings):
+        cache.clear()
+        settings.RATELIMITS = {
+            'posts:like': {'methods': ('GET',), 'user': '100/m', 'ip': '1/m'},
+        }
+        post.count_likes = 0
+        post.save()
+        user_client.get(f'/like/{post.id}/')
+        assert user_client.get(f'/like/{post.id}/').status_code == 429
+        window = int(time.time() // 60)
+        counters = cache.get_many([
+            f'ratelimit:posts:like:user:{user.pk}:{number}'
+            for number in (window - 1, window)
+        ])
+        assert sum(counters.values()) == 1, (
+            'Запрос, отклонённый по IP, не должен расходовать бюджет '
+            'пользователя'
+        )
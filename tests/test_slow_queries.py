@@ -0,0 +1,92 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+
+from core import jobs, slow_queries
+from core.models import Job, SlowQuery
+from posts.models import Post
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='Отдельное соединение для журнала используется на PostgreSQL',
+)
+
+
+class TestSlowQueries:
+
+    def test_fingerprint_ignores_literals(self):
+        assert slow_queries.fingerprint(
+            "SELECT * FROM t WHERE id IN (%s, %s) AND name = 'a'"
+        ) == slow_queries.fingerprint(
+            "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'bb'"
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_slow_queries_are_logged_with_origin(self, client, post,
+                                                 settings):
+        cache.clear()
+        settings.SLOW_QUERY_MS = 0
+        client.get('/')
+        settings.SLOW_QUERY_MS = 10 ** 6
+        logged = SlowQuery.objects.filter(view='posts:index')
+        assert logged.exists(), (
+            'Медленные запросы должны записываться с именем маршрута'
+        )
+        assert logged.filter(
+            template__startswith='posts/index.html:'
+        ).exists(), 'Запрос из шаблона должен указывать строку шаблона'
+        assert not logged.filter(source='').exists()
+        assert not logged.exclude(plan='').exists(), (
+            'EXPLAIN должен сниматься в фоне, а не в запросе'
+        )
+
+        jobs.run_pending()
+        query = logged.filter(sql__startswith='SELECT').first()
+        query.refresh_from_db()
+        assert query.plan and query.explained_at, (
+            'Фоновая задача должна сохранить план запроса'
+        )
+
+        out = StringIO()
+        call_command('slow_queries', '--group', '--plans', stdout=out)
+        assert query.fingerprint and 'мс' in out.getvalue()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_params_go_only_to_explain_job(self, post, settings):
+        settings.SLOW_QUERY_MS = 0
+        with transaction.atomic():
+            Post.objects.filter(text='секрет').exists()
+        settings.SLOW_QUERY_MS = 10 ** 6
+        query = SlowQuery.objects.get(sql__contains='"text"')
+        job = Job.objects.get(payload__pk=query.pk)
+        assert json.loads(job.payload['params']) == ['секрет'], (
+            'Параметры нужны только задаче EXPLAIN'
+        )
+        assert 'секрет' not in query.sql and not hasattr(query, 'params')
+
+    @postgres_only
+    @pytest.mark.django_db(transaction=True)
+    def test_rolled_back_request_keeps_record(self, post, settings):
+        settings.SLOW_QUERY_MS = 0
+        with transaction.atomic():
+            Post.objects.filter(text='откат').exists()
+            settings.SLOW_QUERY_MS = 10 ** 6
+            transaction.set_rollback(True)
+        assert SlowQuery.objects.filter(sql__contains='"text"').exists(), (
+            'Запись журнала не должна откатываться вместе с запросом'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_trim_keeps_latest(self):
+        for number in range(5):
+            SlowQuery.objects.create(
+                sql=f'SELECT {number}', duration_ms=1, database='default',
+            )
+        slow_queries.trim(keep=2)
+        assert list(SlowQuery.objects.order_by('pk').values_list(
+            'sql', flat=True
+        )) == ['SELECT 3', 'SELECT 4']
@@ -0,0 +1,48 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from posts import bulk
+from posts.models import Comment, Like, Post, User
+
+
+class TestSoftDelete:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_delete_hides_post_until_purge(self, user_client, user,
+                                           another_user, mock_media):
+        image = default_storage.save('posts/x.gif', ContentFile(b'GIF89a'))
+        post = Post.objects.create(text='Пост', author=user, image=image)
+        Comment.objects.create(post=post, author=another_user, text='к')
+        Like.objects.create(post=post, user=another_user)
+
+        user_client.get(f'/posts/{post.id}/delet/')
+        assert not Post.objects.filter(pk=post.pk).exists(), (
+            'Удалённый пост должен сразу пропадать из выборок'
+        )
+        assert Post.all_objects.filter(pk=post.pk).exists()
+        assert default_storage.exists(image)
+
+        call_command('purge_hidden', batch_size=1)
+        assert not Post.all_objects.exists()
+        assert not Comment.objects.exists()
+        assert not Like.objects.exists()
+        assert not default_storage.exists(image), (
+            'После удаления поста его картинка должна удаляться'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_hidden_author(self, client, user, another_user, mixer):
+        mixer.cycle(3).blend(Post, author=user, image='')
+        kept = mixer.blend(Post, author=another_user, image='')
+        bulk.hide_author(user)
+        assert client.get(f'/profile/{user.username}/').status_code == 404
+        assert list(Post.objects.all()) == [kept]
+        user.refresh_from_db()
+        assert not user.is_active
+
+        posts, authors = bulk.purge_hidden(batch_size=2)
+        assert (posts, authors) == (3, 1)
+        assert not User.objects.filter(pk=user.pk).exists()
+        assert Post.objects.filter(pk=kept.pk).exists()
@@ -0,0 +1,77 @@
+import multiprocessing
+
+import pytest
+
+from core.cache_backends import sqlite
+from core.cache_backends.sqlite import SQLiteCache
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteCache(
+        str(tmp_path / 'cache.sqlite3'),
+        {'OPTIONS': {'MAX_ENTRIES': 10, 'CULL_FREQUENCY': 2}},
+    )
+
+
+def _incr_many(path, times):
+    backend = SQLiteCache(path, {})
+    for _ in range(times):
+        backend.incr('counter')
+
+
+class TestSQLiteCache:
+
+    def test_basic_operations(self, backend):
+        backend.set('key', {'a': 1})
+        assert backend.get('key') == {'a': 1}
+        assert backend.get_many(['key', 'missing']) == {'key': {'a': 1}}
+        assert not backend.add('key', 'other')
+        assert backend.add('new', 'value')
+        assert backend.delete('key')
+        assert backend.get('key', 'default') == 'default'
+
+    def test_expired_keys_are_invisible(self, backend):
+        backend.set('key', 'value', timeout=-1)
+        assert backend.get('key') is None
+        assert backend.add('key', 'fresh')
+        assert backend.get('key') == 'fresh'
+
+    def test_incr_and_versions(self, backend):
+        backend.set('counter', 1)
+        assert backend.incr('counter', 5) == 6
+        with pytest.raises(ValueError):
+            backend.incr('missing')
+        backend.set('key', 'v1', version=1)
+        backend.set('key', 'v2', version=2)
+        assert backend.get('key', version=1) == 'v1'
+        assert backend.incr_version('key', version=2) == 3
+        assert backend.get('key', version=3) == 'v2'
+
+    def test_lru_eviction(self, backend, monkeypatch):
+        monkeypatch.setattr(sqlite, 'LRU_RESOLUTION', 0)
+        monkeypatch.setattr(sqlite, 'CULL_CHECK_EVERY', 1)
+        backend.set('hot', 'value')
+        for i in range(20):
+            backend.get('hot')
+            backend.set(f'cold{i}', i)
+        assert backend.get('hot') == 'value', (
+            'Часто читаемый ключ не должен вытесняться'
+        )
+        assert backend.get('cold0') is None
+
+    def test_shared_between_processes(self, backend, tmp_path):
+        path = str(tmp_path / 'cache.sqlite3')
+        backend.set('counter', 0)
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=_incr_many, args=(path, 50))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert backend.get('counter') == 200, (
+            'incr должен быть атомарным между процессами'
+        )
@@ -0,0 +1,60 @@
+import pytest
+from django.core.cache import cache
+
+from core import jobs
+from posts import suggestions
+from posts.models import Follow, FollowSuggestion, Like
+
+
+class TestSuggestions:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_build_ranks_friends_of_friends(self, user, another_user,
+                                            mixer, post):
+        cache.clear()
+        User = type(user)
+        popular = mixer.blend(User, username='Popular')
+        rare = mixer.blend(User, username='Rare')
+        colike = mixer.blend(User, username='Colike')
+        Follow.objects.create(user=user, author=another_user)
+        Follow.objects.create(user=another_user, author=popular)
+        Follow.objects.create(user=another_user, author=rare)
+        Follow.objects.create(user=another_user, author=user)
+        Follow.objects.create(user=popular, author=rare)
+        Follow.objects.create(user=user, author=popular)
+        liker = mixer.blend(User, username='Liker')
+        Like.objects.create(user=user, post=post)
+        Like.objects.create(user=liker, post=post)
+        Follow.objects.create(user=liker, author=colike)
+
+        assert suggestions.build() >= 1
+        names = suggestions.for_user(user)
+        assert names == ['Rare', 'Colike'], (
+            'Подсказки должны быть отсортированы по оценке и не содержать '
+            'самого пользователя и тех, на кого он уже подписан'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_build_removes_stale_rows(self, user):
+        FollowSuggestion.objects.create(user=user, suggestions=[[1, 'x', 1]])
+        suggestions.build()
+        assert not FollowSuggestion.objects.filter(user=user).exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follow_updates_suggestions(self, user_client, user,
+                                        another_user, mixer):
+        cache.clear()
+        third = mixer.blend(type(user), username='Third')
+        Follow.objects.create(user=another_user, author=third)
+        FollowSuggestion.objects.create(
+            user=user, suggestions=[[another_user.pk, another_user.username, 1]]
+        )
+        user_client.get(f'/profile/{another_user.username}/follow/')
+        jobs.run_pending()
+        row = FollowSuggestion.objects.get(user=user)
+        assert [name for _, name, _ in row.suggestions] == ['Third'], (
+            'После подписки автор должен пропасть из подсказок, а его '
+            'подписки — появиться'
+        )
+        response = user_client.get('/follow/')
+        assert response.context['suggestions'] == ['Third']
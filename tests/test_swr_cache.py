@@ -0,0 +1,72 @@
+import pytest
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from core import cache as swr
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+class TestStaleWhileRevalidate:
+
+    def test_fresh_value_is_computed_once(self):
+        cache.clear()
+        compute = Counter()
+        assert swr.get_or_compute('key', compute, 60, beta=0) == 1
+        assert swr.get_or_compute('key', compute, 60, beta=0) == 1
+        assert compute.calls == 1
+
+    def test_stale_value_served_while_other_recomputes(self):
+        cache.clear()
+        compute = Counter()
+        swr.get_or_compute('key', compute, 0, hard_ttl=60)
+        cache.add('lock:key', 1)
+        assert swr.get_or_compute('key', compute, 0, hard_ttl=60) == 1, (
+            'Пока значение пересчитывает другой запрос, отдаётся устаревшее'
+        )
+        cache.delete('lock:key')
+        assert swr.get_or_compute('key', compute, 0, hard_ttl=60) == 2
+
+    def test_waits_for_lock_holder_then_computes(self, monkeypatch):
+        cache.clear()
+        monkeypatch.setattr(swr, 'WAIT_TIMEOUT', 0.1)
+        cache.add('lock:key', 1)
+        compute = Counter()
+        assert swr.get_or_compute('key', compute, 60) == 1
+        assert cache.get('key') is None, (
+            'Запрос без блокировки не должен перезаписывать кэш'
+        )
+
+    def test_early_expiration_probability(self):
+        assert not swr._expired_early(100, 1, 1.0, now=50)
+        assert swr._expired_early(100, 1, 1.0, now=100)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_fragment_is_cached(self, client, post):
+        cache.clear()
+        response = client.get('/')
+        key = make_template_fragment_key(
+            'index_page', [response.context['feed_version'], 1, False]
+        )
+        assert cache.get(key) is not None, (
+            'Проверьте, что главная страница кэширует фрагмент `index_page`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_shows_new_post_after_write(self, user_client, post):
+        cache.clear()
+        etag = user_client.get('/')['ETag']
+        user_client.post('/create/', data={'text': 'Свежий пост'})
+        response = user_client.get('/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert 'Свежий пост' in response.content.decode(), (
+            'Проверьте, что ключ фрагмента `index_page` зависит от версии '
+            'ленты и новый пост сразу виден на главной'
+        )
@@ -0,0 +1,152 @@
+import time
+
+import pytest
+from django.core.cache import caches
+
+from core.cache_backends.tiered import TieredCache
+
+
+def make_process(name, **options):
+    """Отдельный L1 — как у другого процесса над тем же L2."""
+    return TieredCache(
+        f'test-{name}', {'OPTIONS': {'L2': 'shared', **options}}
+    )
+
+
+@pytest.fixture
+def processes():
+    caches['shared'].clear()
+    first, second = (
+        make_process(name, L1_NAMESPACES=('feed:', 'user:'))
+        for name in ('first', 'second')
+    )
+    for backend in (first, second):
+        backend._l1.flush()
+    return first, second
+
+
+class TestTieredCache:
+
+    def test_reads_are_served_from_l1(self, processes):
+        first, _ = processes
+        first.set('key', 'value')
+        assert first.get('key') == 'value'
+        hits = first.stats()['hits']
+        assert first.get('key') == 'value'
+        assert first.get('key') == 'value'
+        assert first.stats()['hits'] - hits == 2, (
+            'Повторные чтения должны обслуживаться из памяти процесса'
+        )
+
+    def test_other_process_sees_write_after_sync(self, processes):
+        first, second = processes
+        first.set('key', 'old')
+        assert second.get('key') == 'old'
+        first.set('key', 'new')
+        # То же делает сигнал request_started в начале запроса.
+        second._l1.mark_stale()
+        assert second.get('key') == 'new', (
+            'В начале запроса L1 должен сбрасываться, '
+            'если другой процесс писал в кэш'
+        )
+
+    def test_own_writes_do_not_flush_l1(self, processes):
+        first, _ = processes
+        first.set('a', 1)
+        first.get('a')
+        first.set('b', 2)
+        flushes = first.stats()['flushes']
+        first._l1.mark_stale()
+        assert first.get('a') == 1
+        assert first.stats()['flushes'] == flushes
+
+    def test_write_drops_only_its_namespace(self, processes):
+        first, second = processes
+        first.set('feed:a', 1)
+        first.set('user:a', 1)
+        assert second.get('feed:a') == 1
+        assert second.get('user:a') == 1
+        first.set('feed:b', 2)
+        second._l1.mark_stale()
+        hits = second.stats()['hits']
+        assert second.get('user:a') == 1
+        assert second.stats()['hits'] - hits == 1, (
+            'Запись в другое пространство ключей не должна сбрасывать L1'
+        )
+        assert second.get('feed:a') == 1
+        assert second.stats()['hits'] - hits == 1
+
+    def test_unlisted_keys_share_one_namespace(self, processes):
+        first, _ = processes
+        for i in range(50):
+            first.set(f'template.cache.index.{i}', i)
+            first.get(f'template.cache.index.{i}')
+        assert first.stats()['namespaces'] == 1, (
+            'Ключи вне L1_NAMESPACES должны делить одно пространство'
+        )
+
+    def test_add_does_not_flush_other_processes(self, processes):
+        first, second = processes
+        first.set('user:a', 1)
+        assert second.get('user:a') == 1
+        assert first.add('user:b', 2)
+        second._l1.mark_stale()
+        hits = second.stats()['hits']
+        assert second.get('user:a') == 1
+        assert second.stats()['hits'] - hits == 1, (
+            'Заполнение кэша после промаха не должно сбрасывать L1'
+        )
+
+    def test_namespaces_without_keys_are_pruned(self, processes):
+        first, _ = processes
+        first.set('feed:a', 1)
+        first.set('user:a', 1)
+        first.get('feed:a')
+        first.get('user:a')
+        assert first.stats()['namespaces'] == 2
+        first.delete('feed:a')
+        assert first.stats()['namespaces'] == 1, (
+            'Пространство без ключей в L1 не должно сверяться'
+        )
+
+    def test_l1_ttl_is_capped_by_l2_ttl(self, processes):
+        first, second = processes
+        first.set('short', 'value', 1)
+        assert second.get('short') == 'value'
+        time.sleep(1.1)
+        assert second.get('short') is None, (
+            'Значение не должно жить в L1 дольше, чем в L2'
+        )
+
+    def test_versioned_keys_do_not_bump(self):
+        first = make_process('versioned', L1_VERSIONED=('card:',))
+        first._l1.flush()
+        first.set('card:1', 'value')
+        assert first.stats()['namespaces'] == 0, (
+            'Запись версионированного ключа не должна двигать поколение'
+        )
+
+    def test_bypassed_keys_skip_l1(self, processes):
+        first, second = processes
+        assert first.add('lock:key', 1)
+        assert first.incr('lock:key') == 2
+        assert second.get('lock:key') == 2
+        assert first.stats()['namespaces'] == 0, (
+            'Счётчики и блокировки не должны сбрасывать L1'
+        )
+
+    def test_l1_is_bounded(self):
+        backend = make_process('bounded', L1_MAX_ENTRIES=3)
+        for i in range(10):
+            backend.set(f'key{i}', i)
+            backend.get(f'key{i}')
+        assert backend.stats()['entries'] == 3
+        assert backend.get('key0') == 0, 'Вытесненный из L1 ключ берётся из L2'
+
+    def test_l1_values_are_not_shared(self, processes):
+        first, _ = processes
+        first.set('key', [])
+        first.get('key').append(1)
+        assert first.get('key') == [], (
+            'Изменение прочитанного значения не должно попадать в L1'
+        )
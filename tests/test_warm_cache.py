@@ -0,0 +1,44 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from posts.cards import card_key
+from posts.management.commands import warm_cache
+from posts.models import GroupStats, Post
+
+
+class TestWarmCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_warms_pages_and_cards(self, mixer, user, group):
+        GroupStats.objects.filter(group=group).update(post_count=3)
+        posts = mixer.cycle(3).blend(Post, author=user, group=group, image='')
+        cache.clear()
+        out = StringIO()
+        call_command('warm_cache', workers=2, index_pages=2, stdout=out)
+        # 2 страницы ленты, группа, профиль и 3 поста.
+        assert 'Страниц: 7 из 7' in out.getvalue(), out.getvalue()
+        for variant in ('group', 'profile'):
+            assert cache.get(card_key(posts[0], variant)) is not None, (
+                'Прогрев должен рендерить карточки через настоящие шаблоны'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_failed_page_does_not_stop_warming(self, monkeypatch, post):
+        urls = warm_cache.Command.urls
+        monkeypatch.setattr(
+            warm_cache.Command, 'urls',
+            lambda self, options, posts: (
+                ['/profile/missing/'] + urls(self, options, posts)
+            ),
+        )
+        out, err = StringIO(), StringIO()
+        call_command(
+            'warm_cache', workers=2, index_pages=1, stdout=out, stderr=err
+        )
+        assert '/profile/missing/: Http404' in err.getvalue()
+        assert 'Страниц: 3 из 4' in out.getvalue(), (
+            'Ошибка одной страницы не должна прерывать прогрев остальных'
+        )
@@ -1,6 +1,7 @@
 from django.views.generic.base import TemplateView
 from django.shortcuts import render, get_object_or_404, redirect
-from posts.models import Follow, Post, Group, Comment, User
+from posts import follow_graph
+from posts.models import Post, Group, Comment, User
 
 
 class About(TemplateView):
@@ -12,8 +13,8 @@ class About(TemplateView):
 def about(request):
     post = Post.objects.filter(author=request.user)
     user = User.objects.get(username=request.user)
-    folow = Follow.objects.filter(user=request.user).count()
-    folower = Follow.objects.filter(author=request.user).count()
+    folow = follow_graph.followee_count(request.user.pk)
+    folower = follow_graph.follower_count(request.user.pk)
     
     context = {
         'count': post.count(),
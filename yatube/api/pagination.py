@@ -0,0 +1,8 @@
+from rest_framework.pagination import CursorPagination
+
+
+class FeedCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = 'limit'
+    max_page_size = 50
+    ordering = ('-pub_date', '-id')
@@ -0,0 +1,29 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.PostListView.as_view(), name='post_list'),
+    path(
+        'posts/<int:pk>/',
+        views.PostDetailView.as_view(),
+        name='post_detail',
+    ),
+    path(
+        'groups/<slug:slug>/posts/',
+        views.GroupPostListView.as_view(),
+        name='group_posts',
+    ),
+    path(
+        'profiles/<str:username>/posts/',
+        views.ProfilePostListView.as_view(),
+        name='profile_posts',
+    ),
+    path(
+        'follow/posts/',
+        views.FollowPostListView.as_view(),
+        name='follow_posts',
+    ),
+]
@@ -0,0 +1,73 @@
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions
+
+from posts import follow_graph
+from posts.models import Comment, Group, Post, User
+from .pagination import FeedCursorPagination
+from .serializers import (
+    PostDetailSerializer, PostSerializer, requested_fields,
+)
+
+
+class PostFeedMixin:
+    """Общий queryset лент: join только тех связей, что попадут в ответ."""
+
+    serializer_class = PostSerializer
+    pagination_class = FeedCursorPagination
+
+    def get_queryset(self):
+        queryset = self.filter_feed(Post.objects.all())
+        fields = requested_fields(self.request)
+        related = [
+            name for name in ('author', 'group')
+            if fields is None or name in fields
+        ]
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset
+
+    def filter_feed(self, queryset):
+        return queryset
+
+
+class PostListView(PostFeedMixin, generics.ListAPIView):
+    pass
+
+
+class GroupPostListView(PostFeedMixin, generics.ListAPIView):
+
+    def filter_feed(self, queryset):
+        group = get_object_or_404(Group, slug=self.kwargs['slug'])
+        return queryset.filter(group=group)
+
+
+class ProfilePostListView(PostFeedMixin, generics.ListAPIView):
+
+    def filter_feed(self, queryset):
+        author = get_object_or_404(User, username=self.kwargs['username'])
+        return queryset.filter(author=author)
+
+
+class FollowPostListView(PostFeedMixin, generics.ListAPIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def filter_feed(self, queryset):
+        return queryset.filter(
+            author_id__in=follow_graph.followees(self.request.user.pk)
+        )
+
+
+class PostDetailView(PostFeedMixin, generics.RetrieveAPIView):
+    serializer_class = PostDetailSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = requested_fields(self.request)
+        if fields is None or 'comments' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'comments',
+                queryset=Comment.objects.select_related('author')
+                .order_by('created'),
+            ))
+        return queryset
@@ -0,0 +1,23 @@
+from django.contrib import admin
+
+from .models import SlowQuery
+
+
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        'created', 'duration_ms', 'view', 'template', 'source', 'short_sql',
+    )
+    list_filter = ('view', 'database')
+    search_fields = ('sql', 'view', 'template', 'source', 'fingerprint')
+    ordering = ('-pk',)
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
+
+    @admin.display(description='SQL')
+    def short_sql(self, obj):
+        return obj.sql[:100]
+
+    def has_add_permission(self, request):
+        return False
+
+
+admin.site.register(SlowQuery, SlowQueryAdmin)
@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import metrics, slow_queries
+        connection_created.connect(metrics.install_db_wrapper)
+        if settings.SLOW_QUERY_MS is not None:
+            connection_created.connect(slow_queries.install_db_wrapper)
@@ -0,0 +1,66 @@
+"""Кэширование с защитой от «эффекта толпы».
+
+Значение хранится вместе со сроком мягкой свежести (soft_ttl) и временем,
+которое ушло на его вычисление; сам ключ живёт hard_ttl. Пересчитывает
+значение только тот запрос, который взял блокировку cache.add, остальные
+в это время получают устаревшее значение (stale-while-revalidate) или
+ждут. Незадолго до истечения soft_ttl значение с растущей вероятностью
+пересчитывается заранее (XFetch), чтобы ключи не истекали у всех разом.
+"""
+import math
+import random
+import time
+
+from django.core.cache import cache as default_cache
+
+LOCK_TIMEOUT = 10
+WAIT_TIMEOUT = 2
+POLL_INTERVAL = 0.05
+HARD_TTL_FACTOR = 5
+
+
+def _expired_early(soft_expires, delta, beta, now):
+    # 1 - random() лежит в (0, 1], логарифм от него не падает.
+    return now - delta * beta * math.log(1.0 - random.random()) >= (
+        soft_expires
+    )
+
+
+def _recompute(cache, key, compute, soft_ttl, hard_ttl):
+    started = time.time()
+    try:
+        value = compute()
+        delta = time.time() - started
+        cache.set(key, (value, started + soft_ttl, delta), hard_ttl)
+    finally:
+        cache.delete(f'lock:{key}')
+    return value
+
+
+def get_or_compute(key, compute, soft_ttl, hard_ttl=None, beta=1.0,
+                   cache=default_cache):
+    """Возвращает значение ключа, пересчитывая его не более чем в одном
+    запросе одновременно."""
+    if hard_ttl is None:
+        hard_ttl = soft_ttl * HARD_TTL_FACTOR
+    lock_key = f'lock:{key}'
+    entry = cache.get(key)
+    if entry is not None:
+        value, soft_expires, delta = entry
+        if not _expired_early(soft_expires, delta, beta, time.time()):
+            return value
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            # Пересчитывает кто-то другой: отдаём устаревшее.
+            return value
+        return _recompute(cache, key, compute, soft_ttl, hard_ttl)
+
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        return _recompute(cache, key, compute, soft_ttl, hard_ttl)
+    deadline = time.time() + WAIT_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    # Держатель блокировки не успел: считаем сами, но не мешаем ему.
+    return compute()
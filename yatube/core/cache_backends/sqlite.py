@@ -0,0 +1,258 @@
+"""Кэш, общий для всех процессов на одной машине.
+
+Хранилище — файл SQLite в режиме WAL: читатели не блокируют писателя,
+а атомарность add/incr обеспечивают транзакции BEGIN IMMEDIATE.
+Целые числа хранятся как INTEGER (incr обходится без pickle),
+остальные значения — pickle. При переполнении вытесняются давно
+не читавшиеся ключи (LRU с точностью до LRU_RESOLUTION секунд).
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.sqlite.SQLiteCache',
+            'LOCATION': '/var/tmp/yatube-cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        }
+    }
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Время последнего чтения обновляется не чаще, чем раз в столько секунд,
+# чтобы чтения не превращались в запись на каждом обращении.
+LRU_RESOLUTION = 10
+# Проверять переполнение раз в столько записей.
+CULL_CHECK_EVERY = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB,
+    expires REAL,
+    accessed REAL
+);
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+"""
+
+
+def _dump(value):
+    if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+        return value
+    return sqlite3.Binary(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def _load(value):
+    if isinstance(value, int):
+        return value
+    return pickle.loads(value)
+
+
+class SQLiteCache(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        # После fork соединение родителя использовать нельзя.
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self._path, timeout=10, isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @contextmanager
+    def _write(self):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _fetch(self, keys, with_expiry=False):
+        now = time.time()
+        rows = self._connection().execute(
+            'SELECT key, value, accessed, expires FROM cache WHERE key IN '
+            f'({",".join("?" * len(keys))}) '
+            'AND (expires IS NULL OR expires > ?)',
+            [*keys, now],
+        ).fetchall()
+        stale = [row[0] for row in rows if row[2] < now - LRU_RESOLUTION]
+        if stale:
+            self._connection().execute(
+                'UPDATE cache SET accessed = ? WHERE key IN '
+                f'({",".join("?" * len(stale))})',
+                [now, *stale],
+            )
+        if with_expiry:
+            return {
+                key: (_load(value), expires)
+                for key, value, _, expires in rows
+            }
+        return {key: _load(value) for key, value, _, _ in rows}
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        return self._fetch([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        found = self._fetch(list(keys))
+        return {keys[key]: value for key, value in found.items()}
+
+    def get_many_with_expiry(self, keys, version=None):
+        """{ключ: (значение, срок по time.time() или None)} — чтобы
+        кэш уровнем выше не держал значение дольше, чем оно живёт здесь."""
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        found = self._fetch(list(keys), with_expiry=True)
+        return {keys[key]: entry for key, entry in found.items()}
+
+    def _store(self, connection, key, value, timeout):
+        connection.execute(
+            'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)',
+            (key, _dump(value), self.get_backend_timeout(timeout),
+             time.time()),
+        )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._write() as connection:
+            self._store(connection, key, value, timeout)
+        self._maybe_cull(1)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._write() as connection:
+            for key, value in data.items():
+                self._store(
+                    connection, self._key(key, version), value, timeout
+                )
+        self._maybe_cull(len(data))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._write() as connection:
+            connection.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                (key, time.time()),
+            )
+            added = connection.execute(
+                'INSERT OR IGNORE INTO cache VALUES (?, ?, ?, ?)',
+                (key, _dump(value), self.get_backend_timeout(timeout),
+                 time.time()),
+            ).rowcount == 1
+        if added:
+            self._maybe_cull(1)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        with self._write() as connection:
+            row = connection.execute(
+                'SELECT value FROM cache WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            if isinstance(row[0], int):
+                value = row[0] + delta
+            else:
+                value = _load(row[0]) + delta
+            connection.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (_dump(value), key),
+            )
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._write() as connection:
+            return connection.execute(
+                'UPDATE cache SET expires = ? WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), key, time.time()),
+            ).rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        with self._write() as connection:
+            return connection.execute(
+                'DELETE FROM cache WHERE key = ?', (key,)
+            ).rowcount == 1
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if not keys:
+            return
+        with self._write() as connection:
+            connection.execute(
+                'DELETE FROM cache WHERE key IN '
+                f'({",".join("?" * len(keys))})',
+                keys,
+            )
+
+    def has_key(self, key, version=None):
+        return self.get(key, self, version) is not self
+
+    def clear(self):
+        with self._write() as connection:
+            connection.execute('DELETE FROM cache')
+
+    def _maybe_cull(self, writes):
+        self._writes += writes
+        if self._writes < CULL_CHECK_EVERY:
+            return
+        self._writes = 0
+        self._cull()
+
+    def _cull(self):
+        with self._write() as connection:
+            connection.execute(
+                'DELETE FROM cache WHERE expires <= ?', (time.time(),)
+            )
+            count = connection.execute(
+                'SELECT COUNT(*) FROM cache'
+            ).fetchone()[0]
+            if count <= self._max_entries:
+                return
+            excess = count - self._max_entries
+            if self._cull_frequency:
+                excess = max(excess, count // self._cull_frequency)
+            connection.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY accessed LIMIT ?)',
+                (excess,),
+            )
+
+    def close(self, **kwargs):
+        # Соединения живут всё время работы потока: открывать файл
+        # на каждый запрос дороже, чем держать его открытым.
+        pass
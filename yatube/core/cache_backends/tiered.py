@@ -0,0 +1,347 @@
+"""Двухуровневый кэш: LRU в памяти процесса (L1) перед общим кэшем (L2).
+
+Когерентность держится на счётчиках поколений в L2, по одному на
+пространство ключей. Пространства задаются префиксами в L1_NAMESPACES,
+ключи, не подходящие ни к одному, попадают в общее пространство OTHER:
+счётчиков столько же, сколько префиксов, сколько бы разных ключей ни
+было. Запись через этот бэкенд увеличивает счётчик своего пространства,
+а процесс при расхождении выбрасывает из L1 только ключи этого
+пространства. Поколения сверяются в начале каждого запроса (сигнал
+request_started) и не реже раза в SYNC_INTERVAL секунд вне запросов,
+и только у пространств, ключи которых сейчас лежат в L1.
+
+add() поколение не двигает: он не перезаписывает значение, а заполняет
+ключ после промаха, и другого значения по этому ключу ни у кого в L1
+нет. Поэтому заполнять кэш после промаха нужно через add(), а set()
+оставить для настоящих изменений.
+
+Значение живёт в L1 не дольше L1_TIMEOUT и не дольше, чем в L2: срок
+берётся из L2, если тот умеет его отдать (get_many_with_expiry).
+
+Ключи с префиксами из L1_BYPASS (счётчики, блокировки) в L1 не попадают
+и поколение не двигают. Ключи с префиксами из L1_VERSIONED содержат
+версию значения (карточки постов): по одному ключу всегда лежит одно и то
+же, поэтому их запись тоже не двигает поколение.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.tiered.TieredCache',
+            'LOCATION': 'tiered',
+            'OPTIONS': {
+                'L2': 'shared',
+                'L1_MAX_ENTRIES': 2000,
+                'L1_NAMESPACES': ('user:', 'follow:', ...),
+            },
+        },
+        'shared': {...},
+    }
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.signals import request_started
+
+GENERATION_PREFIX = 'tiered:generation:'
+# Пространство ключей, не подходящих ни к одному префиксу L1_NAMESPACES.
+OTHER = '*'
+SYNC_INTERVAL = 1.0
+
+_MISSING = object()
+# Как и у LocMemCache, L1 общий для всех потоков процесса, а значения
+# в нём хранятся в pickle: запросы не должны делить изменяемые объекты.
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _generation_key(name):
+    return GENERATION_PREFIX + name
+
+
+class L1Store:
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        # ключ -> (pickle, срок по monotonic, пространство)
+        self.data = OrderedDict()
+        self.keys_by_namespace = defaultdict(set)
+        # пространство -> поколение, при котором читались его ключи;
+        # есть только у пространств, ключи которых лежат в L1
+        self.generations = {}
+        self.lock = threading.Lock()
+        self.synced_at = 0.0
+        self.needs_sync = True
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        request_started.connect(self.mark_stale, weak=False)
+
+    def mark_stale(self, **kwargs):
+        self.needs_sync = True
+
+    def get(self, key):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                self.misses += 1
+                return _MISSING
+            self.data.move_to_end(key)
+            self.hits += 1
+            pickled = entry[0]
+        return pickle.loads(pickled)
+
+    def _pop(self, key):
+        entry = self.data.pop(key, None)
+        if entry is not None:
+            keys = self.keys_by_namespace[entry[2]]
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_namespace[entry[2]]
+                self.generations.pop(entry[2], None)
+
+    def put(self, key, value, name, generation, ttl):
+        """Кладёт значение, прочитанное при поколении generation своего
+        пространства. Если поколение с тех пор сменилось, значение могло
+        устареть, и в L1 оно не попадает."""
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        ttl = self.timeout if ttl is None else min(ttl, self.timeout)
+        with self.lock:
+            self._pop(key)
+            if self.generations.get(name, generation) != generation:
+                return
+            self.generations[name] = generation
+            self.data[key] = (pickled, time.monotonic() + ttl, name)
+            self.keys_by_namespace[name].add(key)
+            while len(self.data) > self.max_entries:
+                self._pop(next(iter(self.data)))
+
+    def discard(self, keys):
+        with self.lock:
+            for key in keys:
+                self._pop(key)
+
+    def drop_namespace(self, name):
+        with self.lock:
+            self.generations.pop(name, None)
+            keys = self.keys_by_namespace.pop(name, None)
+            if keys:
+                for key in keys:
+                    self.data.pop(key, None)
+                self.flushes += 1
+
+    def flush(self):
+        with self.lock:
+            self.data.clear()
+            self.keys_by_namespace.clear()
+            self.generations.clear()
+            self.flushes += 1
+
+
+class TieredCache(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', 'shared')
+        self._bypass = tuple(options.get('L1_BYPASS', ('ratelimit:', 'lock:')))
+        self._versioned = tuple(options.get('L1_VERSIONED', ()))
+        self._namespaces = tuple(options.get('L1_NAMESPACES', ()))
+        with _stores_lock:
+            if location not in _stores:
+                _stores[location] = L1Store(
+                    options.get('L1_MAX_ENTRIES', 2000),
+                    options.get('L1_TIMEOUT', 60),
+                )
+            self._l1 = _stores[location]
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _bypassed(self, key):
+        return key.startswith(self._bypass)
+
+    def _namespace(self, key):
+        for prefix in self._namespaces:
+            if key.startswith(prefix):
+                return prefix
+        return OTHER
+
+    def _l1_key(self, key, version):
+        return self.make_key(key, version=version)
+
+    def _sync(self):
+        store = self._l1
+        now = time.monotonic()
+        if not store.needs_sync and now - store.synced_at < SYNC_INTERVAL:
+            return
+        store.needs_sync = False
+        store.synced_at = now
+        names = list(store.generations)
+        if not names:
+            return
+        current = self.l2.get_many(map(_generation_key, names))
+        for name in names:
+            if current.get(_generation_key(name)) != (
+                store.generations.get(name, _MISSING)
+            ):
+                store.drop_namespace(name)
+
+    def _track(self, keys):
+        """{пространство: поколение} для пространств keys. Читать
+        поколения нужно до самих значений: запись между чтениями поднимет
+        поколение, и L1Store.put не примет устаревшее значение."""
+        known = dict(self._l1.generations)
+        names = {self._namespace(key) for key in keys}
+        unknown = names - set(known)
+        if unknown:
+            current = self.l2.get_many(map(_generation_key, unknown))
+            for name in unknown:
+                known[name] = current.get(_generation_key(name))
+        return known
+
+    def _fetch(self, keys, version):
+        """{ключ: (значение, оставшийся срок в L2 или None)}."""
+        fetch = getattr(self.l2, 'get_many_with_expiry', None)
+        if fetch is None:
+            return {
+                key: (value, None)
+                for key, value in self.l2.get_many(keys, version).items()
+            }
+        now = time.time()
+        return {
+            key: (value, None if expires is None else expires - now)
+            for key, (value, expires) in fetch(keys, version).items()
+        }
+
+    def _fill(self, keys, version):
+        generations = self._track(keys)
+        found = {}
+        for key, (value, ttl) in self._fetch(keys, version).items():
+            name = self._namespace(key)
+            self._l1.put(
+                self._l1_key(key, version), value, name, generations[name],
+                ttl,
+            )
+            found[key] = value
+        return found
+
+    def _bump(self, names):
+        """Сообщает остальным процессам, что ключи пространств names
+        в их L1 устарели."""
+        store = self._l1
+        for name in names:
+            key = _generation_key(name)
+            try:
+                generation = self.l2.incr(key)
+            except ValueError:
+                # Начинаем не с нуля: если счётчик вытеснили из L2, новый
+                # не должен совпасть с поколением, запомненным процессом.
+                self.l2.add(key, time.time_ns(), None)
+                generation = self.l2.incr(key)
+            with store.lock:
+                known = store.generations.get(name)
+                if known is not None and generation == known + 1:
+                    store.generations[name] = generation
+                    continue
+            # Между нашими записями поколение двигал кто-то ещё.
+            store.drop_namespace(name)
+
+    def get(self, key, default=None, version=None):
+        if self._bypassed(key):
+            return self.l2.get(key, default, version)
+        self._sync()
+        value = self._l1.get(self._l1_key(key, version))
+        if value is not _MISSING:
+            return value
+        return self._fill([key], version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        self._sync()
+        found, rest, bypassed = {}, [], []
+        for key in keys:
+            if self._bypassed(key):
+                bypassed.append(key)
+                continue
+            value = self._l1.get(self._l1_key(key, version))
+            if value is _MISSING:
+                rest.append(key)
+            else:
+                found[key] = value
+        if rest:
+            found.update(self._fill(rest, version))
+        if bypassed:
+            found.update(self.l2.get_many(bypassed, version))
+        return found
+
+    def _written(self, keys, version, bump=True):
+        keys = [key for key in keys if not self._bypassed(key)]
+        if keys:
+            self._l1.discard(self._l1_key(key, version) for key in keys)
+        if keys and bump:
+            self._bump({
+                self._namespace(key) for key in keys
+                if not key.startswith(self._versioned)
+            })
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version)
+        self._written([key], version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout, version)
+        self._written(list(data), version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version)
+        if added:
+            self._written([key], version, bump=False)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version)
+        self._written([key], version)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        touched = self.l2.touch(key, timeout, version)
+        self._written([key], version)
+        return touched
+
+    def delete(self, key, version=None):
+        deleted = self.l2.delete(key, version)
+        self._written([key], version)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.l2.delete_many(keys, version)
+        self._written(keys, version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version) is not _MISSING
+
+    def clear(self):
+        # Счётчики поколений удаляются вместе с L2: остальные процессы
+        # увидят расхождение и сбросят свои L1.
+        self.l2.clear()
+        self._l1.flush()
+
+    def stats(self):
+        store = self._l1
+        total = store.hits + store.misses
+        return {
+            'hits': store.hits,
+            'misses': store.misses,
+            'hit_ratio': store.hits / total if total else 0.0,
+            'entries': len(store.data),
+            'flushes': store.flushes,
+            'namespaces': len(store.generations),
+        }
@@ -0,0 +1,17 @@
+from functools import wraps
+
+from django.utils.functional import SimpleLazyObject
+
+
+def lazy_processor(name):
+    """Делает из функции request -> значение контекстный процессор.
+
+    Значение вычисляется, только когда шаблон обращается к переменной name,
+    и не больше одного раза за рендер.
+    """
+    def decorator(func):
+        @wraps(func)
+        def processor(request):
+            return {name: SimpleLazyObject(lambda: func(request))}
+        return processor
+    return decorator
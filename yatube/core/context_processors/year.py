@@ -1,9 +1,9 @@
 from datetime import datetime
 
+from .lazy import lazy_processor
 
+
+@lazy_processor('year')
 def year(request):
     """Добавляет переменную с текущим годом."""
-    dt = datetime.now()
-    return {
-        'year': dt.year
-    }
+    return datetime.now().year
@@ -0,0 +1,166 @@
+"""Пул соединений с базой, общий для всех потоков процесса.
+
+Соединение, взятое из пула, перед выдачей проверяется (если пролежало
+без дела дольше check_idle секунд), а прожившее дольше max_lifetime —
+закрывается вместо возврата. Когда все max_size соединений заняты,
+getconn ждёт освобождения не дольше timeout секунд. Время ожидания
+копится в stats, чтобы было видно, что пул мал.
+"""
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+
+    def __init__(self, connect, min_size=0, max_size=10, max_lifetime=1800,
+                 timeout=5, check=None, check_idle=0):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check = check
+        self.check_idle = check_idle
+        self._idle = deque()
+        self._born = {}
+        self._size = 0
+        self._condition = threading.Condition()
+        self.stats = {
+            'checkouts': 0,
+            'created': 0,
+            'closed': 0,
+            'failed_checks': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'timeouts': 0,
+        }
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def fill(self):
+        """Открывает соединения до min_size."""
+        while True:
+            with self._condition:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            self._putidle(self._open())
+
+    def getconn(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            with self._condition:
+                connection, idle_since = self._take_idle()
+                if connection is None:
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f'Все {self.max_size} соединений заняты '
+                            f'дольше {self.timeout} с'
+                        )
+                    waited = True
+                    self._condition.wait(remaining)
+                    continue
+            if self._usable(connection, idle_since):
+                self._checked_out(started, waited)
+                return connection
+            self._discard(connection)
+        try:
+            connection = self._open()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        self._checked_out(started, waited)
+        return connection
+
+    def putconn(self, connection, discard=False):
+        if discard or self._expired(connection):
+            self._discard(connection)
+        else:
+            self._putidle(connection)
+
+    def closeall(self):
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def _open(self):
+        connection = self.connect()
+        with self._condition:
+            self._born[id(connection)] = time.monotonic()
+            self.stats['created'] += 1
+        return connection
+
+    def _putidle(self, connection):
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def _take_idle(self):
+        # Последним вернули — первым выдадим: лишние соединения
+        # остаются невостребованными и доживают до max_lifetime.
+        if self._idle:
+            return self._idle.pop()
+        return None, None
+
+    def _expired(self, connection):
+        born = self._born.get(id(connection), 0)
+        return time.monotonic() - born >= self.max_lifetime
+
+    def _usable(self, connection, idle_since):
+        if self._expired(connection):
+            return False
+        if self.check is None or (
+            time.monotonic() - idle_since < self.check_idle
+        ):
+            return True
+        try:
+            if self.check(connection):
+                return True
+        except Exception:
+            pass
+        self.stats['failed_checks'] += 1
+        return False
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._born.pop(id(connection), None)
+            self._size -= 1
+            self.stats['closed'] += 1
+            self._condition.notify()
+
+    def _checked_out(self, started, waited):
+        wait = time.monotonic() - started
+        with self._condition:
+            self.stats['checkouts'] += 1
+            if waited:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds'] += wait
+                self.stats['max_wait_seconds'] = max(
+                    self.stats['max_wait_seconds'], wait
+                )
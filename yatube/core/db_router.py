@@ -0,0 +1,76 @@
+"""Чтение с реплик, запись в основную базу.
+
+С реплик читают только GET/HEAD к view из settings.REPLICA_VIEWS (ленты
+и страницы постов, которые ничего не пишут) — их помечает
+ReplicaRoutingMiddleware. Команды, фоновые потоки, view вроде like,
+которые пишут на GET, и всё остальное работают с основной базой.
+
+Запрос, который хоть раз писал, дальше читает из основной базы, а в ответ
+получает cookie, которое ещё REPLICA_PIN_SECONDS держит на основной базе
+и следующие запросы этого пользователя: так он видит свои изменения,
+даже если реплика отстаёт.
+
+    DATABASES = {'default': {...}, 'replica': {...}}
+    DATABASE_REPLICAS = ['replica']
+    REPLICA_VIEWS = ['posts:index', ...]
+    DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'primary_until'
+
+_use_replica = ContextVar('use_replica', default=False)
+_wrote = ContextVar('wrote', default=False)
+
+
+def start_request():
+    return _use_replica.set(False), _wrote.set(False)
+
+
+def allow_replica_reads():
+    _use_replica.set(True)
+
+
+def finish_request(tokens):
+    """Завершает запрос и сообщает, писал ли он в базу."""
+    wrote = _wrote.get()
+    _use_replica.reset(tokens[0])
+    _wrote.reset(tokens[1])
+    return wrote
+
+
+def pinned_until(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0))
+    except ValueError:
+        return 0
+
+
+def pin(response):
+    seconds = settings.REPLICA_PIN_SECONDS
+    response.set_cookie(
+        PIN_COOKIE, str(time.time() + seconds),
+        max_age=seconds, httponly=True, samesite='Lax',
+    )
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if replicas and _use_replica.get() and not _wrote.get():
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, объекты из них совместимы.
+        return True
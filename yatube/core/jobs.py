@@ -0,0 +1,242 @@
+"""Очередь фоновых задач в таблице core.Job.
+
+View ставят задачу (enqueue) в той же транзакции, что и свои записи, и
+сразу отвечают, а выполняет её команда runworker. На PostgreSQL рабочие
+забирают задачи через SELECT ... FOR UPDATE SKIP LOCKED и не ждут друг
+друга; на SQLite, где такой блокировки нет, задачу забирает условный
+UPDATE ... WHERE status = 'queued', и проигравший гонку её пропускает.
+
+Выполнение «хотя бы один раз»: упавшая задача повторяется с растущей
+паузой до max_attempts, а задача рабочего, который умер посреди работы,
+через LOCK_TIMEOUT возвращается в очередь. Поэтому обработчики должны
+переносить повторный запуск. Счётчики по типам задач этого процесса
+лежат в stats.
+
+Выполненные задачи хранятся DONE_RETENTION, упавшие — FAILED_RETENTION
+(чтобы успеть разобрать ошибку), потом рабочий удаляет их (prune).
+"""
+import os
+import socket
+import threading
+import time
+import traceback
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.db import connection, connections, router, transaction
+from django.db.models import Count, F
+
+from .models import Job
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 10
+LOCK_TIMEOUT = 10 * 60
+POLL_INTERVAL = 1
+DONE_RETENTION = timedelta(days=1)
+FAILED_RETENTION = timedelta(days=7)
+PRUNE_INTERVAL = 60
+PRUNE_BATCH_SIZE = 1000
+
+_handlers = {}
+_stats_lock = threading.Lock()
+stats = defaultdict(Counter)
+
+
+def handler(kind):
+    """Регистрирует функцию-обработчик задач вида kind.
+
+    Обработчик получает payload задачи как именованные аргументы.
+    """
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, key=None, delay=0,
+            max_attempts=MAX_ATTEMPTS, using=None, requeue=False):
+    """Ставит задачу в очередь. Если задача с ключом key уже есть,
+    новая не создаётся и возвращается существующая. С requeue
+    завершённая задача с этим ключом ставится заново, а ждущая или
+    выполняемая остаётся как есть: так одна работа не идёт в двух
+    рабочих сразу. using — алиас базы в обход роутера."""
+    fields = {
+        'kind': kind,
+        'payload': payload or {},
+        'run_at': datetime.now() + timedelta(seconds=delay),
+        'max_attempts': max_attempts,
+    }
+    manager = Job.objects.db_manager(using)
+    if key is None:
+        return manager.create(**fields)
+    job, created = manager.get_or_create(key=key, defaults=fields)
+    if requeue and not created and job.status in (Job.DONE, Job.FAILED):
+        manager.filter(pk=job.pk, status=job.status).update(
+            status=Job.QUEUED, attempts=0, locked_by='', locked_at=None,
+            finished_at=None, last_error='', **fields,
+        )
+        job.refresh_from_db()
+    return job
+
+
+def claim(worker, limit=1, now=None):
+    """Забирает до limit готовых задач и помечает их выполняемыми."""
+    now = now or datetime.now()
+    db = router.db_for_write(Job)
+    ready = Job.objects.using(db).filter(
+        status=Job.QUEUED, run_at__lte=now
+    ).order_by('run_at', 'pk')
+    changes = {
+        'status': Job.RUNNING,
+        'locked_by': worker,
+        'locked_at': now,
+        'attempts': F('attempts') + 1,
+    }
+    if connections[db].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=db):
+            pks = list(ready.select_for_update(skip_locked=True).values_list(
+                'pk', flat=True
+            )[:limit])
+            Job.objects.using(db).filter(pk__in=pks).update(**changes)
+    else:
+        pks = []
+        for pk in ready.values_list('pk', flat=True)[:limit * 2]:
+            if Job.objects.using(db).filter(
+                pk=pk, status=Job.QUEUED
+            ).update(**changes):
+                pks.append(pk)
+                if len(pks) == limit:
+                    break
+    return list(
+        Job.objects.using(db).filter(pk__in=pks).order_by('run_at', 'pk')
+    )
+
+
+def requeue_stale(timeout=LOCK_TIMEOUT, now=None):
+    """Возвращает в очередь задачи рабочих, не отчитавшихся за timeout."""
+    now = now or datetime.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=timeout)
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, finished_at=now,
+        last_error='Рабочий не завершил задачу',
+    )
+    return failed + stale.update(status=Job.QUEUED, run_at=now)
+
+
+def prune(now=None, batch_size=PRUNE_BATCH_SIZE):
+    """Удаляет завершённые задачи старше срока хранения пачками.
+    Возвращает число удалённых."""
+    now = now or datetime.now()
+    deleted = 0
+    for status, retention in (
+        (Job.DONE, DONE_RETENTION), (Job.FAILED, FAILED_RETENTION),
+    ):
+        old = Job.objects.filter(
+            status=status, finished_at__lt=now - retention
+        )
+        while True:
+            pks = list(old.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            deleted += Job.objects.filter(pk__in=pks).delete()[0]
+    return deleted
+
+
+def _count(kind, outcome, seconds):
+    with _stats_lock:
+        stats[kind][outcome] += 1
+        stats[kind]['seconds'] += seconds
+
+
+def run(job):
+    """Выполняет забранную задачу. True, если она завершилась успешно."""
+    func = _handlers.get(job.kind)
+    started = time.monotonic()
+    try:
+        if func is None:
+            raise LookupError(f'Нет обработчика задач {job.kind!r}')
+        func(**job.payload)
+    except Exception:
+        now = datetime.now()
+        retry = func is not None and job.attempts < job.max_attempts
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.QUEUED if retry else Job.FAILED,
+            run_at=now + timedelta(
+                seconds=RETRY_DELAY * 2 ** (job.attempts - 1)
+            ),
+            finished_at=None if retry else now,
+            last_error=traceback.format_exc(),
+        )
+        _count(job.kind, 'retried' if retry else 'failed',
+               time.monotonic() - started)
+        return False
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.DONE, finished_at=datetime.now(), last_error='',
+    )
+    _count(job.kind, 'done', time.monotonic() - started)
+    return True
+
+
+def _run_in_thread(job):
+    try:
+        return run(job)
+    finally:
+        connection.close()
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def work(worker=None, concurrency=1, once=False, poll=POLL_INTERVAL,
+         stop=None):
+    """Цикл рабочего: забирает по concurrency задач и выполняет их
+    в потоках. С once выходит, когда готовых задач не осталось.
+    Возвращает число выполненных задач."""
+    worker = worker or worker_name()
+    stop = stop or threading.Event()
+    done = 0
+    pruned_at = None
+    with ThreadPoolExecutor(concurrency) as pool:
+        while not stop.is_set():
+            if pruned_at is None or (
+                time.monotonic() - pruned_at >= PRUNE_INTERVAL
+            ):
+                pruned_at = time.monotonic()
+                prune()
+            requeue_stale()
+            jobs = claim(worker, concurrency)
+            if not jobs:
+                if once:
+                    break
+                stop.wait(poll)
+                continue
+            if concurrency == 1:
+                results = [run(job) for job in jobs]
+            else:
+                results = list(pool.map(_run_in_thread, jobs))
+            done += len(results)
+    return done
+
+
+def run_pending():
+    """Выполняет все готовые задачи в текущем потоке."""
+    return work(worker='inline', once=True)
+
+
+def queue_depth():
+    """{(тип, статус): число ждущих и выполняемых задач}. Завершённые
+    не считаются: их много, а удаляет их prune."""
+    return {
+        (kind, status): total
+        for kind, status, total in Job.objects.filter(
+            status__in=(Job.QUEUED, Job.RUNNING)
+        ).values(
+            'kind', 'status'
+        ).annotate(total=Count('pk')).order_by().values_list(
+            'kind', 'status', 'total'
+        )
+    }
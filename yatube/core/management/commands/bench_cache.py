@@ -0,0 +1,62 @@
+import os
+import tempfile
+import time
+
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+from django.core.management.commands.createcachetable import (
+    Command as CreateCacheTable,
+)
+from django.db import DEFAULT_DB_ALIAS, connection
+
+from core.cache_backends.sqlite import SQLiteCache
+
+DB_TABLE = 'bench_cache_table'
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость LocMem, DB-кэша и общего SQLite-кэша'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keys', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        keys = options['keys']
+        create = CreateCacheTable()
+        create.verbosity = 0
+        create.create_table(DEFAULT_DB_ALIAS, DB_TABLE, False)
+        params = {'OPTIONS': {'MAX_ENTRIES': keys * 4}}
+        with tempfile.TemporaryDirectory() as directory:
+            backends = (
+                ('locmem', LocMemCache('bench', params)),
+                ('db', DatabaseCache(DB_TABLE, params)),
+                ('sqlite', SQLiteCache(
+                    os.path.join(directory, 'cache.sqlite3'), params
+                )),
+            )
+            try:
+                for name, backend in backends:
+                    self.bench(name, backend, keys)
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'DROP TABLE ' + connection.ops.quote_name(DB_TABLE)
+                    )
+
+    def bench(self, name, backend, keys):
+        value = {'html': 'x' * 2000}
+        operations = (
+            ('set', lambda i: backend.set(f'key{i}', value)),
+            ('get', lambda i: backend.get(f'key{i}')),
+            ('add', lambda i: backend.add(f'counter{i}', 0)),
+            ('incr', lambda i: backend.incr(f'counter{i}')),
+        )
+        for operation, call in operations:
+            started = time.perf_counter()
+            for i in range(keys):
+                call(i)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{name:>7} {operation:>4}: {keys / elapsed:10.0f} оп/с'
+            )
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.db.pool import ConnectionPool
+
+
+def _ping(connection):
+    cursor = connection.cursor()
+    cursor.execute('SELECT 1')
+    cursor.fetchone()
+    cursor.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает цену нового подключения к базе (рукопожатие, '
+        'аутентификация, OPTIONS) с выдачей соединения из пула'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        wrapper = connections[options['database']]
+        params = wrapper.get_connection_params()
+
+        def connect():
+            return wrapper.Database.connect(**params)
+
+        iterations = options['iterations']
+        started = time.perf_counter()
+        for _ in range(iterations):
+            connection = connect()
+            _ping(connection)
+            connection.close()
+        fresh = (time.perf_counter() - started) / iterations
+
+        pool = ConnectionPool(connect, max_size=1)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            connection = pool.getconn()
+            _ping(connection)
+            pool.putconn(connection)
+        pooled = (time.perf_counter() - started) / iterations
+        pool.closeall()
+
+        self.stdout.write(
+            f'{wrapper.vendor}: новое соединение {fresh * 1000:.2f} мс, '
+            f'из пула {pooled * 1000:.2f} мс '
+            f'(в {fresh / pooled:.1f} раза быстрее)'
+        )
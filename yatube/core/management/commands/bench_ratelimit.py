@@ -0,0 +1,37 @@
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from core import ratelimit
+
+BENCH_RULES = {
+    'bench': {
+        'methods': ('GET',), 'user': '1000000000/m', 'ip': '1000000000/m',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = 'Замеряет накладные расходы лимитера на один запрос'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/like/1/')
+        request.user = SimpleNamespace(is_authenticated=True, pk=1)
+        total = options['requests']
+        with override_settings(RATELIMITS=BENCH_RULES):
+            for view_name, label in (
+                ('unlimited', 'URL без лимита'),
+                ('bench', 'URL с лимитом (пользователь + IP)'),
+            ):
+                started = time.perf_counter()
+                for _ in range(total):
+                    ratelimit.check(request, view_name)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'{label}: {elapsed / total * 1e6:.1f} мкс на запрос'
+                )
@@ -0,0 +1,52 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди core.Job'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Сколько задач выполнять одновременно (потоков)',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда готовых задач не останется',
+        )
+        parser.add_argument(
+            '--poll', type=float, default=jobs.POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, секунды',
+        )
+        parser.add_argument('--name', default=None, help='Имя рабочего')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        previous = {
+            # Доделываем текущие задачи и выходим.
+            signum: signal.signal(signum, lambda *args: stop.set())
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            done = jobs.work(
+                worker=options['name'],
+                concurrency=options['concurrency'],
+                once=options['once'],
+                poll=options['poll'],
+                stop=stop,
+            )
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        for kind, counts in sorted(jobs.stats.items()):
+            total = counts['done'] + counts['retried'] + counts['failed']
+            self.stdout.write(
+                f'{kind}: выполнено {counts["done"]}, '
+                f'повторов {counts["retried"]}, ошибок {counts["failed"]}, '
+                f'в среднем {counts["seconds"] / total * 1000:.1f} мс'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Задач выполнено: {done}'))
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max
+
+from core.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = 'Показывает журнал медленных запросов к базе (core.slow_queries)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--view', help='Только запросы этого маршрута')
+        parser.add_argument(
+            '--group', action='store_true',
+            help='Сгруппировать одинаковые запросы и отсортировать по '
+                 'суммарному числу',
+        )
+        parser.add_argument(
+            '--plans', action='store_true', help='Печатать планы EXPLAIN',
+        )
+
+    def handle(self, *args, **options):
+        queries = SlowQuery.objects.all()
+        if options['view']:
+            queries = queries.filter(view=options['view'])
+        if options['group']:
+            self.grouped(queries, options)
+            return
+        for query in queries.order_by('-pk')[:options['limit']]:
+            self.show(query, options['plans'])
+
+    def grouped(self, queries, options):
+        groups = queries.values('fingerprint').annotate(
+            total=Count('pk'), average=Avg('duration_ms'),
+            slowest=Max('duration_ms'), last=Max('pk'),
+        ).order_by('-total')[:options['limit']]
+        examples = SlowQuery.objects.in_bulk(
+            [group['last'] for group in groups]
+        )
+        for group in groups:
+            self.stdout.write(
+                f'{group["total"]} раз, в среднем {group["average"]:.0f} мс, '
+                f'максимум {group["slowest"]:.0f} мс'
+            )
+            self.show(examples[group['last']], options['plans'])
+
+    def show(self, query, plans):
+        place = ', '.join(
+            part for part in (query.view, query.template, query.source)
+            if part
+        )
+        self.stdout.write(self.style.WARNING(
+            f'#{query.pk} {query.created:%Y-%m-%d %H:%M:%S} '
+            f'{query.duration_ms:.0f} мс [{query.database}] {place}'
+        ))
+        self.stdout.write(query.sql)
+        if plans:
+            self.stdout.write(query.plan or '(план ещё не снят)')
+        self.stdout.write('')
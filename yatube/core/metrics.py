@@ -0,0 +1,410 @@
+"""Метрики для Prometheus: время ответа, база, шаблоны, кэши.
+
+MetricsMiddleware пишет в реестр процесса гистограмму времени ответа по
+имени маршрута, число запросов к базе и время в ней (обёртка курсора
+ставится один раз на соединение, см. install_db_wrapper), а
+core.template_backends — время рендера шаблонов. Запись — пара операций
+со словарём под локом.
+
+Процессы сервера не делят память, поэтому процесс не чаще раза
+в FLUSH_INTERVAL сбрасывает свой реестр и счётчики кэшей, пула
+соединений и очереди задач в METRICS_DIR/<pid>-<метка>.json (метка
+своя у каждого процесса: процесс с тем же pid не затрёт файл старого),
+а /metrics складывает все файлы. Файлы умерших процессов /metrics
+сливает в ARCHIVE: их счётчики и гистограммы продолжают суммироваться,
+чтобы суммы не уменьшались, а мгновенные значения (gauges) отбрасываются.
+"""
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Верхние границы корзин гистограмм, секунды.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FLUSH_INTERVAL = 5
+PREFIX = 'yatube_'
+ARCHIVE = 'archive.json'
+_PROCESS_FILE = re.compile(r'(\d+)-\w+\.json')
+
+HELP = {
+    'http_request_duration_seconds': 'Время ответа по маршрутам',
+    'http_requests_total': 'Ответы по маршрутам и кодам',
+    'db_queries_total': 'Запросы к базе по маршрутам',
+    'db_query_seconds_total': 'Время в базе по маршрутам',
+    'template_render_seconds': 'Время рендера шаблонов',
+    'cache_requests_total': 'Обращения к кэшам процесса',
+    'cache_entries': 'Записей в памяти процессов (L1)',
+    'db_pool_events_total': 'События пулов соединений',
+    'db_pool_connections': 'Открытые соединения в пулах',
+    'jobs_total': 'Выполненные фоновые задачи',
+    'job_seconds_total': 'Время выполнения фоновых задач',
+    'jobs': 'Задачи в очереди по статусам',
+}
+
+
+class Registry:
+    """Счётчики и гистограммы одного процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            self.counters[name, labels] += value
+
+    def observe(self, name, value, labels=()):
+        index = len(BUCKETS)
+        for position, bound in enumerate(BUCKETS):
+            if value <= bound:
+                index = position
+                break
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                histogram = self.histograms[name, labels] = {
+                    'buckets': [0] * (len(BUCKETS) + 1), 'sum': 0.0,
+                }
+            histogram['buckets'][index] += 1
+            histogram['sum'] += value
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                'histograms': [
+                    [name, list(labels), list(histogram['buckets']),
+                     histogram['sum']]
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+            }
+
+
+registry = Registry()
+_current = ContextVar('metrics_request', default=None)
+_flushed_at = 0.0
+# (pid, имя файла); после fork pid другой, и имя выбирается заново.
+_file = (None, None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    current = _current.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        current.queries += 1
+        current.db_seconds += time.perf_counter() - started
+
+
+def install_db_wrapper(sender, connection, **kwargs):
+    """Обработчик connection_created: считает запросы к базе."""
+    if _db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_wrapper)
+
+
+def start_request():
+    return _current.set(RequestStats())
+
+
+def finish_request(token, view, method, status, seconds):
+    current = _current.get()
+    _current.reset(token)
+    labels = (('view', view), ('method', method))
+    registry.observe('http_request_duration_seconds', seconds, labels)
+    registry.inc(
+        'http_requests_total', labels + (('status', str(status)),)
+    )
+    view_label = (('view', view),)
+    registry.inc('db_queries_total', view_label, current.queries)
+    registry.inc('db_query_seconds_total', view_label, current.db_seconds)
+    maybe_flush()
+
+
+def template_rendered(name, seconds):
+    registry.observe(
+        'template_render_seconds', seconds,
+        (('template', name or '<string>'),),
+    )
+
+
+def _cache_counters(counters, gauges):
+    from users import cache as user_cache
+
+    for alias in settings.CACHES:
+        backend = caches[alias]
+        if hasattr(backend, 'stats'):
+            stats = backend.stats()
+            for result in ('hits', 'misses'):
+                counters.append(['cache_requests_total', [
+                    ['cache', alias], ['result', result],
+                ], stats[result]])
+            gauges.append(
+                ['cache_entries', [['cache', alias]], stats['entries']]
+            )
+    user_stats = user_cache.stats
+    session_hits = user_stats['session_loads'] - user_stats['session_misses']
+    for cache_name, hits, misses in (
+        ('user', user_stats['user_hits'], user_stats['user_misses']),
+        ('groups', user_stats['groups_hits'], user_stats['groups_misses']),
+        ('session', session_hits, user_stats['session_misses']),
+    ):
+        for result, value in (('hits', hits), ('misses', misses)):
+            counters.append(['cache_requests_total', [
+                ['cache', cache_name], ['result', result],
+            ], value])
+
+
+def _pool_counters(counters, gauges):
+    from core.db.backends.postgresql_pool.base import pools
+
+    for (alias, _), pool in pools().items():
+        for event, value in pool.stats.items():
+            if event != 'max_wait_seconds':
+                counters.append(['db_pool_events_total', [
+                    ['database', alias], ['event', event],
+                ], value])
+        gauges.append(['db_pool_connections', [['database', alias]],
+                       pool.size])
+
+
+def _job_counters(counters, gauges):
+    from core import jobs
+
+    for kind, stats in list(jobs.stats.items()):
+        for outcome in ('done', 'retried', 'failed'):
+            counters.append(['jobs_total', [
+                ['kind', kind], ['outcome', outcome],
+            ], stats[outcome]])
+        counters.append(
+            ['job_seconds_total', [['kind', kind]], stats['seconds']]
+        )
+
+
+def _process_counters():
+    """Накопительные счётчики других модулей этого процесса."""
+    counters, gauges = [], []
+    for add in (_cache_counters, _pool_counters, _job_counters):
+        add(counters, gauges)
+    return counters, gauges
+
+
+def _file_name():
+    global _file
+    pid = os.getpid()
+    if _file[0] != pid:
+        _file = (pid, f'{pid}-{uuid.uuid4().hex[:12]}.json')
+    return _file[1]
+
+
+def _write(path, snapshot):
+    with open(f'{path}.tmp', 'w') as out:
+        json.dump(snapshot, out)
+    os.replace(f'{path}.tmp', path)
+
+
+def flush():
+    """Сбрасывает метрики процесса в METRICS_DIR/<pid>-<метка>.json."""
+    global _flushed_at
+    _flushed_at = time.monotonic()
+    snapshot = registry.snapshot()
+    counters, gauges = _process_counters()
+    snapshot['counters'].extend(counters)
+    snapshot['gauges'] = gauges
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    _write(os.path.join(settings.METRICS_DIR, _file_name()), snapshot)
+
+
+def maybe_flush():
+    if time.monotonic() - _flushed_at >= FLUSH_INTERVAL:
+        flush()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read(path):
+    try:
+        with open(path) as src:
+            return json.load(src)
+    except (OSError, ValueError):
+        # Файл процесса, который как раз перезаписывается.
+        return None
+
+
+def _merge(target, snapshot):
+    """Добавляет счётчики и гистограммы snapshot к target."""
+    counters = {
+        (name, json.dumps(labels)): value
+        for name, labels, value in target['counters']
+    }
+    for name, labels, value in snapshot.get('counters', ()):
+        key = (name, json.dumps(labels))
+        counters[key] = counters.get(key, 0) + value
+    target['counters'] = [
+        [name, json.loads(labels), value]
+        for (name, labels), value in counters.items()
+    ]
+    histograms = {
+        (name, json.dumps(labels)): [buckets, total]
+        for name, labels, buckets, total in target['histograms']
+    }
+    for name, labels, buckets, total in snapshot.get('histograms', ()):
+        merged = histograms.setdefault(
+            (name, json.dumps(labels)), [[0] * len(buckets), 0.0]
+        )
+        merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+        merged[1] += total
+    target['histograms'] = [
+        [name, json.loads(labels), buckets, total]
+        for (name, labels), (buckets, total) in histograms.items()
+    ]
+
+
+def retire_dead():
+    """Сливает файлы умерших процессов в ARCHIVE и удаляет их."""
+    directory = settings.METRICS_DIR
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    dead = []
+    for name in names:
+        match = _PROCESS_FILE.fullmatch(name)
+        if match and not _alive(int(match[1])):
+            dead.append(name)
+    if not dead:
+        return 0
+    archive_path = os.path.join(directory, ARCHIVE)
+    # Параллельные запросы /metrics не должны слить файл дважды.
+    with open(os.path.join(directory, 'archive.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = _read(archive_path) or {'counters': [], 'histograms': []}
+        retired = []
+        for name in dead:
+            snapshot = _read(os.path.join(directory, name))
+            if snapshot is not None:
+                _merge(archive, snapshot)
+                retired.append(name)
+        _write(archive_path, archive)
+        for name in retired:
+            os.remove(os.path.join(directory, name))
+    return len(retired)
+
+
+def _snapshots():
+    try:
+        names = os.listdir(settings.METRICS_DIR)
+    except FileNotFoundError:
+        return
+    for file_name in names:
+        if file_name != ARCHIVE and not _PROCESS_FILE.fullmatch(file_name):
+            continue
+        snapshot = _read(os.path.join(settings.METRICS_DIR, file_name))
+        if snapshot is not None:
+            yield snapshot
+
+
+def collect():
+    """Складывает файлы всех процессов."""
+    retire_dead()
+    counters = defaultdict(float)
+    gauges = defaultdict(float)
+    histograms = {}
+    for snapshot in _snapshots():
+        for target, rows in (
+            (counters, snapshot.get('counters', ())),
+            (gauges, snapshot.get('gauges', ())),
+        ):
+            for name, labels, value in rows:
+                target[name, tuple(map(tuple, labels))] += value
+        for name, labels, buckets, total in snapshot.get('histograms', ()):
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [[0] * len(buckets), 0.0])
+            merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+            merged[1] += total
+    return counters, gauges, histograms
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace(
+        '"', '\\"'
+    )
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{_escape(value)}"' for name, value in labels
+    ) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(extra_gauges=()):
+    """Все метрики в текстовом формате Prometheus. extra_gauges —
+    [(имя, метки, значение)] общие для всех процессов, например
+    глубина очереди задач."""
+    counters, gauges, histograms = collect()
+    for name, labels, value in extra_gauges:
+        gauges[name, labels] = value
+    families = defaultdict(list)
+    types = {}
+    for kind, values in (('counter', counters), ('gauge', gauges)):
+        for (name, labels), value in values.items():
+            types[name] = kind
+            families[name].append(
+                f'{PREFIX}{name}{_labels(labels)} {_number(value)}'
+            )
+    for (name, labels), (buckets, total) in histograms.items():
+        types[name] = 'histogram'
+        lines = families[name]
+        cumulative = 0
+        bounds = [str(bound) for bound in BUCKETS] + ['+Inf']
+        for bound, count in zip(bounds, buckets):
+            cumulative += count
+            lines.append(
+                f'{PREFIX}{name}_bucket'
+                f'{_labels(labels + (("le", bound),))} {cumulative}'
+            )
+        lines.append(f'{PREFIX}{name}_sum{_labels(labels)} {total!r}')
+        lines.append(f'{PREFIX}{name}_count{_labels(labels)} {cumulative}')
+    output = []
+    for name in sorted(families):
+        if name in HELP:
+            output.append(f'# HELP {PREFIX}{name} {HELP[name]}')
+        output.append(f'# TYPE {PREFIX}{name} {types[name]}')
+        output.extend(families[name])
+    return '\n'.join(output) + '\n'
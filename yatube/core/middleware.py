@@ -0,0 +1,124 @@
+import time
+
+from django.conf import settings
+from django.shortcuts import render
+
+from . import db_router, metrics, profiler, ratelimit, slow_queries
+
+
+class RateLimitMiddleware:
+    """Отвечает 429 на запросы сверх бюджетов из settings.RATELIMITS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        retry_after = ratelimit.check(
+            request, request.resolver_match.view_name
+        )
+        if not retry_after:
+            return None
+        response = render(
+            request,
+            'core/429.html',
+            {'retry_after': retry_after},
+            status=429,
+        )
+        response['Retry-After'] = str(retry_after)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Разрешает читающим view брать данные с реплик, если пользователь
+    недавно ничего не записывал (см. core.db_router)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tokens = db_router.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = db_router.finish_request(tokens)
+        if wrote:
+            db_router.pin(response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and db_router.pinned_until(request) < time.time()
+        ):
+            db_router.allow_replica_reads()
+
+
+class MetricsMiddleware:
+    """Время ответа, запросы к базе и время в ней по имени маршрута
+    (см. core.metrics). Стоит первым, чтобы учесть остальные middleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = metrics.start_request()
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        metrics.finish_request(
+            token,
+            match.view_name if match else '<unresolved>',
+            request.method,
+            response.status_code,
+            time.perf_counter() - started,
+        )
+        return response
+
+
+class SlowQueryMiddleware:
+    """Подписывает медленные запросы к базе именем маршрута
+    (см. core.slow_queries)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = slow_queries.set_view('')
+        try:
+            return self.get_response(request)
+        finally:
+            slow_queries.reset_view(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        slow_queries.set_view(request.resolver_match.view_name)
+
+
+class ProfilerMiddleware:
+    """Профилирует запрос сотрудника с заголовком X-Profile и долю
+    PROFILE_SAMPLE_RATE остальных (см. core.profiler). Имя файла со
+    стеками возвращается в заголовке X-Profile-File."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = (
+            request.META.get('HTTP_X_PROFILE') and request.user.is_staff
+        )
+        if not (requested or profiler.sampled()):
+            return self.get_response(request)
+        sampler = profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            match = request.resolver_match
+            name = profiler.stop(
+                sampler, match.view_name if match else request.path
+            )
+        if requested:
+            response['X-Profile-File'] = name
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-19 06:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sql', models.TextField()),
+                ('params', models.TextField(blank=True, verbose_name='Параметры (JSON)')),
+                ('fingerprint', models.CharField(db_index=True, max_length=40)),
+                ('duration_ms', models.FloatField(verbose_name='Время, мс')),
+                ('database', models.CharField(max_length=100, verbose_name='База')),
+                ('view', models.CharField(blank=True, max_length=200, verbose_name='View')),
+                ('source', models.CharField(blank=True, max_length=500, verbose_name='Строка кода')),
+                ('template', models.CharField(blank=True, max_length=500, verbose_name='Строка шаблона')),
+                ('plan', models.TextField(blank=True, verbose_name='План')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('explained_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import models
+
+
+class Job(models.Model):
+    """Фоновая задача в очереди core.jobs."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    kind = models.CharField(max_length=100, verbose_name='Тип')
+    payload = models.JSONField(default=dict, verbose_name='Аргументы')
+    # Повторная постановка с тем же ключом не создаёт новую задачу.
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name='Ключ идемпотентности',
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=QUEUED
+    )
+    run_at = models.DateTimeField(verbose_name='Выполнить не раньше')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('status', 'run_at')),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk} ({self.status})'
+
+
+class SlowQuery(models.Model):
+    """Медленный запрос к базе из журнала core.slow_queries."""
+
+    sql = models.TextField()
+    # Одинаков у запросов, отличающихся только параметрами.
+    fingerprint = models.CharField(max_length=40, db_index=True)
+    duration_ms = models.FloatField(verbose_name='Время, мс')
+    database = models.CharField(max_length=100, verbose_name='База')
+    view = models.CharField(max_length=200, blank=True, verbose_name='View')
+    source = models.CharField(
+        max_length=500, blank=True, verbose_name='Строка кода'
+    )
+    template = models.CharField(
+        max_length=500, blank=True, verbose_name='Строка шаблона'
+    )
+    plan = models.TextField(blank=True, verbose_name='План')
+    created = models.DateTimeField(auto_now_add=True)
+    explained_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.duration_ms:.0f} мс: {self.sql[:60]}'
@@ -0,0 +1,106 @@
+"""Выборочный профилировщик запросов для боевого сервера.
+
+Пока профилируемый запрос выполняется, отдельный поток каждые
+PROFILE_INTERVAL секунд снимает стек потока запроса
+(sys._current_frames) и считает одинаковые стеки. Код запроса при этом
+не трассируется, поэтому накладные расходы — доли процента, а запросы без
+профилирования платят только за проверку заголовка. Результат —
+«свёрнутые» стеки (строка «a;b;c N» на стек) в PROFILE_DIR: их
+показывают flamegraph.pl и speedscope. Хранятся последние PROFILE_KEEP
+файлов.
+"""
+import os
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from itertools import count
+
+from django.conf import settings
+
+_numbers = count()
+
+
+def sampled():
+    rate = settings.PROFILE_SAMPLE_RATE
+    return bool(rate) and random.random() < rate
+
+
+@lru_cache(maxsize=4096)
+def _short(filename):
+    """Путь относительно самого длинного подходящего каталога sys.path."""
+    roots = [root for root in sys.path if root and filename.startswith(
+        root.rstrip(os.sep) + os.sep
+    )]
+    if not roots:
+        return filename
+    return os.path.relpath(filename, max(roots, key=len))
+
+
+def fold(frame):
+    """Стек кадра от внешнего вызова к внутреннему: 'a;b;c'."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{_short(code.co_filename)}:{code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class Sampler(threading.Thread):
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self.stacks[fold(frame)] += 1
+
+
+def start():
+    """Начинает снимать стеки текущего потока."""
+    sampler = Sampler(threading.get_ident(), settings.PROFILE_INTERVAL)
+    sampler.start()
+    return sampler
+
+
+def stop(sampler, label):
+    """Останавливает sampler и пишет стеки в файл. Возвращает имя файла."""
+    sampler.stopped.set()
+    sampler.join()
+    safe_label = re.sub(r'[^\w.-]+', '_', label)[:80]
+    name = (
+        f'{datetime.now():%Y%m%d-%H%M%S}-{safe_label}-'
+        f'{os.getpid()}-{next(_numbers)}.folded'
+    )
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(settings.PROFILE_DIR, name), 'w') as out:
+        for stack, samples in sampler.stacks.most_common():
+            out.write(f'{stack} {samples}\n')
+    trim()
+    return name
+
+
+def trim(keep=None):
+    """Оставляет последние keep файлов профилей."""
+    keep = settings.PROFILE_KEEP if keep is None else keep
+    with os.scandir(settings.PROFILE_DIR) as entries:
+        files = sorted(
+            (entry.stat().st_mtime, entry.path) for entry in entries
+            if entry.name.endswith('.folded')
+        )
+    for _, path in files[:max(len(files) - keep, 0)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,110 @@
+"""Ограничение частоты запросов на общем кэше.
+
+Скользящее окно: счётчики запросов хранятся по окнам длиной period,
+а запрос проходит, если текущий счётчик плюс доля предыдущего окна,
+которая ещё попадает в последние period секунд, не больше limit. Так
+на стыке окон нельзя сделать 2 * limit запросов, как с простым счётчиком
+на окно. Счётчик меняется атомарными cache.incr / cache.decr, состояние
+лежит в общем кэше и поэтому общее для всех процессов.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'30/m' -> (30, 60)."""
+    limit, period = rate.split('/')
+    return int(limit), PERIODS[period]
+
+
+def _incr(cache_key, delta, timeout):
+    cache.add(cache_key, 0, timeout)
+    try:
+        return cache.incr(cache_key, delta)
+    except ValueError:
+        # Ключ успел истечь между add и incr.
+        cache.add(cache_key, max(delta, 0), timeout)
+        return max(delta, 0)
+
+
+def _wait(limit, period, offset, previous, current):
+    """Секунды, через которые пройдёт следующий запрос."""
+    free = limit - current - 1
+    if previous and free >= 0:
+        # Ждём, пока доля предыдущего окна не станет <= free.
+        wait = period * (1 - free / previous) - offset
+        if offset + wait < period:
+            return wait
+    # В следующем окне текущее станет предыдущим.
+    wait = period - offset
+    if current and limit > 0:
+        wait += period * max(1 - (limit - 1) / current, 0)
+    return wait
+
+
+def _current_key(key, period, now):
+    return f'ratelimit:{key}:{int(now // period)}'
+
+
+def consume(key, rate, now=None):
+    """Учитывает запрос в окне key.
+
+    Возвращает 0, если запрос укладывается в limit за последние period
+    секунд, иначе число секунд, через которое стоит повторить.
+    """
+    limit, period = parse_rate(rate)
+    now = time.time() if now is None else now
+    window, offset = divmod(now, period)
+    window = int(window)
+    current_key = _current_key(key, period, now)
+    # Счётчик нужен ещё одно окно — как предыдущий.
+    current = _incr(current_key, 1, 2 * period + 1)
+    previous = cache.get(f'ratelimit:{key}:{window - 1}', 0)
+    if previous * (period - offset) / period + current <= limit:
+        return 0
+    # Отказанный запрос не расходует бюджет.
+    current = _incr(current_key, -1, 2 * period + 1)
+    return max(math.ceil(
+        _wait(limit, period, offset, previous, current)
+    ), 1)
+
+
+def refund(key, rate, now):
+    """Возвращает в окно key запрос, учтённый consume с тем же now."""
+    limit, period = parse_rate(rate)
+    _incr(_current_key(key, period, now), -1, 2 * period + 1)
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def check(request, view_name):
+    """Проверяет бюджеты view_name для пользователя и IP.
+
+    Возвращает 0 или Retry-After в секундах.
+    """
+    rule = getattr(settings, 'RATELIMITS', {}).get(view_name)
+    if not rule or request.method not in rule.get('methods', ('POST',)):
+        return 0
+    buckets = []
+    if 'user' in rule and request.user.is_authenticated:
+        buckets.append((f'{view_name}:user:{request.user.pk}', rule['user']))
+    if 'ip' in rule:
+        buckets.append((f'{view_name}:ip:{client_ip(request)}', rule['ip']))
+    now = time.time()
+    charged = []
+    for key, rate in buckets:
+        wait = consume(key, rate, now)
+        if wait:
+            # Отказ по одному бюджету не должен расходовать остальные.
+            for charged_key, charged_rate in charged:
+                refund(charged_key, charged_rate, now)
+            return wait
+        charged.append((key, rate))
+    return 0
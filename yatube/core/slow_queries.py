@@ -0,0 +1,222 @@
+"""Журнал медленных запросов к базе с планами выполнения.
+
+Обёртка курсора (ставится на каждое соединение, см. install_db_wrapper)
+замеряет запросы; запрос дольше settings.SLOW_QUERY_MS с вероятностью
+SLOW_QUERY_SAMPLE записывается в SlowQuery вместе с маршрутом (его ставит
+SlowQueryMiddleware), строкой кода приложения и строкой шаблона, если
+запрос выполнился при рендере. Сам EXPLAIN выполняет фоновая задача
+(core.jobs), а не запрос пользователя: на PostgreSQL это
+EXPLAIN (ANALYZE, BUFFERS) в откатываемой транзакции, ANALYZE — только
+для SELECT, чтобы не повторять изменения данных. Хранятся последние
+SLOW_QUERY_KEEP записей, смотреть их — в админке или командой
+slow_queries.
+
+Параметры запроса (ключи сессий, логины, токены) в журнал не пишутся:
+их получает только задача EXPLAIN, а выполненные задачи чистит
+core.jobs.prune. Запрос внутри транзакции пишется в журнал отдельным
+соединением, чтобы запись не пропала при откате этой транзакции (на
+SQLite — после её фиксации).
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sys
+import sysconfig
+import time
+from contextvars import ContextVar
+from datetime import datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.template.base import Node
+
+from . import jobs
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_TIMEOUT_MS = 30000
+SQL_LIMIT = 10000
+# Алиас отдельного соединения с основной базой для записи журнала.
+LOG_ALIAS = 'slow_query_log'
+
+_view = ContextVar('slow_query_view', default='')
+# Не замеряем собственные записи журнала и EXPLAIN.
+_capturing = ContextVar('slow_query_capturing', default=False)
+
+_RENDER_CODE = Node.render_annotated.__code__
+# Код, который не считается источником запроса: библиотеки и сама
+# обвязка в core.
+_SKIP_PATHS = tuple({
+    sysconfig.get_paths()[name] + os.sep
+    for name in ('stdlib', 'purelib', 'platlib')
+}) + (os.path.dirname(__file__) + os.sep,)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+
+
+def set_view(view_name):
+    return _view.set(view_name)
+
+
+def reset_view(token):
+    _view.reset(token)
+
+
+def fingerprint(sql):
+    """Хэш запроса без литералов и длины списков IN: одинаковый у
+    запросов, отличающихся только параметрами."""
+    normalized = _LISTS.sub('(...)', _LITERALS.sub('?', sql))
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def _origin():
+    """(строка кода приложения, строка шаблона) вызвавшие запрос."""
+    source = template = ''
+    frame = sys._getframe(2)
+    while frame is not None and not (source and template):
+        code = frame.f_code
+        if not template and code is _RENDER_CODE:
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                template = f'{origin.template_name}:{token.lineno}'
+        elif not source and not code.co_filename.startswith(_SKIP_PATHS):
+            source = f'{code.co_filename}:{frame.f_lineno}'
+        frame = frame.f_back
+    return source, template
+
+
+def _wrapper(execute, sql, params, many, context):
+    if _capturing.get():
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    milliseconds = (time.perf_counter() - started) * 1000
+    if (
+        milliseconds >= settings.SLOW_QUERY_MS
+        and not many
+        and random.random() < settings.SLOW_QUERY_SAMPLE
+    ):
+        _record(sql, params, milliseconds, context['connection'].alias)
+    return result
+
+
+def _record(sql, params, milliseconds, alias):
+    source, template = _origin()
+    fields = {
+        'sql': sql[:SQL_LIMIT],
+        'fingerprint': fingerprint(sql),
+        'duration_ms': milliseconds,
+        'database': alias,
+        'view': _view.get(),
+        'source': source,
+        'template': template,
+    }
+    params = json.dumps(list(params or ()), cls=DjangoJSONEncoder)
+    primary = connections[DEFAULT_DB_ALIAS]
+    if not primary.in_atomic_block:
+        _write(DEFAULT_DB_ALIAS, fields, params)
+    elif primary.vendor == 'sqlite':
+        # Второе соединение SQLite ждало бы блокировку, которую держит
+        # транзакция этого же запроса: пишем после её фиксации.
+        transaction.on_commit(
+            lambda: _write(DEFAULT_DB_ALIAS, fields, params),
+            using=DEFAULT_DB_ALIAS,
+        )
+    else:
+        # Своё соединение: откат транзакции запроса не откатит запись.
+        connections[LOG_ALIAS] = connections.create_connection(
+            DEFAULT_DB_ALIAS
+        )
+        try:
+            _write(LOG_ALIAS, fields, params)
+        finally:
+            connections[LOG_ALIAS].close()
+            del connections[LOG_ALIAS]
+
+
+def _write(using, fields, params):
+    token = _capturing.set(True)
+    try:
+        # Алиас явно, чтобы журнал не считался записью пользователя
+        # и не прикреплял его к основной базе (core.db_router).
+        query = SlowQuery.objects.using(using).create(**fields)
+        jobs.enqueue(
+            'core.explain_slow_query', {'pk': query.pk, 'params': params},
+            using=using,
+        )
+    except Exception:
+        # Журнал не должен ронять запрос, который он замеряет.
+        logger.exception('Не удалось записать медленный запрос')
+    finally:
+        _capturing.reset(token)
+
+
+def install_db_wrapper(sender, connection, **kwargs):
+    """Обработчик connection_created."""
+    if _wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_wrapper)
+
+
+def explain_sql(connection, sql):
+    if connection.vendor == 'postgresql':
+        if sql.lstrip()[:6].upper() == 'SELECT':
+            return 'EXPLAIN (ANALYZE, BUFFERS) ' + sql
+        return 'EXPLAIN ' + sql
+    if connection.vendor == 'sqlite':
+        return 'EXPLAIN QUERY PLAN ' + sql
+    return 'EXPLAIN ' + sql
+
+
+@jobs.handler('core.explain_slow_query')
+def explain(pk, params='[]'):
+    query = SlowQuery.objects.filter(pk=pk).first()
+    if query is None:
+        return
+    alias = query.database if query.database in connections else (
+        DEFAULT_DB_ALIAS
+    )
+    connection = connections[alias]
+    token = _capturing.set(True)
+    try:
+        with transaction.atomic(using=alias):
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute(
+                        f'SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}'
+                    )
+                cursor.execute(
+                    explain_sql(connection, query.sql),
+                    json.loads(params) or None,
+                )
+                rows = cursor.fetchall()
+            # ANALYZE выполняет запрос по-настоящему: всё откатываем.
+            transaction.set_rollback(True, using=alias)
+    except Exception as error:
+        plan = f'EXPLAIN не выполнен: {error}'
+    else:
+        plan = '\n'.join(
+            ' | '.join(str(column) for column in row) for row in rows
+        )
+    finally:
+        _capturing.reset(token)
+    SlowQuery.objects.filter(pk=pk).update(
+        plan=plan, explained_at=datetime.now()
+    )
+    trim()
+
+
+def trim(keep=None):
+    """Оставляет последние keep записей журнала."""
+    keep = settings.SLOW_QUERY_KEEP if keep is None else keep
+    boundary = list(SlowQuery.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    )[keep:keep + 1])
+    if boundary:
+        SlowQuery.objects.filter(pk__lte=boundary[0]).delete()
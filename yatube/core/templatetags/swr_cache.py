@@ -0,0 +1,53 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from core.cache import get_or_compute
+
+register = template.Library()
+
+
+class SWRCacheNode(template.Node):
+    def __init__(self, nodelist, soft_ttl, hard_ttl, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        soft_ttl = int(self.soft_ttl.resolve(context))
+        hard_ttl = self.hard_ttl and int(self.hard_ttl.resolve(context))
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return get_or_compute(
+            make_template_fragment_key(self.fragment_name, vary_on),
+            lambda: self.nodelist.render(context),
+            soft_ttl,
+            hard_ttl,
+        )
+
+
+@register.tag('swrcache')
+def do_swrcache(parser, token):
+    """Как {% cache %}, но с защитой от одновременного пересчёта.
+
+    {% swrcache soft_ttl fragment_name [var1 var2 ...] [hard=hard_ttl] %}
+    Фрагмент свежий soft_ttl секунд, устаревшим отдаётся до hard_ttl.
+    """
+    nodelist = parser.parse(('endswrcache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f'{tokens[0]!r} tag requires at least 2 arguments.'
+        )
+    hard_ttl = None
+    if tokens[-1].startswith('hard='):
+        hard_ttl = parser.compile_filter(tokens[-1][len('hard='):])
+        tokens = tokens[:-1]
+    return SWRCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        hard_ttl,
+        tokens[2],
+        [parser.compile_filter(t) for t in tokens[3:]],
+    )
@@ -1,6 +1,10 @@
 # core/views.py
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
 
+from . import jobs, metrics
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -20,3 +24,18 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+def metrics_view(request):
+    """Метрики всех процессов для Prometheus (core.metrics)."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    metrics.flush()
+    depth = [
+        ('jobs', (('kind', kind), ('status', status)), total)
+        for (kind, status), total in jobs.queue_depth().items()
+    ]
+    return HttpResponse(
+        metrics.render(depth),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
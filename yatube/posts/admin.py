@@ -1,8 +1,19 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 
+from . import bulk, feed_versions, group_stats, jobs
 from .models import Post, Group
 
 
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа',
+    )
+
+
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     search_fields = ('text',)
@@ -10,6 +21,47 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('group',)
     prepoluated_fields = {'slug': ("title",)}
     empty_value_display = '-пусто-'
+    action_form = PostActionForm
+    actions = ('delete_in_batches', 'move_to_group')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change:
+            group_stats.post_moved(obj, form.initial.get('group'))
+        else:
+            group_stats.post_added(obj)
+        feed_versions.bump_all()
+
+    # Удаление из админки только скрывает посты, строки и файлы
+    # удаляет bulk.purge_hidden.
+    def delete_model(self, request, obj):
+        bulk.hide_post(obj)
+
+    def delete_queryset(self, request, queryset):
+        bulk.hide_posts(queryset)
+
+    @admin.action(description='Скрыть выбранные посты и удалить их в фоне')
+    def delete_in_batches(self, request, queryset):
+        bulk.hide_posts(queryset)
+        jobs.purge_hidden_later()
+        self.message_user(
+            request,
+            'Посты скрыты, удаление поставлено в очередь фоновых задач.',
+            messages.INFO,
+        )
+
+    @admin.action(description='Перенести выбранные посты в группу (в фоне)')
+    def move_to_group(self, request, queryset):
+        group = Group.objects.filter(
+            pk=request.POST.get('group') or None
+        ).first()
+        jobs.move_posts_later(queryset.values_list('pk', flat=True), group)
+        self.message_user(
+            request,
+            f'Перенос в группу «{group or "без группы"}» поставлен '
+            'в очередь фоновых задач.',
+            messages.INFO,
+        )
 
 
 class GroupAdmin(admin.ModelAdmin):
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        # Регистрирует обработчики фоновых задач для runworker.
+        from . import jobs  # noqa: F401
+        from . import signals  # noqa: F401
@@ -0,0 +1,250 @@
+"""Пакетные операции над постами и авторами.
+
+Удаление и перенос выполняются пачками ограниченного размера,
+каждая пачка в своей короткой транзакции, чтобы не держать блокировки
+и не тянуть все объекты в память через каскадный сборщик Django.
+
+Пользовательское удаление только скрывает пост или автора (deleted_at),
+а строки и файлы потом удаляет purge_hidden (команда purge_hidden).
+"""
+import logging
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from sorl.thumbnail import delete as delete_image
+
+from . import feed_versions, follow_graph, group_stats
+from .models import Comment, Follow, Like, Post, PostRank, User
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def batched_pks(queryset, batch_size=BATCH_SIZE):
+    """Отдаёт первичные ключи queryset пачками, по возрастанию pk."""
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def _noop_progress(done, total):
+    pass
+
+
+def _group_ids(pks):
+    return set(
+        Post.all_objects.filter(pk__in=pks).exclude(group=None)
+        .values_list('group_id', flat=True).distinct()
+    )
+
+
+def recount_likes(post_ids, batch_size=BATCH_SIZE):
+    """Пересчитывает count_likes постов по таблице лайков."""
+    likes = Like.objects.filter(post=OuterRef('pk')).order_by().values(
+        'post'
+    ).annotate(total=Count('pk')).values('total')
+    post_ids = sorted(post_ids)
+    for start in range(0, len(post_ids), batch_size):
+        with transaction.atomic():
+            # updated_at — чтобы сбросились закэшированные карточки.
+            Post.all_objects.filter(
+                pk__in=post_ids[start:start + batch_size]
+            ).update(
+                count_likes=Coalesce(Subquery(likes), 0),
+                updated_at=datetime.now(),
+            )
+
+
+def recount_ranks(post_ids):
+    """Пересчитывает рейтинг тех из постов, что сейчас в «горячих»."""
+    # ranking сам импортирует bulk.
+    from . import ranking
+    for post in Post.objects.filter(rank__isnull=False, pk__in=post_ids):
+        ranking.recount(post)
+
+
+def delete_in_batches(queryset, batch_size=BATCH_SIZE, progress=None):
+    """Удаляет строки таблицы без зависимых объектов пачками."""
+    progress = progress or _noop_progress
+    model = queryset.model
+    total = queryset.count()
+    done = 0
+    for pks in batched_pks(queryset, batch_size):
+        with transaction.atomic():
+            model.objects.filter(pk__in=pks).delete()
+        done += len(pks)
+        progress(done, total)
+    return done
+
+
+def delete_posts(queryset, batch_size=BATCH_SIZE, progress=None,
+                 db_cascade=False):
+    """Удаляет посты вместе с лайками, комментариями и картинками пачками.
+
+    С db_cascade зависимые строки удаляет сама база (ON DELETE CASCADE
+    из миграции posts.0009, только PostgreSQL).
+    """
+    progress = progress or _noop_progress
+    total = queryset.count()
+    done = 0
+    touched_groups = set()
+    for pks in batched_pks(queryset, batch_size):
+        touched_groups |= _group_ids(pks)
+        posts = Post.all_objects.filter(pk__in=pks)
+        images = set(posts.exclude(image='').values_list('image', flat=True))
+        with transaction.atomic():
+            if db_cascade:
+                posts._raw_delete(posts.db)
+            else:
+                Like.objects.filter(post_id__in=pks).delete()
+                Comment.objects.filter(post_id__in=pks).delete()
+                posts.delete()
+        delete_files(images)
+        done += len(pks)
+        progress(done, total)
+    group_stats.rebuild(touched_groups)
+    feed_versions.bump_all()
+    return done
+
+
+def move_posts(queryset, group, batch_size=BATCH_SIZE, progress=None):
+    """Переносит посты в группу group (или убирает из группы, если None)."""
+    progress = progress or _noop_progress
+    total = queryset.count()
+    done = 0
+    touched_groups = {group.pk} if group else set()
+    for pks in batched_pks(queryset, batch_size):
+        touched_groups |= _group_ids(pks)
+        with transaction.atomic():
+            # updated_at сдвигается вручную: update() не трогает auto_now,
+            # а по нему сбрасываются закэшированные карточки постов.
+            Post.all_objects.filter(pk__in=pks).update(
+                group=group, updated_at=datetime.now()
+            )
+        done += len(pks)
+        progress(done, total)
+    group_stats.rebuild(touched_groups)
+    feed_versions.bump_all()
+    return done
+
+
+def delete_author(user, batch_size=BATCH_SIZE, progress=None,
+                  db_cascade=False):
+    """Удаляет автора и всё, что на него ссылается, пачками."""
+    progress = progress or _noop_progress
+    delete_posts(
+        Post.all_objects.filter(author=user), batch_size, progress, db_cascade
+    )
+    follower_ids = list(
+        Follow.objects.filter(author=user).values_list('user_id', flat=True)
+    )
+    followee_ids = list(
+        Follow.objects.filter(user=user).values_list('author_id', flat=True)
+    )
+    liked_ids = set(
+        Like.objects.filter(user=user).values_list('post_id', flat=True)
+    )
+    commented_ids = set(
+        Comment.objects.filter(author=user).values_list('post_id', flat=True)
+    )
+    for queryset in (
+        Comment.objects.filter(author=user),
+        Like.objects.filter(user=user),
+        Follow.objects.filter(user=user),
+        Follow.objects.filter(author=user),
+    ):
+        delete_in_batches(queryset, batch_size, progress)
+    # Лайки и комментарии удалены в обход view: счётчики и рейтинг
+    # чужих постов пересчитываем.
+    recount_likes(liked_ids, batch_size)
+    recount_ranks(liked_ids | commented_ids)
+    if liked_ids:
+        feed_versions.bump_all()
+    follow_graph.invalidate(
+        [user.pk, *follower_ids], [user.pk, *followee_ids]
+    )
+    picture = user.profile_picture.name
+    user.delete()
+    if picture:
+        delete_files({picture})
+
+
+def delete_files(names):
+    """Удаляет картинки и их миниатюры, если на них больше никто
+    не ссылается."""
+    names = set(names) - set(
+        Post.all_objects.filter(image__in=names)
+        .values_list('image', flat=True)
+    )
+    for name in names:
+        try:
+            # Вместе с миниатюрами и их записями в KV-хранилище sorl.
+            delete_image(name)
+        except Exception:
+            logger.exception('Не удалось удалить файл %s', name)
+
+
+def hide_post(post):
+    """Сразу убирает пост из всех лент; удалит его purge_hidden."""
+    now = datetime.now()
+    Post.all_objects.filter(pk=post.pk).update(
+        deleted_at=now, updated_at=now
+    )
+    PostRank.objects.filter(post_id=post.pk).delete()
+    group_stats.post_removed(post)
+    feed_versions.bump(*feed_versions.post_scopes(post))
+
+
+def hide_posts(queryset, batch_size=BATCH_SIZE):
+    """Скрывает посты из queryset пачками."""
+    touched_groups = set()
+    for pks in batched_pks(queryset, batch_size):
+        touched_groups |= _group_ids(pks)
+        now = datetime.now()
+        with transaction.atomic():
+            Post.all_objects.filter(pk__in=pks).update(
+                deleted_at=now, updated_at=now
+            )
+            PostRank.objects.filter(post_id__in=pks).delete()
+    group_stats.rebuild(touched_groups)
+    feed_versions.bump_all()
+
+
+def hide_author(user, batch_size=BATCH_SIZE):
+    """Блокирует автора и скрывает его посты; удалит их purge_hidden."""
+    user.deleted_at = datetime.now()
+    user.is_active = False
+    user.save(update_fields=('deleted_at', 'is_active'))
+    hide_posts(Post.objects.filter(author=user), batch_size)
+
+
+def purge_hidden(batch_size=BATCH_SIZE, progress=None, db_cascade=False):
+    """Удаляет скрытых авторов и посты, затем их файлы. Возвращает
+    (посты, авторы)."""
+    posts = delete_posts(
+        Post.all_objects.exclude(deleted_at=None),
+        batch_size, progress, db_cascade,
+    )
+    authors = 0
+    for user in list(User.objects.exclude(deleted_at=None)):
+        delete_author(user, batch_size, progress, db_cascade)
+        authors += 1
+    return posts, authors
+
+
+def log_progress(label):
+    """Колбэк прогресса, который пишет в лог."""
+    def progress(done, total):
+        logger.info('%s: %s/%s', label, done, total)
+    return progress
@@ -0,0 +1,83 @@
+"""Кэш отрендеренных карточек постов.
+
+Карточка — разметка одного поста в ленте, общая для всех пользователей.
+Ключ включает updated_at поста, поэтому правка, лайк или перенос в другую
+группу сами делают старую карточку недостижимой, а удалённый пост просто
+больше не запрашивается. Имя автора и название группы в карточке тоже
+есть, поэтому в ключ входят их версии: их поднимают сигналы при
+сохранении пользователя и группы (posts.signals). Всё, что зависит
+от пользователя (кнопка лайка), рисуется поверх карточки в шаблоне ленты.
+"""
+import time
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+TEMPLATE = 'posts/includes/post_card.html'
+VARIANTS = ('index', 'group', 'profile', 'feed')
+CARD_TIMEOUT = 60 * 60 * 24
+# Размеры и опции должны совпадать с {% thumbnail %} в шаблонах,
+# иначе заранее посчитаются не те миниатюры.
+THUMBNAILS = (
+    ('800x200', {'crop': 'center', 'upscale': True}),
+    ('960x339', {'crop': 'center', 'upscale': False}),
+)
+
+
+def _version_key(kind, pk):
+    return f'card_version:{kind}:{pk}'
+
+
+def bump_author(user_id):
+    cache.set(_version_key('author', user_id), time.time(), None)
+
+
+def bump_group(group_id):
+    cache.set(_version_key('group', group_id), time.time(), None)
+
+
+def owner_versions(posts):
+    """Версии авторов и групп постов одним get_many."""
+    keys = set()
+    for post in posts:
+        keys.add(_version_key('author', post.author_id))
+        if post.group_id:
+            keys.add(_version_key('group', post.group_id))
+    found = cache.get_many(keys)
+    now = time.time()
+    for key in keys - set(found):
+        cache.add(key, now, None)
+        found[key] = cache.get(key, now)
+    return found
+
+
+def card_key(post, variant, versions=None):
+    if versions is None:
+        versions = owner_versions([post])
+    author = versions[_version_key('author', post.author_id)]
+    group = versions.get(_version_key('group', post.group_id), '')
+    return (
+        f'post_card:{variant}:{post.pk}:{post.updated_at.timestamp()}:'
+        f'{author}:{group}'
+    )
+
+
+def render_cards(posts, variant):
+    """Возвращает [(post, html)]: готовые карточки одним get_many,
+    недостающие рендерит и сохраняет одним set_many."""
+    if variant not in VARIANTS:
+        raise ValueError(f'Неизвестный вариант карточки: {variant!r}')
+    posts = list(posts)
+    versions = owner_versions(posts)
+    keys = [card_key(post, variant, versions) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    for post, key in zip(posts, keys):
+        if key not in cards:
+            missing[key] = render_to_string(
+                TEMPLATE, {'post': post, 'variant': variant}
+            )
+    if missing:
+        cache.set_many(missing, CARD_TIMEOUT)
+        cards.update(missing)
+    return [(post, cards[key]) for post, key in zip(posts, keys)]
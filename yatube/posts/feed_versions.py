@@ -0,0 +1,105 @@
+"""Штампы версий лент для условных GET-запросов (ETag / Last-Modified).
+
+Каждая лента (главная, группа, профиль, пост) имеет в кэше штамп времени
+последнего изменения, который обновляют пути записи. Декоратор
+feed_condition считает по штампам ETag и Last-Modified и отвечает
+304 Not Modified ещё до запуска view, без запросов к базе.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.views.decorators.http import condition
+
+# Штамп, который входит в каждую ленту: его сдвигают пакетные операции,
+# после которых проще сбросить всё, чем перечислять затронутые ленты.
+ALL = 'all'
+# Новые и удалённые посты: от них зависят счётчики на странице поста.
+POSTS = 'posts'
+INDEX = 'index'
+
+
+def group(slug):
+    return f'group:{slug}'
+
+
+def profile(username):
+    return f'profile:{username}'
+
+
+def post(post_id):
+    return f'post:{post_id}'
+
+
+def suggestions(user_id):
+    """Подсказки «на кого подписаться» пользователя: они есть на каждом
+    профиле, который он открывает."""
+    return f'suggestions:{user_id}'
+
+
+def _key(scope):
+    return f'feed_version:{scope}'
+
+
+def bump(*scopes):
+    now = time.time()
+    cache.set_many({_key(scope): now for scope in scopes}, None)
+
+
+def bump_all():
+    bump(ALL)
+
+
+def post_scopes(instance):
+    """Ленты, в которых показывается пост."""
+    scopes = [INDEX, POSTS, post(instance.pk)]
+    scopes.append(profile(instance.author.username))
+    if instance.group_id:
+        scopes.append(group(instance.group.slug))
+    return scopes
+
+
+def latest(scopes):
+    """Время последнего изменения любой из лент scopes."""
+    keys = [_key(scope) for scope in (ALL,) + tuple(scopes)]
+    stamps = cache.get_many(keys)
+    now = time.time()
+    for key in keys:
+        if key not in stamps:
+            # Штампа нет (кэш очищен или лента ещё не менялась): считаем,
+            # что она изменилась только что, это безопасно.
+            cache.add(key, now, None)
+            stamps[key] = now
+    return max(stamps.values())
+
+
+def feed_condition(scopes_func, user_scopes_func=None):
+    """Условный GET для view ленты.
+
+    scopes_func получает аргументы view и возвращает список лент,
+    от которых зависит страница; user_scopes_func — ленты, зависящие от
+    пользователя запроса (он получает request.user).
+    """
+    def stamp(request, *args, **kwargs):
+        if not hasattr(request, '_feed_stamp'):
+            scopes = list(scopes_func(*args, **kwargs))
+            if user_scopes_func is not None:
+                scopes.extend(user_scopes_func(request.user))
+            request._feed_stamp = latest(scopes)
+        return request._feed_stamp
+
+    def etag(request, *args, **kwargs):
+        source = '|'.join((
+            repr(stamp(request, *args, **kwargs)),
+            str(request.user.pk),
+            request.get_full_path(),
+        ))
+        return hashlib.md5(source.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        return datetime.fromtimestamp(
+            stamp(request, *args, **kwargs), timezone.utc
+        )
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
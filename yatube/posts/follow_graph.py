@@ -0,0 +1,71 @@
+"""Граф подписок с кэшем.
+
+Для каждого пользователя в кэше лежит множество id авторов, на которых он
+подписан, и число его подписчиков. Проверка «подписан ли» — поиск во
+множестве, без запроса к базе. Записи сбрасывают follow/unfollow и
+удаление автора; на случай других путей записи у ключей есть срок жизни.
+"""
+from django.core.cache import cache
+
+from .models import Follow
+
+FOLLOW_TIMEOUT = 60 * 60 * 24
+
+
+def _followees_key(user_id):
+    return f'follow:{user_id}:followees'
+
+
+def _followers_key(user_id):
+    return f'follow:{user_id}:followers'
+
+
+def followees(user_id):
+    """frozenset id авторов, на которых подписан пользователь."""
+    key = _followees_key(user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(
+            Follow.objects.filter(user_id=user_id)
+            .values_list('author_id', flat=True)
+        )
+        cache.add(key, ids, FOLLOW_TIMEOUT)
+    return ids
+
+
+def followee_count(user_id):
+    return len(followees(user_id))
+
+
+def follower_count(user_id):
+    key = _followers_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Follow.objects.filter(author_id=user_id).count()
+        cache.add(key, count, FOLLOW_TIMEOUT)
+    return count
+
+
+def is_following(user, author):
+    return user.is_authenticated and author.pk in followees(user.pk)
+
+
+def invalidate(user_ids=(), author_ids=()):
+    cache.delete_many(
+        [_followees_key(pk) for pk in user_ids]
+        + [_followers_key(pk) for pk in author_ids]
+    )
+
+
+def follow(user, author):
+    """Подписывает user на author; True, если подписки ещё не было."""
+    if user == author or is_following(user, author):
+        return False
+    Follow.objects.get_or_create(user=user, author=author)
+    invalidate([user.pk], [author.pk])
+    return True
+
+
+def unfollow(user, author):
+    Follow.objects.filter(user=user, author=author).delete()
+    invalidate([user.pk], [author.pk])
@@ -0,0 +1,102 @@
+"""Агрегированная статистика групп для каталога /groups/.
+
+Счётчики обновляются из путей записи постов (создание, правка, удаление,
+пакетные операции), поэтому страница каталога читает готовые строки
+GroupStats одним запросом.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Max
+
+from .models import Group, GroupAuthorStats, GroupStats, Post
+
+TOP_AUTHORS = 3
+
+
+def _top_authors(group_id):
+    return [
+        list(row) for row in GroupAuthorStats.objects.filter(
+            group_id=group_id, post_count__gt=0
+        ).order_by('-post_count', 'author_id').values_list(
+            'author__username', 'post_count'
+        )[:TOP_AUTHORS]
+    ]
+
+
+def _apply(group_id, author_id, delta, pub_date=None):
+    with transaction.atomic():
+        author_stats, _ = GroupAuthorStats.objects.get_or_create(
+            group_id=group_id, author_id=author_id
+        )
+        GroupAuthorStats.objects.filter(pk=author_stats.pk).update(
+            post_count=F('post_count') + delta
+        )
+        stats, _ = GroupStats.objects.select_for_update().get_or_create(
+            group_id=group_id
+        )
+        stats.post_count = max(stats.post_count + delta, 0)
+        if delta > 0 and pub_date is not None:
+            if stats.last_post_at is None or pub_date > stats.last_post_at:
+                stats.last_post_at = pub_date
+        else:
+            stats.last_post_at = Post.objects.filter(
+                group_id=group_id
+            ).aggregate(last=Max('pub_date'))['last']
+        stats.top_authors = _top_authors(group_id)
+        stats.save()
+
+
+def post_added(post):
+    if post.group_id:
+        _apply(post.group_id, post.author_id, 1, post.pub_date)
+
+
+def post_removed(post):
+    """Вызывать после удаления поста из базы."""
+    if post.group_id:
+        _apply(post.group_id, post.author_id, -1)
+
+
+def post_moved(post, old_group_id):
+    """Вызывать после сохранения поста, если у него могла смениться группа."""
+    if old_group_id == post.group_id:
+        return
+    if old_group_id:
+        _apply(old_group_id, post.author_id, -1)
+    post_added(post)
+
+
+def rebuild(group_ids=None):
+    """Пересчитывает статистику групп с нуля по таблице постов."""
+    groups = Group.objects.all()
+    if group_ids is not None:
+        groups = groups.filter(pk__in=group_ids)
+    group_ids = list(groups.values_list('pk', flat=True))
+    posts = Post.objects.filter(group_id__in=group_ids).order_by()
+    totals = {
+        row['group_id']: row for row in posts.values('group_id').annotate(
+            total=Count('pk'), last=Max('pub_date')
+        )
+    }
+    author_rows = posts.values('group_id', 'author_id').annotate(
+        total=Count('pk')
+    )
+    with transaction.atomic():
+        GroupAuthorStats.objects.filter(group_id__in=group_ids).delete()
+        GroupAuthorStats.objects.bulk_create(
+            GroupAuthorStats(
+                group_id=row['group_id'],
+                author_id=row['author_id'],
+                post_count=row['total'],
+            )
+            for row in author_rows
+        )
+        GroupStats.objects.filter(group_id__in=group_ids).delete()
+        GroupStats.objects.bulk_create(
+            GroupStats(
+                group_id=group_id,
+                post_count=totals.get(group_id, {}).get('total', 0),
+                last_post_at=totals.get(group_id, {}).get('last'),
+                top_authors=_top_authors(group_id),
+            )
+            for group_id in group_ids
+        )
@@ -0,0 +1,80 @@
+"""Фоновые задачи постов: их ставят view и админка, выполняет runworker."""
+from sorl.thumbnail import get_thumbnail
+
+from core import jobs
+
+from . import bulk, ranking, suggestions
+from .cards import THUMBNAILS
+from .models import Group, Post, User
+
+
+def rank_later(post):
+    jobs.enqueue('posts.rank', {'post_id': post.pk})
+
+
+def thumbnails_later(post):
+    if post.image:
+        jobs.enqueue(
+            'posts.thumbnails',
+            {'post_id': post.pk},
+            key=f'posts.thumbnails:{post.image.name}',
+        )
+
+
+def purge_hidden_later():
+    """Ставит удаление скрытых постов и авторов. Пока очистка ждёт
+    в очереди или выполняется, вторая не ставится."""
+    jobs.enqueue('posts.purge_hidden', key='posts.purge_hidden', requeue=True)
+
+
+def move_posts_later(post_ids, group):
+    jobs.enqueue('posts.move_posts', {
+        'post_ids': list(post_ids),
+        'group_id': group.pk if group else None,
+    })
+
+
+def follow_suggestions_later(user, author):
+    jobs.enqueue('posts.follow_suggestions', {
+        'user_id': user.pk, 'author_id': author.pk,
+    })
+
+
+@jobs.handler('posts.rank')
+def rank(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        ranking.recount(post)
+
+
+@jobs.handler('posts.thumbnails')
+def thumbnails(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None and post.image:
+        for geometry, options in THUMBNAILS:
+            get_thumbnail(post.image, geometry, **options)
+
+
+@jobs.handler('posts.purge_hidden')
+def purge_hidden():
+    bulk.purge_hidden(progress=bulk.log_progress('Удаление скрытого'))
+
+
+@jobs.handler('posts.move_posts')
+def move_posts(post_ids, group_id):
+    group = None
+    if group_id is not None:
+        group = Group.objects.filter(pk=group_id).first()
+        if group is None:
+            return
+    bulk.move_posts(
+        Post.all_objects.filter(pk__in=post_ids), group,
+        progress=bulk.log_progress('Перенос постов'),
+    )
+
+
+@jobs.handler('posts.follow_suggestions')
+def follow_suggestions(user_id, author_id):
+    users = User.objects.in_bulk([user_id, author_id])
+    if len(users) == 2:
+        suggestions.on_follow(users[user_id], users[author_id])
@@ -0,0 +1,152 @@
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from posts.models import Follow, GroupStats, Post
+
+SCENARIOS = (
+    'index', 'group', 'profile', 'follow', 'post_detail', 'like', 'comment',
+)
+
+
+def percentile(values, percent):
+    """Перцентиль по ближайшему рангу; values отсортированы."""
+    if not values:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank, 1) - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Гоняет сценарии ленты, групп, профилей, подписок, постов, лайков '
+        'и комментариев через настоящие view и печатает пропускную '
+        'способность и p50/p95/p99 (данные — из seed_data)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario', action='append', choices=SCENARIOS,
+            help='Сценарий (можно несколько; по умолчанию все)',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=500,
+            help='Запросов на сценарий',
+        )
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument(
+            '--users', type=int, default=200,
+            help='Сколько разных пользователей ходит в сценариях со входом',
+        )
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Имя хоста из ALLOWED_HOSTS для запросов',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.host = options['host']
+        self.rng = random.Random(options['seed'])
+        self.local = threading.local()
+        self.prepare(options['users'])
+        for scenario in options['scenario'] or SCENARIOS:
+            self.run(
+                scenario, options['requests'], options['concurrency']
+            )
+
+    def prepare(self, users):
+        recent = Post.objects.order_by('-pub_date')
+        self.post_ids = list(recent.values_list('pk', flat=True)[:1000])
+        self.usernames = sorted(set(
+            recent.values_list('author__username', flat=True)[:1000]
+        ))
+        self.slugs = list(GroupStats.objects.order_by(
+            '-post_count'
+        ).values_list('group__slug', flat=True)[:100])
+        # Входят те, на кого есть лента подписок.
+        self.user_ids = list(Follow.objects.values_list(
+            'user_id', flat=True
+        ).distinct()[:users])
+        if not (self.post_ids and self.user_ids):
+            raise CommandError(
+                'Нет постов или подписок: сначала запустите seed_data'
+            )
+
+    def client(self, logged_in):
+        """Клиент потока; у каждого пользователя свой адрес, чтобы
+        бюджеты RATELIMITS считались как у настоящих посетителей."""
+        clients = getattr(self.local, 'clients', None)
+        if clients is None:
+            clients = self.local.clients = {}
+        user_id = self.rng.choice(self.user_ids) if logged_in else None
+        client = clients.get(user_id)
+        if client is None:
+            number = user_id or 0
+            client = clients[user_id] = Client(
+                SERVER_NAME=self.host,
+                REMOTE_ADDR=f'10.{number >> 16 & 255}.'
+                            f'{number >> 8 & 255}.{number & 255}',
+            )
+            if user_id:
+                client.force_login(get_user_model().objects.get(pk=user_id))
+        return client
+
+    def plan(self, scenario):
+        """(клиент, метод, url, данные) очередного запроса сценария."""
+        rng = self.rng
+        post_id = rng.choice(self.post_ids)
+        if scenario == 'index':
+            return (self.client(False), 'get', reverse('posts:index'),
+                    {'page': rng.randint(1, 5)})
+        if scenario == 'group':
+            slug = rng.choice(self.slugs) if self.slugs else 'missing'
+            return (self.client(False), 'get',
+                    reverse('posts:group_list', args=[slug]), None)
+        if scenario == 'profile':
+            username = rng.choice(self.usernames)
+            return (self.client(False), 'get',
+                    reverse('posts:profile', args=[username]), None)
+        if scenario == 'follow':
+            return (self.client(True), 'get',
+                    reverse('posts:follow_index'), None)
+        if scenario == 'post_detail':
+            return (self.client(False), 'get',
+                    reverse('posts:post_detail', args=[post_id]), None)
+        if scenario == 'like':
+            return (self.client(True), 'get',
+                    reverse('posts:like', args=[post_id]), None)
+        return (self.client(True), 'post',
+                reverse('posts:add_comment', args=[post_id]),
+                {'text': 'Нагрузочный комментарий'})
+
+    def timed(self, scenario):
+        # Вход клиента не попадает в замер. Соединение с базой
+        # закрывается по request_finished, как у сервера.
+        client, method, url, data = self.plan(scenario)
+        started = time.perf_counter()
+        status = getattr(client, method)(url, data).status_code
+        return time.perf_counter() - started, status
+
+    def run(self, scenario, requests, concurrency):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(
+                self.timed, [scenario] * requests
+            ))
+        elapsed = time.perf_counter() - started
+        latencies = sorted(seconds * 1000 for seconds, _ in results)
+        errors = sum(1 for _, status in results if status >= 400)
+        self.stdout.write(
+            f'{scenario:>11}: {requests / elapsed:8.1f} з/с, '
+            f'p50 {percentile(latencies, 50):7.1f} мс, '
+            f'p95 {percentile(latencies, 95):7.1f} мс, '
+            f'p99 {percentile(latencies, 99):7.1f} мс, '
+            f'ошибок {errors}'
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts import suggestions
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает подсказки «на кого подписаться» по графу подписок '
+        'и лайков (запускать по расписанию)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=suggestions.TOP_K)
+        parser.add_argument(
+            '--batch-size', type=int, default=suggestions.BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        total = suggestions.build(
+            options['top'], options['batch_size'], progress=self.progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Подсказки пересчитаны для пользователей: {total}'
+        ))
+
+    def progress(self, done, total):
+        self.stdout.write(f'{done}/{total}')
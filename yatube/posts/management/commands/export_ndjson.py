@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts import ndjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает пользователей, группы, посты, комментарии, '
+        'подписки и лайки в NDJSON. Повторный запуск продолжает выгрузку '
+        'с контрольной точки <файл>.ckpt'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--chunk-size', type=int, default=ndjson.CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        rows = ndjson.export(
+            options['path'], options['chunk_size'], report=self.report
+        )
+        self.stdout.write(self.style.SUCCESS(f'Выгружено строк: {rows}'))
+
+    def report(self, label, rows, rate):
+        self.stdout.write(f'{label}: {rows} строк, {rate:.0f} строк/с')
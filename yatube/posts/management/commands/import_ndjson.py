@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from posts import feed_versions, group_stats, ndjson, ranking
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает NDJSON, выгруженный export_ndjson, пачками '
+        'через bulk_create с переназначением ключей. Состояние хранится '
+        'в <файл>.state.sqlite3, повторный запуск продолжает загрузку'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--batch-size', type=int, default=ndjson.CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        rows = ndjson.Importer(
+            options['path'], options['batch_size'], report=self.report
+        ).run()
+        group_stats.rebuild()
+        ranking.refresh()
+        feed_versions.bump_all()
+        self.stdout.write(self.style.SUCCESS(f'Загружено строк: {rows}'))
+
+    def report(self, label, rows, rate):
+        self.stdout.write(f'{label}: {rows} строк, {rate:.0f} строк/с')
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import bulk
+from posts.models import Group, Post
+
+
+class Command(BaseCommand):
+    help = 'Переносит посты из одной группы в другую пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('from_group', help='slug исходной группы')
+        parser.add_argument(
+            'to_group', nargs='?',
+            help='slug целевой группы; без него посты остаются без группы',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=bulk.BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        source = self.get_group(options['from_group'])
+        target = None
+        if options['to_group']:
+            target = self.get_group(options['to_group'])
+        moved = bulk.move_posts(
+            Post.objects.filter(group=source),
+            target,
+            options['batch_size'],
+            progress=self.progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Перенесено постов: {moved}'))
+
+    def get_group(self, slug):
+        try:
+            return Group.objects.get(slug=slug)
+        except Group.DoesNotExist:
+            raise CommandError(f'Группа {slug} не найдена')
+
+    def progress(self, done, total):
+        self.stdout.write(f'{done}/{total}')
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts import partitions
+
+
+def month(value):
+    return datetime.strptime(value, '%Y-%m')
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт помесячные секции комментариев и лайков наперёд '
+        'и отсоединяет старые для архива (запускать по расписанию, '
+        'только PostgreSQL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert', action='store_true',
+            help='Сначала превратить обычные таблицы в секционированные '
+                 '(блокирует таблицы на время копирования)',
+        )
+        parser.add_argument(
+            '--ahead', type=int, default=partitions.AHEAD_MONTHS,
+            help='На сколько месяцев вперёд создавать секции',
+        )
+        parser.add_argument(
+            '--detach-before', type=month, metavar='ГГГГ-ММ',
+            help='Отсоединить секции месяцев раньше указанного',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Секционирование работает только на PostgreSQL')
+        for model_name, field_name in partitions.PARTITIONED:
+            model = apps.get_model('posts', model_name)
+            table = model._meta.db_table
+            if options['convert'] and partitions.convert(
+                connection, model, field_name, options['ahead']
+            ):
+                self.stdout.write(f'{table}: секционирована')
+            for name in partitions.ensure(
+                connection, model, field_name, options['ahead']
+            ):
+                self.stdout.write(f'{table}: создана {name}')
+            if options['detach_before']:
+                for name in partitions.detach_before(
+                    connection, model, options['detach_before']
+                ):
+                    self.stdout.write(f'{table}: отсоединена {name}')
+        self.stdout.write(self.style.SUCCESS('Готово'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import bulk
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Удаляет автора со всеми постами, комментариями и лайками пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--batch-size', type=int, default=bulk.BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден'
+            )
+        bulk.delete_author(
+            user, options['batch_size'], progress=self.progress
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Автор {options["username"]} удалён'
+        ))
+
+    def progress(self, done, total):
+        self.stdout.write(f'{done}/{total}')
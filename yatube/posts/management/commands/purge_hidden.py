@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts import bulk
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет скрытые посты и авторов пачками, затем их картинки '
+        '(запускать по расписанию)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=bulk.BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--db-cascade', action='store_true',
+            help='Лайки и комментарии удаляет база (ON DELETE CASCADE, '
+                 'только PostgreSQL)',
+        )
+
+    def handle(self, *args, **options):
+        if options['db_cascade'] and connection.vendor != 'postgresql':
+            raise CommandError('--db-cascade работает только на PostgreSQL')
+        posts, authors = bulk.purge_hidden(
+            options['batch_size'],
+            progress=self.progress,
+            db_cascade=options['db_cascade'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено постов: {posts}, авторов: {authors}'
+        ))
+
+    def progress(self, done, total):
+        self.stdout.write(f'{done}/{total}')
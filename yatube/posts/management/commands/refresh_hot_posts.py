@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts import ranking
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг «горячих» постов (запускать по расписанию)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=ranking.BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        refreshed = ranking.refresh(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано постов: {refreshed}'
+        ))
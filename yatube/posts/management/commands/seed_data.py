@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, группами, постами, '
+        'подписками, лайками и комментариями для нагрузочных тестов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--groups', type=int, default=200)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Подписок на пользователя в среднем',
+        )
+        parser.add_argument('--likes', type=int, default=2000000)
+        parser.add_argument('--comments', type=int, default=500000)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней до сегодня распределить посты',
+        )
+        parser.add_argument('--batch-size', type=int, default=seed.BATCH_SIZE)
+        parser.add_argument('--prefix', default='seed')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            totals = seed.seed(
+                users=options['users'],
+                posts=options['posts'],
+                groups=options['groups'],
+                follows=options['follows'],
+                likes=options['likes'],
+                comments=options['comments'],
+                prefix=options['prefix'],
+                days=options['days'],
+                batch_size=options['batch_size'],
+                seed=options['seed'],
+                progress=self.progress,
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(', '.join(
+            f'{name}: {total}' for name, total in totals.items()
+        )))
+
+    def progress(self, label, done, total):
+        self.stdout.write(f'{label}: {done}/{total}')
@@ -0,0 +1,107 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Count
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from sorl.thumbnail import get_thumbnail
+
+from posts.cards import THUMBNAILS
+from posts.models import GroupStats, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает кэши после деплоя: рендерит через настоящие view '
+        '(в обход middleware, чтобы не трогать лимиты и метрики) первые '
+        'страницы ленты, популярные группы и профили, свежие посты и их '
+        'миниатюры'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--index-pages', type=int, default=5)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--profiles', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=50)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Имя хоста из ALLOWED_HOSTS для запросов',
+        )
+
+    def handle(self, *args, **options):
+        self.factory = RequestFactory(SERVER_NAME=options['host'])
+        posts = list(
+            Post.objects.order_by('-pub_date')[:options['posts']]
+        )
+        urls = self.urls(options, posts)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['workers']) as pool:
+            statuses = list(pool.map(self.fetch, urls))
+            thumbnails = sum(pool.map(self.thumbnails, posts))
+        failed = [
+            (url, status) for url, status in zip(urls, statuses)
+            if status != 200
+        ]
+        for url, status in failed:
+            self.stderr.write(f'{url}: {status}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Страниц: {len(urls) - len(failed)} из {len(urls)}, '
+            f'миниатюр: {thumbnails}, '
+            f'за {time.perf_counter() - started:.1f} с'
+        ))
+
+    def urls(self, options, posts):
+        index = reverse('posts:index')
+        urls = [index] + [
+            f'{index}?page={page}'
+            for page in range(2, options['index_pages'] + 1)
+        ]
+        groups = GroupStats.objects.select_related('group').order_by(
+            '-post_count'
+        )[:options['groups']]
+        urls += [
+            reverse('posts:group_list', args=[stats.group.slug])
+            for stats in groups
+        ]
+        authors = get_user_model().objects.annotate(
+            post_count=Count('posts')
+        ).filter(post_count__gt=0).order_by('-post_count')
+        urls += [
+            reverse('posts:profile', args=[author.username])
+            for author in authors[:options['profiles']]
+        ]
+        urls += [
+            reverse('posts:post_detail', args=[post.pk]) for post in posts
+        ]
+        return urls
+
+    def fetch(self, url):
+        """Код ответа view или текст ошибки: одна упавшая страница
+        не прерывает прогрев остальных."""
+        request = self.factory.get(url)
+        request.user = AnonymousUser()
+        match = resolve(request.path_info)
+        try:
+            return match.func(request, *match.args, **match.kwargs).status_code
+        except Exception as error:
+            return f'{type(error).__name__}: {error}'
+        finally:
+            connections.close_all()
+
+    def thumbnails(self, post):
+        if not post.image:
+            return 0
+        try:
+            for geometry, thumbnail_options in THUMBNAILS:
+                get_thumbnail(post.image, geometry, **thumbnail_options)
+        except Exception as error:
+            self.stderr.write(f'Миниатюра поста {post.pk}: {error}')
+            return 0
+        finally:
+            connections.close_all()
+        return len(THUMBNAILS)
@@ -0,0 +1,80 @@
+# Generated by Django 3.2.25 on 2026-10-19 05:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Max
+
+
+def build_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupAuthorStats = apps.get_model('posts', 'GroupAuthorStats')
+    db = schema_editor.connection.alias
+    posts = Post.objects.using(db).exclude(group=None).order_by()
+    GroupAuthorStats.objects.using(db).bulk_create(
+        GroupAuthorStats(
+            group_id=row['group_id'],
+            author_id=row['author_id'],
+            post_count=row['total'],
+        )
+        for row in posts.values('group_id', 'author_id').annotate(
+            total=Count('pk')
+        )
+    )
+    totals = {
+        row['group_id']: row for row in posts.values('group_id').annotate(
+            total=Count('pk'), last=Max('pub_date')
+        )
+    }
+    for group_id in Group.objects.using(db).values_list('pk', flat=True):
+        top = GroupAuthorStats.objects.using(db).filter(
+            group_id=group_id
+        ).order_by('-post_count', 'author_id').values_list(
+            'author__username', 'post_count'
+        )[:3]
+        GroupStats.objects.using(db).create(
+            group_id=group_id,
+            post_count=totals.get(group_id, {}).get('total', 0),
+            last_post_at=totals.get(group_id, {}).get('last'),
+            top_authors=[list(row) for row in top],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0005_postrank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.group')),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('last_post_at', models.DateTimeField(blank=True, null=True)),
+                ('top_authors', models.JSONField(default=list)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GroupAuthorStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_stats', to=settings.AUTH_USER_MODEL)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='author_stats', to='posts.group')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupauthorstats',
+            index=models.Index(fields=['group', '-post_count'], name='posts_group_group_i_777893_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupauthorstats',
+            constraint=models.UniqueConstraint(fields=('group', 'author'), name='unique_group_author_stats'),
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+"""ON DELETE CASCADE на внешних ключах к постам (только PostgreSQL).
+
+Тогда bulk.purge_hidden(db_cascade=True) удаляет пачку постов одним
+DELETE, а лайки, комментарии и рейтинг удаляет сама база. Django сам
+такие ограничения не создаёт: если миграция пересоздаст одно из полей
+ниже, её нужно будет повторить.
+"""
+from django.db import migrations
+
+# (модель, поле) со ссылкой на Post.
+CASCADE_FIELDS = (
+    ('Comment', 'post'),
+    ('Like', 'post'),
+    ('PostRank', 'post'),
+)
+
+
+def _recreate(apps, schema_editor, on_delete):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    with connection.cursor() as cursor:
+        for model_name, field_name in CASCADE_FIELDS:
+            model = apps.get_model('posts', model_name)
+            table = model._meta.db_table
+            column = model._meta.get_field(field_name).column
+            constraints = connection.introspection.get_constraints(
+                cursor, table
+            )
+            for name, info in constraints.items():
+                if not info['foreign_key'] or info['columns'] != [column]:
+                    continue
+                target_table, target_column = info['foreign_key']
+                cursor.execute(
+                    f'ALTER TABLE {quote(table)} '
+                    f'DROP CONSTRAINT {quote(name)}, '
+                    f'ADD CONSTRAINT {quote(name)} '
+                    f'FOREIGN KEY ({quote(column)}) '
+                    f'REFERENCES {quote(target_table)} '
+                    f'({quote(target_column)}) {on_delete}'
+                    'DEFERRABLE INITIALLY DEFERRED'
+                )
+
+
+def add_cascade(apps, schema_editor):
+    _recreate(apps, schema_editor, 'ON DELETE CASCADE ')
+
+
+def remove_cascade(apps, schema_editor):
+    _recreate(apps, schema_editor, '')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_soft_delete'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_cascade, remove_cascade),
+    ]
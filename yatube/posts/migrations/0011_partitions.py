@@ -0,0 +1,141 @@
+"""Дата лайка и помесячные секции комментариев и лайков.
+
+Секции создаются только на PostgreSQL и только при
+settings.PARTITION_TABLES (см. posts.partitions); обратно таблицы
+в обычные не превращаются.
+"""
+from datetime import datetime
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Копия posts.partitions на момент миграции: она не должна меняться
+# вместе с модулем приложения.
+PARTITIONED = (
+    ('Comment', 'created'),
+    ('Like', 'created'),
+)
+AHEAD_MONTHS = 3
+DEFAULT_SUFFIX = '_default'
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(start, months):
+    index = start.year * 12 + start.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def create_partition(cursor, quote, table, column, start):
+    name = f'{table}_{start:%Y_%m}'
+    bounds = [start, add_months(start, 1)]
+    cursor.execute(
+        f'CREATE TABLE {quote(name)} '
+        f'(LIKE {quote(table)} INCLUDING DEFAULTS)'
+    )
+    cursor.execute(
+        f'ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} '
+        'FOR VALUES FROM (%s) TO (%s)',
+        bounds,
+    )
+
+
+def convert(connection, model, field_name):
+    table = model._meta.db_table
+    pk = model._meta.pk.column
+    column = model._meta.get_field(field_name).column
+    quote = connection.ops.quote_name
+    old = f'{table}_unpartitioned'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table '
+            'WHERE partrelid = to_regclass(%s)',
+            [table],
+        )
+        if cursor.fetchone() is not None:
+            return
+        cursor.execute(
+            'SELECT pg_get_indexdef(indexrelid) FROM pg_index '
+            'WHERE indrelid = to_regclass(%s) AND NOT indisprimary',
+            [table],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [table, pk])
+        sequence = cursor.fetchone()[0]
+        cursor.execute(f'SELECT min({quote(column)}) FROM {quote(table)}')
+        now = datetime.now()
+        first = cursor.fetchone()[0] or now
+
+        cursor.execute(f'ALTER TABLE {quote(table)} RENAME TO {quote(old)}')
+        cursor.execute(
+            f'CREATE TABLE {quote(table)} '
+            f'(LIKE {quote(old)} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ({quote(column)})'
+        )
+        cursor.execute(
+            f'ALTER TABLE {quote(table)} '
+            f'ADD PRIMARY KEY ({quote(pk)}, {quote(column)})'
+        )
+        cursor.execute(
+            f'CREATE TABLE {quote(table + DEFAULT_SUFFIX)} '
+            f'PARTITION OF {quote(table)} DEFAULT'
+        )
+        start = month_start(first)
+        last = add_months(month_start(now), AHEAD_MONTHS)
+        while start <= last:
+            create_partition(cursor, quote, table, column, start)
+            start = add_months(start, 1)
+        cursor.execute(
+            f'INSERT INTO {quote(table)} SELECT * FROM {quote(old)}'
+        )
+        if sequence:
+            cursor.execute(
+                f'ALTER SEQUENCE {sequence} '
+                f'OWNED BY {quote(table)}.{quote(pk)}'
+            )
+        cursor.execute(f'DROP TABLE {quote(old)}')
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(
+                f'ALTER TABLE {quote(table)} '
+                f'ADD CONSTRAINT {quote(name)} {definition}'
+            )
+
+
+def partition(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql' or not settings.PARTITION_TABLES:
+        return
+    for model_name, field_name in PARTITIONED:
+        convert(connection, apps.get_model('posts', model_name), field_name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_followsuggestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='like',
+            name='created',
+            field=models.DateTimeField(
+                auto_now_add=True,
+                default=django.utils.timezone.now,
+                verbose_name='Дата лайка',
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(partition, migrations.RunPython.noop),
+    ]
@@ -18,6 +18,13 @@ class Group(models.Model):
         return self.title
 
 
+class VisiblePostManager(models.Manager):
+    """Посты без скрытых в ожидании удаления (см. bulk.purge_hidden)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст поста')
     pub_date = models.DateTimeField(auto_now_add=True)
@@ -40,6 +47,19 @@ class Post(models.Model):
         blank=True
     )
     count_likes = models.PositiveIntegerField(null=True)
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name='Скрыт для удаления',
+    )
+
+    objects = VisiblePostManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.text[:15]
@@ -88,4 +108,77 @@ class Like(models.Model):
         User,
         on_delete=models.CASCADE,
     )
-    
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата лайка',
+    )
+
+
+class PostRank(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rank',
+    )
+    likes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    score = models.FloatField(default=0, db_index=True)
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score}'
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    post_count = models.PositiveIntegerField(default=0)
+    last_post_at = models.DateTimeField(null=True, blank=True)
+    # [[username, post_count], ...] самых активных авторов группы
+    top_authors = models.JSONField(default=list)
+
+    def __str__(self):
+        return f'{self.group}: {self.post_count}'
+
+
+class GroupAuthorStats(models.Model):
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='author_stats',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='group_stats',
+    )
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('group', 'author'), name='unique_group_author_stats'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=('group', '-post_count')),
+        ]
+
+
+class FollowSuggestion(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='follow_suggestions',
+    )
+    # [[author_id, username, score], ...] по убыванию score
+    suggestions = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.user_id}: {len(self.suggestions)}'
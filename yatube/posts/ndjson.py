@@ -0,0 +1,262 @@
+"""Потоковый экспорт и импорт данных в формате NDJSON.
+
+Одна строка файла — одна запись:
+{"model": "posts.post", "pk": 1, "fields": {"text": "...", "author": 3}}.
+Экспорт читает таблицы через iterator(chunk_size), импорт вставляет пачки
+через bulk_create и переназначает первичные ключи. Соответствие старых и
+новых ключей и позиция в файле хранятся в SQLite-файле состояния на диске,
+поэтому память не растёт с объёмом данных, а прерванный импорт можно
+продолжить с места остановки.
+"""
+import contextlib
+import datetime
+import json
+import sqlite3
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .models import Comment, Follow, Group, Like, Post
+
+CHUNK_SIZE = 2000
+
+
+class Encoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder без округления времени до миллисекунд."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def models():
+    """Модели в порядке зависимостей: сначала те, на кого ссылаются."""
+    return [get_user_model(), Group, Post, Comment, Follow, Like]
+
+
+def _fields(model):
+    return [field for field in model._meta.concrete_fields
+            if not field.primary_key]
+
+
+class Meter:
+    """Считает строки и пишет скорость в report(label, rows, rate)."""
+
+    def __init__(self, report):
+        self.report = report
+        self.started = time.monotonic()
+        self.rows = 0
+
+    def add(self, label, rows):
+        self.rows += rows
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        self.report(label, self.rows, self.rows / elapsed)
+
+
+def export(path, chunk_size=CHUNK_SIZE, report=None):
+    """Выгружает модели в файл path, продолжая с контрольной точки."""
+    checkpoint_path = f'{path}.ckpt'
+    try:
+        with open(checkpoint_path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+    except FileNotFoundError:
+        checkpoint = {'model': None, 'last_pk': 0, 'offset': 0}
+    meter = Meter(report or (lambda *args: None))
+    labels = [model._meta.label_lower for model in models()]
+    start = labels.index(checkpoint['model']) if checkpoint['model'] else 0
+
+    with open(path, 'ab') as out:
+        # Всё, что дописано после последней контрольной точки, — недописанная
+        # пачка, её выгрузим заново.
+        out.truncate(checkpoint['offset'])
+        for model in models()[start:]:
+            label = model._meta.label_lower
+            last_pk = 0
+            if label == checkpoint['model']:
+                last_pk = checkpoint['last_pk']
+            fields = _fields(model)
+            rows = model._base_manager.filter(pk__gt=last_pk).order_by(
+                'pk'
+            ).values_list('pk', *(field.attname for field in fields))
+            batch = 0
+            for row in rows.iterator(chunk_size=chunk_size):
+                record = {
+                    'model': label,
+                    'pk': row[0],
+                    'fields': {
+                        field.name: value
+                        for field, value in zip(fields, row[1:])
+                    },
+                }
+                out.write(json.dumps(
+                    record, cls=Encoder, ensure_ascii=False
+                ).encode() + b'\n')
+                last_pk = row[0]
+                batch += 1
+                if batch == chunk_size:
+                    _save_checkpoint(checkpoint_path, out, label, last_pk)
+                    meter.add(label, batch)
+                    batch = 0
+            _save_checkpoint(checkpoint_path, out, label, last_pk)
+            meter.add(label, batch)
+    return meter.rows
+
+
+def _save_checkpoint(checkpoint_path, out, label, last_pk):
+    out.flush()
+    with open(checkpoint_path, 'w') as checkpoint_file:
+        json.dump({
+            'model': label, 'last_pk': last_pk, 'offset': out.tell(),
+        }, checkpoint_file)
+
+
+@contextlib.contextmanager
+def keep_dates(model):
+    """Не даёт auto_now/auto_now_add перезаписать импортируемые даты."""
+    saved = []
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False) or getattr(
+            field, 'auto_now_add', False
+        ):
+            saved.append((field, field.auto_now, field.auto_now_add))
+            field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class ImportState:
+    """Состояние импорта в SQLite-файле: смещение в файле и карта ключей."""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(
+            'CREATE TABLE IF NOT EXISTS progress (offset INTEGER);'
+            'CREATE TABLE IF NOT EXISTS next_pk '
+            '(model TEXT PRIMARY KEY, value INTEGER);'
+            'CREATE TABLE IF NOT EXISTS pkmap (model TEXT, old INTEGER, '
+            'new INTEGER, PRIMARY KEY (model, old));'
+        )
+        row = self.db.execute('SELECT offset FROM progress').fetchone()
+        self.offset = row[0] if row else 0
+
+    def next_pk(self, model):
+        label = model._meta.label_lower
+        row = self.db.execute(
+            'SELECT value FROM next_pk WHERE model = ?', (label,)
+        ).fetchone()
+        if row:
+            return row[0]
+        current = model._base_manager.aggregate(top=Max('pk'))['top']
+        return (current or 0) + 1
+
+    def lookup(self, label, old_pks):
+        old_pks = list(set(old_pks))
+        mapping = {}
+        # Порциями, чтобы не упереться в лимит параметров SQLite.
+        for start in range(0, len(old_pks), 500):
+            part = old_pks[start:start + 500]
+            mapping.update(self.db.execute(
+                'SELECT old, new FROM pkmap WHERE model = ? AND old IN '
+                f'({",".join("?" * len(part))})',
+                [label, *part],
+            ).fetchall())
+        return mapping
+
+    def commit(self, model, pairs, next_pk, offset):
+        label = model._meta.label_lower
+        with self.db:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO pkmap VALUES (?, ?, ?)',
+                ((label, old, new) for old, new in pairs),
+            )
+            self.db.execute(
+                'INSERT OR REPLACE INTO next_pk VALUES (?, ?)',
+                (label, next_pk),
+            )
+            self.db.execute('DELETE FROM progress')
+            self.db.execute('INSERT INTO progress VALUES (?)', (offset,))
+        self.offset = offset
+
+    def close(self):
+        self.db.close()
+
+
+class Importer:
+    def __init__(self, path, batch_size=CHUNK_SIZE, report=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.state = ImportState(f'{path}.state.sqlite3')
+        self.meter = Meter(report or (lambda *args: None))
+        self.models = {model._meta.label_lower: model for model in models()}
+
+    def run(self):
+        model, batch = None, []
+        with open(self.path, 'rb') as source:
+            source.seek(self.state.offset)
+            for line in iter(source.readline, b''):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                record_model = self.models[record['model']]
+                if batch and (
+                    record_model is not model
+                    or len(batch) >= self.batch_size
+                ):
+                    # Смещение — начало текущей строки: она ещё не вставлена.
+                    self.flush(model, batch, source.tell() - len(line))
+                    batch = []
+                model = record_model
+                batch.append(record)
+            if batch:
+                self.flush(model, batch, source.tell())
+        self.finish()
+        return self.meter.rows
+
+    def flush(self, model, batch, offset):
+        next_pk = self.state.next_pk(model)
+        foreign = {
+            field.name: (field, self.state.lookup(
+                field.related_model._meta.label_lower,
+                [r['fields'][field.name] for r in batch
+                 if r['fields'].get(field.name) is not None],
+            ))
+            for field in _fields(model) if field.is_relation
+        }
+        objects, pairs = [], []
+        for record in batch:
+            values = {}
+            for field in _fields(model):
+                if field.name not in record['fields']:
+                    continue
+                value = record['fields'][field.name]
+                if field.name in foreign and value is not None:
+                    value = foreign[field.name][1][value]
+                elif value is not None:
+                    value = field.to_python(value)
+                values[field.attname] = value
+            objects.append(model(pk=next_pk, **values))
+            pairs.append((record['pk'], next_pk))
+            next_pk += 1
+        with keep_dates(model), transaction.atomic():
+            model._default_manager.bulk_create(objects)
+        self.state.commit(model, pairs, next_pk, offset)
+        self.meter.add(model._meta.label_lower, len(objects))
+
+    def finish(self):
+        """Сдвигает последовательности ключей после вставки с явными pk."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), list(self.models.values())
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+        self.state.close()
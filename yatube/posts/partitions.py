@@ -0,0 +1,210 @@
+"""Помесячное секционирование комментариев и лайков (только PostgreSQL).
+
+Таблицы растут без предела, а читается в основном свежий хвост. После
+convert() таблица разбита PARTITION BY RANGE по дате создания: запросы
+с условием на дату обходят только нужные месяцы, индексы каждой секции
+остаются небольшими, а старый месяц отсоединяется (detach_before) как
+обычная таблица, которую можно выгрузить и удалить без DELETE по всей
+таблице. Строки вне созданных месяцев попадают в секцию _default, чтобы
+вставка не падала, если ensure() вовремя не запустили.
+
+Первичный ключ секционированной таблицы обязан включать ключ
+секционирования, поэтому он становится (id, created); Django по-прежнему
+ищет строки по id. По той же причине нельзя секционировать posts_post:
+комментарии, лайки и рейтинг ссылаются на пост по одному id.
+
+Django о секциях не знает: если миграция пересоздаст таблицу или её
+первичный ключ, секционирование придётся повторить.
+"""
+import re
+from datetime import datetime
+
+from django.db import transaction
+
+# (модель, поле с датой) для секционирования.
+PARTITIONED = (
+    ('Comment', 'created'),
+    ('Like', 'created'),
+)
+AHEAD_MONTHS = 3
+DEFAULT_SUFFIX = '_default'
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(start, months):
+    index = start.year * 12 + start.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, start):
+    return f'{table}_{start:%Y_%m}'
+
+
+def _columns(model, field_name):
+    return model._meta.pk.column, model._meta.get_field(field_name).column
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)',
+        [table],
+    )
+    return cursor.fetchone() is not None
+
+
+def partitions(cursor, table):
+    """{начало месяца: имя секции} для секций, созданных этим модулем."""
+    cursor.execute(
+        'SELECT c.relname FROM pg_inherits i '
+        'JOIN pg_class c ON c.oid = i.inhrelid '
+        'WHERE i.inhparent = to_regclass(%s)',
+        [table],
+    )
+    pattern = re.compile(rf'{re.escape(table)}_(\d{{4}})_(\d{{2}})$')
+    found = {}
+    for (name,) in cursor.fetchall():
+        match = pattern.match(name)
+        if match:
+            found[datetime(int(match[1]), int(match[2]), 1)] = name
+    return found
+
+
+def _create_partition(cursor, quote, table, column, start):
+    """Секция за месяц start. Строки этого месяца, успевшие попасть
+    в _default, переносятся в неё до присоединения."""
+    name = partition_name(table, start)
+    default = table + DEFAULT_SUFFIX
+    bounds = [start, add_months(start, 1)]
+    cursor.execute(
+        f'CREATE TABLE {quote(name)} '
+        f'(LIKE {quote(table)} INCLUDING DEFAULTS)'
+    )
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {quote(default)} '
+        f'WHERE {quote(column)} >= %s AND {quote(column)} < %s '
+        f'RETURNING *) INSERT INTO {quote(name)} SELECT * FROM moved',
+        bounds,
+    )
+    cursor.execute(
+        f'ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} '
+        'FOR VALUES FROM (%s) TO (%s)',
+        bounds,
+    )
+    return name
+
+
+def ensure(connection, model, field_name, ahead=AHEAD_MONTHS, now=None):
+    """Создаёт секции до месяца now + ahead. Возвращает имена новых."""
+    table = model._meta.db_table
+    _, column = _columns(model, field_name)
+    quote = connection.ops.quote_name
+    current = month_start(now or datetime.now())
+    last = add_months(current, ahead)
+    created = []
+    with transaction.atomic(using=connection.alias), \
+            connection.cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            return created
+        existing = partitions(cursor, table)
+        start = min(max(existing), current) if existing else current
+        while start <= last:
+            if start not in existing:
+                created.append(
+                    _create_partition(cursor, quote, table, column, start)
+                )
+            start = add_months(start, 1)
+    return created
+
+
+def convert(connection, model, field_name, ahead=AHEAD_MONTHS, now=None):
+    """Переделывает обычную таблицу в секционированную по месяцам.
+
+    Работает в одной транзакции и держит блокировку таблицы, пока копирует
+    строки, — запускать в окно обслуживания. Возвращает False, если
+    таблица уже секционирована.
+    """
+    table = model._meta.db_table
+    pk, column = _columns(model, field_name)
+    quote = connection.ops.quote_name
+    old = f'{table}_unpartitioned'
+    with transaction.atomic(using=connection.alias), \
+            connection.cursor() as cursor:
+        if is_partitioned(cursor, table):
+            return False
+        cursor.execute(
+            'SELECT pg_get_indexdef(indexrelid) FROM pg_index '
+            'WHERE indrelid = to_regclass(%s) AND NOT indisprimary',
+            [table],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [table, pk])
+        sequence = cursor.fetchone()[0]
+        cursor.execute(
+            f'SELECT min({quote(column)}) FROM {quote(table)}'
+        )
+        first = cursor.fetchone()[0] or now or datetime.now()
+
+        cursor.execute(f'ALTER TABLE {quote(table)} RENAME TO {quote(old)}')
+        cursor.execute(
+            f'CREATE TABLE {quote(table)} '
+            f'(LIKE {quote(old)} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ({quote(column)})'
+        )
+        cursor.execute(
+            f'ALTER TABLE {quote(table)} '
+            f'ADD PRIMARY KEY ({quote(pk)}, {quote(column)})'
+        )
+        cursor.execute(
+            f'CREATE TABLE {quote(table + DEFAULT_SUFFIX)} '
+            f'PARTITION OF {quote(table)} DEFAULT'
+        )
+        start = month_start(first)
+        last = add_months(month_start(now or datetime.now()), ahead)
+        while start <= last:
+            _create_partition(cursor, quote, table, column, start)
+            start = add_months(start, 1)
+        cursor.execute(
+            f'INSERT INTO {quote(table)} SELECT * FROM {quote(old)}'
+        )
+        if sequence:
+            # Иначе последовательность id удалится вместе со старой таблицей.
+            cursor.execute(
+                f'ALTER SEQUENCE {sequence} '
+                f'OWNED BY {quote(table)}.{quote(pk)}'
+            )
+        cursor.execute(f'DROP TABLE {quote(old)}')
+        # Определения сняты до переименования и ссылаются на новое имя.
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(
+                f'ALTER TABLE {quote(table)} '
+                f'ADD CONSTRAINT {quote(name)} {definition}'
+            )
+    return True
+
+
+def detach_before(connection, model, before):
+    """Отсоединяет секции месяцев раньше before. Они остаются отдельными
+    таблицами: их можно выгрузить (pg_dump -t) и удалить."""
+    table = model._meta.db_table
+    quote = connection.ops.quote_name
+    detached = []
+    with connection.cursor() as cursor:
+        for start, name in sorted(partitions(cursor, table).items()):
+            if start >= month_start(before):
+                break
+            cursor.execute(
+                f'ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}'
+            )
+            detached.append(name)
+    return detached
@@ -0,0 +1,95 @@
+"""Рейтинг «горячих» постов.
+
+Оценка считается по формуле в духе reddit: логарифм активности плюс время
+публикации. Она не зависит от текущего времени, поэтому её можно обновлять
+для одного поста при лайке или комментарии, а выборка топа — это чтение
+по индексу на score.
+"""
+import math
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .bulk import BATCH_SIZE, batched_pks
+from .models import Comment, Like, Post, PostRank
+
+HOT_POSTS_LIMIT = 30
+HOT_POSTS_WINDOW = timedelta(days=7)
+# Сколько секунд свежести стоит десятикратный рост активности.
+DECAY_SECONDS = 45000
+COMMENT_WEIGHT = 2
+
+
+def hot_score(likes, comments, pub_date):
+    activity = likes + COMMENT_WEIGHT * comments
+    order = math.log10(max(activity, 1))
+    return round(order + pub_date.timestamp() / DECAY_SECONDS, 7)
+
+
+def recount(post):
+    """Пересчитывает рейтинг поста по его лайкам и комментариям.
+
+    Считает заново, а не прибавляет: фоновая задача может выполниться
+    повторно, и результат от этого не меняется.
+    """
+    likes = Like.objects.filter(post=post).count()
+    comments = Comment.objects.filter(post=post).count()
+    PostRank.objects.update_or_create(post=post, defaults={
+        'likes': likes,
+        'comments': comments,
+        'score': hot_score(likes, comments, post.pub_date),
+    })
+
+
+def top_posts(limit=HOT_POSTS_LIMIT):
+    return [
+        rank.post for rank in PostRank.objects.select_related(
+            'post__author', 'post__group'
+        ).order_by('-score')[:limit]
+    ]
+
+
+def _count(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def refresh(batch_size=BATCH_SIZE, now=None):
+    """Пересчитывает рейтинг свежих постов и выкидывает устаревшие.
+
+    Запускается периодически (командой refresh_hot_posts), чтобы исправить
+    возможный дрейф инкрементальных обновлений.
+    """
+    cutoff = (now or datetime.now()) - HOT_POSTS_WINDOW
+    PostRank.objects.filter(post__pub_date__lt=cutoff).delete()
+    recent = Post.objects.filter(pub_date__gte=cutoff)
+    refreshed = 0
+    for pks in batched_pks(recent, batch_size):
+        rows = Post.objects.filter(pk__in=pks).annotate(
+            like_total=_count(Like), comment_total=_count(Comment),
+        ).values_list('pk', 'pub_date', 'like_total', 'comment_total')
+        ranks = [
+            PostRank(
+                post_id=pk,
+                likes=likes,
+                comments=comments,
+                score=hot_score(likes, comments, pub_date),
+            )
+            for pk, pub_date, likes, comments in rows
+        ]
+        with transaction.atomic():
+            PostRank.objects.filter(post_id__in=pks).delete()
+            PostRank.objects.bulk_create(ranks)
+        refreshed += len(ranks)
+    return refreshed
@@ -0,0 +1,241 @@
+"""Синтетические данные для нагрузочных тестов (команда seed_data).
+
+Объёмы задаются параметрами, строки пишутся bulk_create пачками.
+Популярность распределена по степенному закону (Ципф): немногие авторы
+пишут большую часть постов и собирают большую часть подписчиков, а лайки
+и комментарии достаются в основном свежим постам — как на живом сайте.
+Тексты берутся из небольшого набора, заранее созданного Faker: генерировать
+миллион абзацев заметно дольше, чем вставлять их.
+"""
+import random
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from faker import Faker
+
+from . import group_stats, ranking
+from .models import Comment, Follow, Group, Like, Post, User
+from .ndjson import keep_dates
+
+BATCH_SIZE = 5000
+ZIPF_EXPONENT = 1.1
+# Лайки по свежести постов спадают медленнее, чем популярность авторов,
+# иначе на большой базе почти всё достанется нескольким постам.
+ACTIVITY_EXPONENT = 0.8
+TEXT_POOL = 1000
+# Доля постов, опубликованных в группах.
+GROUP_SHARE = 0.7
+
+
+class ZipfSampler:
+    """Выбирает элемент population с весом 1 / rank ** exponent:
+    первые элементы выпадают чаще всего."""
+
+    def __init__(self, population, rng, exponent=ZIPF_EXPONENT):
+        self.population = population
+        self.rng = rng
+        self.cum_weights = list(accumulate(
+            1 / rank ** exponent for rank in range(1, len(population) + 1)
+        ))
+
+    def sample(self, k=1):
+        return self.rng.choices(
+            self.population, cum_weights=self.cum_weights, k=k
+        )
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Seeder:
+
+    def __init__(self, prefix='seed', days=365, batch_size=BATCH_SIZE,
+                 seed=0, progress=None, now=None):
+        self.prefix = prefix
+        self.days = days
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.progress = progress or (lambda *args: None)
+        self.now = now or datetime.now()
+        fake = Faker('ru_RU')
+        fake.seed_instance(seed)
+        self.fake = fake
+        self.paragraphs = [fake.paragraph(5) for _ in range(TEXT_POOL)]
+        self.sentences = [fake.sentence() for _ in range(TEXT_POOL)]
+
+    def _create(self, model, rows, total):
+        done = 0
+        with keep_dates(model):
+            for batch in _batches(rows, self.batch_size):
+                model.objects.bulk_create(batch)
+                done += len(batch)
+                self.progress(model._meta.model_name, done, total)
+
+    def groups(self, count):
+        self._create(Group, (
+            Group(
+                title=self.fake.catch_phrase()[:200],
+                slug=f'{self.prefix}-{number}',
+                description=self.rng.choice(self.sentences),
+            )
+            for number in range(count)
+        ), count)
+        return list(Group.objects.filter(
+            slug__startswith=f'{self.prefix}-'
+        ).values_list('pk', flat=True))
+
+    def users(self, count):
+        # Войти под ними нельзя: бенчмарк логинит клиентов force_login.
+        password = make_password(None)
+        self._create(User, (
+            User(
+                username=f'{self.prefix}_{number}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                password=password,
+            )
+            for number in range(count)
+        ), count)
+        user_ids = list(User.objects.filter(
+            username__startswith=f'{self.prefix}_'
+        ).values_list('pk', flat=True))
+        # Порядок задаёт популярность: первые — самые читаемые авторы.
+        self.rng.shuffle(user_ids)
+        return user_ids
+
+    def posts(self, count, authors, group_ids):
+        first = self.now - timedelta(days=self.days)
+        step = (self.now - first) / max(count, 1)
+        last_pk = Post.all_objects.aggregate(top=Max('pk'))['top'] or 0
+
+        def rows():
+            for number in range(count):
+                pub_date = first + step * number
+                group_id = None
+                if group_ids and self.rng.random() < GROUP_SHARE:
+                    group_id = self.rng.choice(group_ids)
+                yield Post(
+                    text=self.rng.choice(self.paragraphs),
+                    author_id=authors.sample()[0],
+                    group_id=group_id,
+                    pub_date=pub_date,
+                    updated_at=pub_date,
+                    count_likes=0,
+                )
+
+        self._create(Post, rows(), count)
+        post_ids = array('q')
+        post_times = array('d')
+        # Свежие первыми: им достаётся больше лайков и комментариев.
+        for pk, pub_date in Post.objects.filter(pk__gt=last_pk).order_by(
+            '-pub_date'
+        ).values_list('pk', 'pub_date').iterator():
+            post_ids.append(pk)
+            post_times.append(pub_date.timestamp())
+        return post_ids, post_times
+
+    def follows(self, per_user, user_ids, authors):
+        def rows():
+            for user_id in user_ids:
+                # Парето с alpha = 2 в среднем даёт 2, отсюда деление.
+                wanted = min(
+                    int(per_user / 2 * self.rng.paretovariate(2)),
+                    len(user_ids) - 1,
+                )
+                followees = set(authors.sample(wanted))
+                followees.discard(user_id)
+                for author_id in followees:
+                    yield Follow(user_id=user_id, author_id=author_id)
+
+        self._create(Follow, rows(), len(user_ids) * per_user)
+
+    def _activity(self, count, user_ids, post_ids, post_times, unique):
+        """(user_id, post_id, created) для лайков и комментариев."""
+        picks = ZipfSampler(
+            range(len(post_ids)), self.rng, ACTIVITY_EXPONENT
+        )
+        seen = set()
+        produced = attempts = 0
+        while produced < count and attempts < count * 3:
+            attempts += 1
+            position = picks.sample()[0]
+            user_id = self.rng.choice(user_ids)
+            post_id = post_ids[position]
+            if unique:
+                pair = (user_id, post_id)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+            published = datetime.fromtimestamp(post_times[position])
+            created = min(
+                published + timedelta(hours=self.rng.expovariate(1 / 12)),
+                self.now,
+            )
+            produced += 1
+            yield user_id, post_id, created
+
+    def likes(self, count, user_ids, post_ids, post_times):
+        self._create(Like, (
+            Like(user_id=user_id, post_id=post_id, created=created)
+            for user_id, post_id, created in self._activity(
+                count, user_ids, post_ids, post_times, unique=True
+            )
+        ), count)
+        likes = Like.objects.filter(post=OuterRef('pk')).order_by().values(
+            'post'
+        ).annotate(total=Count('pk')).values('total')
+        Post.objects.filter(pk__in=Like.objects.values('post')).update(
+            count_likes=Coalesce(Subquery(likes), 0)
+        )
+
+    def comments(self, count, user_ids, post_ids, post_times):
+        self._create(Comment, (
+            Comment(
+                author_id=user_id,
+                post_id=post_id,
+                text=self.rng.choice(self.sentences),
+                created=created,
+            )
+            for user_id, post_id, created in self._activity(
+                count, user_ids, post_ids, post_times, unique=False
+            )
+        ), count)
+
+
+def seed(users=100000, posts=1000000, groups=200, follows=20,
+         likes=2000000, comments=500000, **options):
+    """Заполняет базу и пересчитывает производные таблицы (рейтинг,
+    статистику групп). Возвращает {модель: число строк}."""
+    seeder = Seeder(**options)
+    if User.objects.filter(
+        username__startswith=f'{seeder.prefix}_'
+    ).exists():
+        raise ValueError(
+            f'Пользователи с префиксом {seeder.prefix!r} уже есть'
+        )
+    group_ids = seeder.groups(groups)
+    user_ids = seeder.users(users)
+    authors = ZipfSampler(user_ids, seeder.rng)
+    post_ids, post_times = seeder.posts(posts, authors, group_ids)
+    seeder.follows(follows, user_ids, authors)
+    if post_ids and user_ids:
+        seeder.likes(likes, user_ids, post_ids, post_times)
+        seeder.comments(comments, user_ids, post_ids, post_times)
+    ranking.refresh(now=seeder.now)
+    group_stats.rebuild()
+    return {
+        model._meta.model_name: model.objects.count()
+        for model in (User, Group, Post, Follow, Like, Comment)
+    }
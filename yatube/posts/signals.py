@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import cards, feed_versions
+from .models import Group, GroupStats, User
+
+# Поля автора, которые видны в карточках постов.
+CARD_USER_FIELDS = frozenset(('username', 'first_name', 'last_name'))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    # Группы из админки, фикстур и Group.objects.create тоже попадают
+    # в каталог /groups/, не дожидаясь rebuild_group_stats.
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+    else:
+        cards.bump_group(instance.pk)
+        feed_versions.bump_all()
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Вход сохраняет только last_login: карточки от него не меняются.
+    if created or (update_fields and not CARD_USER_FIELDS & update_fields):
+        return
+    cards.bump_author(instance.pk)
+    feed_versions.bump_all()
@@ -0,0 +1,165 @@
+"""Подсказки «на кого подписаться».
+
+Считаются пакетно (команда build_follow_suggestions): граф подписок и
+лайков загружается в память как строки разреженных матриц — для каждого
+пользователя отсортированный массив id (array('q')), — и оценка автора
+для пользователя складывается из двух произведений:
+
+    A·A — на автора подписаны те, на кого подписан пользователь;
+    C·A — на автора подписаны те, кто лайкал те же посты (C — совместные
+          лайки, не больше MAX_LIKERS_PER_POST лайкнувших на пост).
+
+В таблицу FollowSuggestion на каждого пользователя пишется одна строка
+с TOP_K лучшими авторами, страница читает её одним запросом по ключу.
+Между пересчётами подписка сразу поправляет подсказки (on_follow).
+"""
+import heapq
+from array import array
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Q
+
+from . import feed_versions, follow_graph
+from .models import Follow, FollowSuggestion, Like, User
+
+TOP_K = 10
+COLIKE_WEIGHT = 0.5
+MAX_LIKERS_PER_POST = 100
+BATCH_SIZE = 500
+
+
+def _rows(pairs):
+    """[(строка, столбец)] -> {строка: array отсортированных столбцов}."""
+    rows = defaultdict(set)
+    for row, column in pairs:
+        rows[row].add(column)
+    return {row: array('q', sorted(columns)) for row, columns in rows.items()}
+
+
+def load_graph():
+    follows = _rows(
+        Follow.objects.values_list('user_id', 'author_id').iterator()
+    )
+    # Два прохода по таблице вместо списка всех лайков в памяти.
+    liked = _rows(Like.objects.values_list('user_id', 'post_id').iterator())
+    likers = _rows(
+        Like.objects.values_list('post_id', 'user_id').iterator()
+    )
+    return follows, liked, likers
+
+
+def score(user_id, follows, liked, likers):
+    scores = Counter()
+    own = follows.get(user_id, ())
+    for followee in own:
+        for author in follows.get(followee, ()):
+            scores[author] += 1
+    colikers = set()
+    for post in liked.get(user_id, ()):
+        colikers.update(likers[post][:MAX_LIKERS_PER_POST])
+    colikers.discard(user_id)
+    for coliker in colikers:
+        for author in follows.get(coliker, ()):
+            scores[author] += COLIKE_WEIGHT
+    scores.pop(user_id, None)
+    for author in own:
+        scores.pop(author, None)
+    return scores
+
+
+def _top(scores, top_k, blocked=()):
+    return heapq.nlargest(
+        top_k,
+        ((author, value) for author, value in scores.items()
+         if author not in blocked),
+        key=lambda item: (item[1], -item[0]),
+    )
+
+
+def _usernames(ids):
+    return dict(
+        User.objects.filter(pk__in=ids).values_list('pk', 'username')
+    )
+
+
+def build(top_k=TOP_K, batch_size=BATCH_SIZE, progress=None):
+    """Пересчитывает подсказки для всех пользователей с подписками
+    или лайками. Возвращает число пользователей."""
+    started = datetime.now()
+    follows, liked, likers = load_graph()
+    blocked = set(User.objects.filter(
+        Q(is_active=False) | Q(deleted_at__isnull=False)
+    ).values_list('pk', flat=True))
+    user_ids = sorted((set(follows) | set(liked)) - blocked)
+    for start in range(0, len(user_ids), batch_size):
+        chunk = user_ids[start:start + batch_size]
+        tops = {
+            user_id: _top(
+                score(user_id, follows, liked, likers), top_k, blocked
+            )
+            for user_id in chunk
+        }
+        names = _usernames(
+            {author for top in tops.values() for author, _ in top}
+        )
+        rows = [
+            FollowSuggestion(user_id=user_id, suggestions=[
+                [author, names[author], value]
+                for author, value in top if author in names
+            ])
+            for user_id, top in tops.items()
+        ]
+        with transaction.atomic():
+            FollowSuggestion.objects.filter(user_id__in=chunk).delete()
+            FollowSuggestion.objects.bulk_create(rows)
+        feed_versions.bump(*map(feed_versions.suggestions, chunk))
+        if progress:
+            progress(start + len(chunk), len(user_ids))
+    # У кого не осталось ни подписок, ни лайков.
+    gone = FollowSuggestion.objects.filter(updated_at__lt=started)
+    feed_versions.bump(*map(
+        feed_versions.suggestions, gone.values_list('user_id', flat=True)
+    ))
+    gone.delete()
+    return len(user_ids)
+
+
+def on_follow(user, author, top_k=TOP_K):
+    """Поправляет подсказки сразу после подписки, не дожидаясь пересчёта:
+    убирает author и добавляет тех, на кого подписан он сам."""
+    row, _ = FollowSuggestion.objects.get_or_create(user=user)
+    current = {
+        author_id: [username, value]
+        for author_id, username, value in row.suggestions
+    }
+    current.pop(author.pk, None)
+    followed = follow_graph.followees(user.pk)
+    for candidate in follow_graph.followees(author.pk):
+        if candidate != user.pk and candidate not in followed:
+            current.setdefault(candidate, [None, 0])[1] += 1
+    top = _top({pk: value for pk, (_, value) in current.items()}, top_k)
+    names = _usernames(
+        [pk for pk, _ in top if current[pk][0] is None]
+    )
+    row.suggestions = [
+        [pk, current[pk][0] or names[pk], value]
+        for pk, value in top if current[pk][0] or pk in names
+    ]
+    row.save()
+    feed_versions.bump(feed_versions.suggestions(user.pk))
+
+
+def for_user(user):
+    """Имена предлагаемых авторов: один запрос по первичному ключу."""
+    if not user.is_authenticated:
+        return []
+    suggestions = FollowSuggestion.objects.filter(user=user).values_list(
+        'suggestions', flat=True
+    ).first() or []
+    followed = follow_graph.followees(user.pk)
+    return [
+        username for author_id, username, _ in suggestions
+        if author_id not in followed
+    ]
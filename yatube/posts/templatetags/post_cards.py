@@ -0,0 +1,14 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from posts.cards import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts, variant):
+    """{% post_cards page_obj 'index' as cards %} — пары (пост, карточка)."""
+    return [
+        (post, mark_safe(html)) for post, html in render_cards(posts, variant)
+    ]
@@ -5,7 +5,9 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('hot/', views.hot_index, name='hot_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('groups/', views.group_directory, name='group_directory'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/ <int:post_id>/ ', views.post_detail, name='post_detail'),
     path("create/", views.post_create, name='post_create'),
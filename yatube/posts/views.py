@@ -2,15 +2,25 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 
-from .models import Follow, Post, Group, Comment, User, Like
-from .forms import GroupForm, PostForm, CommentForm
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from core.cache import get_or_compute
+from .models import Post, Group, GroupStats, Comment, User, Like
+from .forms import GroupForm, PostForm, CommentForm
+from . import (
+    bulk, feed_versions, follow_graph, group_stats, jobs, ranking,
+    suggestions,
+)
+
+GROUPS_PER_PAGE = 20
+
+
 def user_in_group(user):
     return user.groups.filter(name='all').exists()
 
 
+@feed_versions.feed_condition(lambda: [feed_versions.INDEX])
 def index(request):
     post_list = Post.objects.all().order_by('-pub_date')
     paginator = Paginator(post_list, 10)
@@ -18,9 +28,24 @@ def index(request):
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
+        'index': True,
+        # Ключ фрагмента меняется вместе с ETag ленты.
+        'feed_version': feed_versions.latest([feed_versions.INDEX]),
     }
     return render(request, 'posts/index.html', context)
 
+
+def hot_index(request):
+    posts = get_or_compute('hot_posts', ranking.top_posts, soft_ttl=30)
+    paginator = Paginator(posts, 10)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    context = {
+        'page_obj': page_obj,
+        'hot': True,
+    }
+    return render(request, 'posts/hot.html', context)
+
 @api_view(['GET'])
 def ping_like(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
@@ -42,14 +67,18 @@ def like(request, post_id):
         post.count_likes -= 1
         post.save()
         like.delete()
+        jobs.rank_later(post)
     else:
         post.count_likes += 1
         post.save()
         Like.objects.create(post=post, user=request.user)
+        jobs.rank_later(post)
+    feed_versions.bump(feed_versions.INDEX, feed_versions.post(post.pk))
 
     return redirect('posts:index')
 
 
+@feed_versions.feed_condition(lambda slug: [feed_versions.group(slug)])
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
 
@@ -64,26 +93,32 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@feed_versions.feed_condition(
+    lambda username: [feed_versions.profile(username)],
+    lambda user: [feed_versions.suggestions(user.pk)]
+    if user.is_authenticated else [],
+)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(User, username=username, deleted_at=None)
     post_list = author.posts.select_related('group').order_by('-pub_date')
     paginator = Paginator(post_list, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     total = page_obj.paginator.count
-    if Follow.objects.filter(author=author.id).exists():
-        following = True
-    else:
-        following = False
+    following = follow_graph.is_following(request.user, author)
     context = {
         "page_obj": page_obj,
         "author": author,
         "total": total,
         "following": following,
+        "suggestions": suggestions.for_user(request.user),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@feed_versions.feed_condition(
+    lambda post_id: [feed_versions.post(post_id), feed_versions.POSTS]
+)
 def post_detail(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     total = post.author.posts.count()
@@ -112,11 +147,30 @@ def creat_group(request):
     return render(request, 'posts/group.html', context)
 
 
+def group_directory(request):
+    after = request.GET.get('after', '')
+    stats = list(
+        GroupStats.objects.select_related('group')
+        .filter(group__slug__gt=after)
+        .order_by('group__slug')[:GROUPS_PER_PAGE + 1]
+    )
+    next_cursor = None
+    if len(stats) > GROUPS_PER_PAGE:
+        stats = stats[:GROUPS_PER_PAGE]
+        next_cursor = stats[-1].group.slug
+    context = {
+        'stats': stats,
+        'next_cursor': next_cursor,
+        'is_first_page': not after,
+    }
+    return render(request, 'posts/groups.html', context)
+
+
 @login_required
 def delet_post(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    name = Post.objects.filter(pk=post_id)
-    name.delete()
+    # Пост пропадает сразу, строки и картинку удалит purge_hidden.
+    bulk.hide_post(post)
     return redirect('posts:profile', post.author)
 
 @login_required
@@ -136,6 +190,10 @@ def post_create(request):
         post.author = request.user
         post.count_likes = 0
         post.save()
+        jobs.rank_later(post)
+        jobs.thumbnails_later(post)
+        group_stats.post_added(post)
+        feed_versions.bump(*feed_versions.post_scopes(post))
         return redirect("posts:profile", request.user)
     context = {"form": form, "is_edit": is_edit}
     return render(request, template, context)
@@ -144,6 +202,8 @@ def post_create(request):
 @login_required
 def post_edit(request, post_id):
     post_s = get_object_or_404(Post, pk=post_id)
+    old_group_id = post_s.group_id
+    old_scopes = feed_versions.post_scopes(post_s)
     is_edit = True
     if request.user != post_s.author:
         return redirect("posts:profile", post_s.author)
@@ -155,6 +215,12 @@ def post_edit(request, post_id):
         )
         if form.is_valid():
             form.save()
+            if 'image' in form.changed_data:
+                jobs.thumbnails_later(post_s)
+            group_stats.post_moved(post_s, old_group_id)
+            feed_versions.bump(
+                *old_scopes, *feed_versions.post_scopes(post_s)
+            )
             return redirect("posts:post_detail", post_id)
         return render(request, 'posts/create_post.html',
                       {'form': form,
@@ -176,6 +242,8 @@ def add_comment(request, post_id):
         comment.author = request.user
         comment.post = post
         comment.save()
+        jobs.rank_later(post)
+        feed_versions.bump(feed_versions.post(post.pk))
         
     return redirect('posts:post_detail', post_id=post_id)
 
@@ -183,14 +251,16 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     posts = Post.objects.select_related('author', 'group').filter(
-        author__following__user=request.user
-    )
+        author_id__in=follow_graph.followees(request.user.pk)
+    ).order_by('-pub_date')
     paginator = Paginator(posts, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     template = 'posts/follow.html'
     context = {
         'page_obj': page_obj,
+        'follow': True,
+        'suggestions': suggestions.for_user(request.user),
     }
     return render(request, template, context)
 
@@ -198,14 +268,21 @@ def follow_index(request):
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    if request.user != author:
-        Follow.objects.get_or_create(user=request.user, author=author)
+    if follow_graph.follow(request.user, author):
+        jobs.follow_suggestions_later(request.user, author)
+        feed_versions.bump(
+            feed_versions.profile(author.username),
+            feed_versions.suggestions(request.user.pk),
+        )
     return redirect("posts:profile", username=author)
 
 
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    is_follower = Follow.objects.filter(user=request.user, author=author)
-    is_follower.delete()
+    follow_graph.unfollow(request.user, author)
+    feed_versions.bump(
+        feed_versions.profile(author.username),
+        feed_versions.suggestions(request.user.pk),
+    )
     return redirect('posts:profile', username=author)
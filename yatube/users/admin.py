@@ -0,0 +1,24 @@
+from django.contrib import admin, messages
+from django.contrib.auth.admin import UserAdmin
+
+from posts import bulk, jobs
+from .models import CustomUser
+
+
+@admin.register(CustomUser)
+class CustomUserAdmin(UserAdmin):
+    fieldsets = UserAdmin.fieldsets + (
+        ('Профиль', {'fields': ('profile_picture',)}),
+    )
+    actions = ('delete_authors_in_batches',)
+
+    @admin.action(description='Скрыть авторов и удалить их записи в фоне')
+    def delete_authors_in_batches(self, request, queryset):
+        for user in queryset:
+            bulk.hide_author(user)
+        jobs.purge_hidden_later()
+        self.message_user(
+            request,
+            'Авторы скрыты, удаление поставлено в очередь фоновых задач.',
+            messages.INFO,
+        )
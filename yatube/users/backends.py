@@ -0,0 +1,14 @@
+from django.contrib.auth.backends import ModelBackend
+
+from . import cache
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который не ходит в базу за пользователем на каждый
+    запрос."""
+
+    def get_user(self, user_id):
+        user = cache.get_user(user_id, super().get_user)
+        if user is None or not self.user_can_authenticate(user):
+            return None
+        return user
@@ -0,0 +1,81 @@
+"""Кэш пользователя и его данных на время между запросами.
+
+Всё закэшированное помечено версией из общего кэша: сигналы поднимают
+версию при сохранении пользователя (в том числе при смене пароля) и при
+изменении его групп, после чего старые записи больше не читаются.
+В stats считается, сколько запросов к базе сэкономил кэш в этом процессе.
+"""
+import time
+from collections import Counter
+
+from django.core.cache import cache
+
+SESSION_GROUPS_KEY = 'user_groups'
+USER_TIMEOUT = 60 * 60
+
+stats = Counter()
+
+
+def _version_key(kind, user_id):
+    return f'user:{user_id}:{kind}'
+
+
+def version(kind, user_id):
+    key = _version_key(kind, user_id)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time(), None)
+        value = cache.get(key)
+    return value
+
+
+def bump(kind, user_ids):
+    """Сбрасывает закэшированные данные вида kind у пользователей."""
+    stamp = time.time()
+    cache.set_many(
+        {_version_key(kind, user_id): stamp for user_id in user_ids}, None
+    )
+
+
+def bump_groups(user_ids):
+    user_ids = list(user_ids)
+    bump('groups', user_ids)
+    bump('object', user_ids)
+
+
+def get_user(user_id, load):
+    """Пользователь по id; load(user_id) вызывается при промахе."""
+    key = f'user:{user_id}:object:{version("object", user_id)}'
+    user = cache.get(key)
+    if user is not None:
+        stats['user_hits'] += 1
+        return user
+    stats['user_misses'] += 1
+    user = load(user_id)
+    if user is not None:
+        cache.add(key, user, USER_TIMEOUT)
+    return user
+
+
+def group_names(request):
+    """Имена групп текущего пользователя, с кэшем в сессии."""
+    user = request.user
+    if not user.is_authenticated:
+        return frozenset()
+    current = version('groups', user.pk)
+    cached = request.session.get(SESSION_GROUPS_KEY)
+    if cached is not None and cached[0] == current:
+        stats['groups_hits'] += 1
+        return frozenset(cached[1])
+    stats['groups_misses'] += 1
+    names = list(user.groups.values_list('name', flat=True))
+    request.session[SESSION_GROUPS_KEY] = [current, names]
+    return frozenset(names)
+
+
+def queries_saved_total():
+    """Сколько запросов к базе не понадобилось благодаря кэшу — всего
+    с запуска процесса, а не за запрос: для числа за запрос берите
+    разность до и после."""
+    session_hits = stats['session_loads'] - stats['session_misses']
+    return stats['user_hits'] + session_hits + stats['groups_hits']
@@ -1,5 +1,9 @@
+from core.context_processors.lazy import lazy_processor
+
+from .cache import group_names
+
+
+@lazy_processor('user_groups')
 def user_group(request):
-    # Проверяем, аутентифицирован ли пользователь и в какой группе он состоит
-    
-    user_groups = request.user.groups.filter(name='all').exists()
-    return {'user_groups': True}
\ No newline at end of file
+    """Состоит ли пользователь в группе 'all'."""
+    return 'all' in group_names(request)
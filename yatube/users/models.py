@@ -4,3 +4,6 @@ from django.db import models
 
 class CustomUser(AbstractUser):
     profile_picture = models.ImageField('Фото', upload_to='profileimg/', null=True, blank=True)
+    deleted_at = models.DateTimeField(
+        'Скрыт для удаления', null=True, blank=True, db_index=True
+    )
@@ -0,0 +1,16 @@
+"""Сессии в базе с кэшем перед ней (cached_db) и подсчётом попаданий."""
+from django.contrib.sessions.backends import cached_db
+
+from . import cache
+
+
+class SessionStore(cached_db.SessionStore):
+
+    def load(self):
+        cache.stats['session_loads'] += 1
+        return super().load()
+
+    def _get_session_from_db(self):
+        # cached_db идёт в базу только при промахе кэша.
+        cache.stats['session_misses'] += 1
+        return super()._get_session_from_db()
@@ -0,0 +1,42 @@
+from django.contrib.auth.models import Group
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete,
+)
+from django.dispatch import receiver
+
+from .cache import bump, bump_groups
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def user_changed(sender, instance, **kwargs):
+    bump('object', [instance.pk])
+
+
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def permissions_changed(sender, instance, action, reverse, pk_set,
+                        **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and not reverse:
+        bump('object', [instance.pk])
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            bump_groups([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        bump_groups(pk_set)
+    elif action == 'pre_clear':
+        # После очистки состав группы уже не узнать.
+        instance._cleared_user_ids = list(
+            instance.user_set.values_list('pk', flat=True)
+        )
+    elif action == 'post_clear':
+        bump_groups(instance.__dict__.pop('_cleared_user_ids', []))
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    bump_groups(instance.user_set.values_list('pk', flat=True))
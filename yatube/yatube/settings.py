@@ -18,7 +18,9 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 SECRET_KEY = ')_c=sa)bc8__pc1!*ged=enr@_+sg5iu5=2@c!hzg2f8@im_7u'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Dockerfile запускает runserver, который раздаёт /static/ и /media/
+# только с DEBUG; YATUBE_DEBUG=0 выключает отладку вместе с debug_toolbar.
+DEBUG = os.getenv('YATUBE_DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = [
     '87.242.100.29',
@@ -41,24 +43,35 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'rest_framework',
     'sorl.thumbnail',
-    'debug_toolbar',
     # 'channels',
 ]
 
 # ASGI_APPLICATION  = 'yatube.asgi.application'
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilerMiddleware',
+    'core.middleware.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Панель отладки — только при отладке: на каждом запросе она дорогая,
+# а в бою профилирует core.profiler.
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ] 
@@ -67,7 +80,8 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с замером времени рендера для /metrics.
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -102,9 +116,10 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 #     }
 # }
 
+# Соединения с удалённой базой берутся из пула процесса (core.db.pool).
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.backends.postgresql_pool',
         'NAME': 'dbserv',
         'USER': 'miha',
         'PASSWORD': 'miha2003',
@@ -113,15 +128,115 @@ DATABASES = {
         'OPTIONS': {
             "options": "-c search_path=curs1"
         },
+        'POOL': {
+            'MIN_SIZE': 2,
+            'MAX_SIZE': 10,
+            'MAX_LIFETIME': 30 * 60,
+            'TIMEOUT': 5,
+        },
     }
 }
 
+# Реплики только для чтения: алиасы из DATABASES с копией 'default'.
+# С них читают только view из REPLICA_VIEWS, а кто записал в базу,
+# ещё REPLICA_PIN_SECONDS читает из основной.
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+REPLICA_PIN_SECONDS = 5
+REPLICA_VIEWS = [
+    'posts:index',
+    'posts:hot_index',
+    'posts:group_list',
+    'posts:group_directory',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:follow_index',
+    'api:post_list',
+    'api:post_detail',
+    'api:group_posts',
+    'api:profile_posts',
+    'api:follow_posts',
+]
+
+# Помесячные секции для комментариев и лайков (только PostgreSQL, см.
+# posts.partitions). Включённый флаг применяется миграцией posts 0011,
+# позже — командой partitions --convert.
+PARTITION_TABLES = False
+
+# Метрики процессов для /metrics (см. core.metrics): каталог общий для
+# процессов одной машины. Отдаются только запросам с этих адресов.
+METRICS_DIR = os.getenv(
+    'YATUBE_METRICS_DIR', os.path.join(BASE_DIR, 'metrics')
+)
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Журнал медленных запросов (core.slow_queries): порог в мс (None —
+# выключен), доля записываемых и сколько последних записей хранить.
+SLOW_QUERY_MS = 200
+SLOW_QUERY_SAMPLE = 1.0
+SLOW_QUERY_KEEP = 1000
+
+# Профилировщик (core.profiler): сотрудник включает его заголовком
+# X-Profile: 1, кроме того профилируется PROFILE_SAMPLE_RATE всех запросов.
+# Стеки пишутся в PROFILE_DIR в формате для flame graph.
+PROFILE_DIR = os.getenv(
+    'YATUBE_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles')
+)
+PROFILE_SAMPLE_RATE = 0.0
+PROFILE_INTERVAL = 0.005
+PROFILE_KEEP = 200
+
+# Общий для всех процессов кэш в файле SQLite (режим WAL).
 CACHES = {
+    # Горячие ключи читаются из памяти процесса, остальные — из 'shared'.
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache_backends.tiered.TieredCache',
+        'LOCATION': 'tiered',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_MAX_ENTRIES': 2000,
+            'L1_TIMEOUT': 60,
+            'L1_BYPASS': ('ratelimit:', 'lock:'),
+            'L1_VERSIONED': ('post_card:',),
+            # Пространства ключей со своими поколениями; ключи вне них
+            # (фрагменты шаблонов и прочее) делят одно общее.
+            'L1_NAMESPACES': (
+                'feed_version:', 'card_version:', 'post_card:', 'user:',
+                'follow:', 'template.cache.',
+            ),
+        },
+    },
+    'shared': {
+        'BACKEND': 'core.cache_backends.sqlite.SQLiteCache',
+        'LOCATION': os.getenv(
+            'YATUBE_CACHE_PATH', os.path.join(BASE_DIR, 'cache.sqlite3')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
     }
 }
 
+# Бюджеты запросов на пишущие URL: имя URL -> методы и лимиты
+# на пользователя и на IP в формате 'число/s|m|h|d'.
+RATELIMITS = {
+    'posts:like': {
+        'methods': ('GET', 'POST'), 'user': '60/m', 'ip': '120/m',
+    },
+    'posts:add_comment': {
+        'methods': ('POST',), 'user': '10/m', 'ip': '30/m',
+    },
+    'posts:post_create': {
+        'methods': ('POST',), 'user': '10/m', 'ip': '20/m',
+    },
+    'posts:profile_follow': {
+        'methods': ('GET', 'POST'), 'user': '30/m', 'ip': '60/m',
+    },
+    'posts:group_cr': {
+        'methods': ('POST',), 'user': '5/m', 'ip': '10/m',
+    },
+}
+
 
 REST_FRAMEWORK = {
        'DEFAULT_RENDERER_CLASSES': [
@@ -166,4 +281,11 @@ LOGIN_REDIRECT_URL = 'posts:index'
 STATIC_URL = '/static/'
 
 AUTH_USER_MODEL = 'users.CustomUser'
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+
+# Сессии читаются из общего кэша и только при промахе — из базы.
+# Кэш 'shared', а не 'default': запись сессии не должна сбрасывать L1.
+SESSION_ENGINE = 'users.sessions'
+SESSION_CACHE_ALIAS = 'shared'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
@@ -1,10 +1,11 @@
 from django.contrib import admin
 from django.urls import include, path
 
-import debug_toolbar
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import metrics_view
+
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.permission_denied'
 handler500 = 'core.views.server_error'
@@ -17,12 +18,15 @@ urlpatterns = [
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('api/v1/', include('api.urls', namespace='api')),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
     )
+    import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
     
     
\ No newline at end of file